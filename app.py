@@ -1,30 +1,41 @@
+import time
+import numpy as np
 import streamlit as st
-import pandas as pd
-from core.calculations import *
-from core.data_fetcher import busca_taxa_selic_atual
-from core.analysis import *
-from core.plotting import plot_custo_total_bar_chart, plot_scenario_analysis_bar_chart
+from core.data_fetcher import ultima_taxa_selic, TAXA_SELIC_PADRAO
+from core.formatting import (
+    formata_tabela_cenarios, formata_tabela_break_even, formata_tabela_estrategias, formata_tabela_metricas, formata_tabela_caches
+)
+from core.parametros import ParametrosAnalise
+from core.curvas import TAXAS_INDEXADORES
+from core import memoizacao, servico, instrumentacao
 
 # --- Configuração da Página ---
 st.set_page_config(page_title="Calculadora Estratégica", page_icon="💰", layout="wide")
 
+# Painel de debug oculto: abrir o app com ?debug=1 só mostra o painel; a coleta de métricas do core
+# (do processo todo, todas as sessões pagam por ela) é ligada e desligada por um controle no painel
+modo_debug = st.query_params.get("debug") == "1"
+inicio_rerun = time.perf_counter()
+
 st.title("Calculadora Estratégica: Financiamento vs. Consórcio")
 st.markdown("Uma ferramenta para análise do custo efetivo de aquisição de bens, baseada no Valor do Dinheiro no Tempo.")
 
 # Inicializa o session_state para guardar a "memória" da aplicação
 if 'analysis_run' not in st.session_state:
     st.session_state.analysis_run = False
-    st.session_state.params = {}
+    st.session_state.params = None
 
 if 'selic_value' not in st.session_state:
-    selic_atual = busca_taxa_selic_atual()
+    # Lê a cópia local da série do BCB; a atualização pela rede roda em segundo plano
+    selic_atual, data_selic = ultima_taxa_selic()
+    if data_selic is None:
+        st.warning(f"Série da Selic ainda não disponível localmente. Usando taxa padrão de {TAXA_SELIC_PADRAO*100}%.")
     st.session_state.selic_value = selic_atual * 100
 
 # --- Barra Lateral para Inputs do Usuário ---
 st.sidebar.header("Parâmetros de Entrada")
 
 # PARÂMETRO GLOBAL 1 - Taxa de Oportunidade (Selic)
-selic_atual = busca_taxa_selic_atual()
 taxa_selic_anual = st.sidebar.slider(
     "Taxa de Oportunidade (Selic Anual %)", 
     min_value=1.0, max_value=20.0, value=st.session_state.selic_value, step=0.25
@@ -53,29 +64,29 @@ if st.sidebar.button("Analisar", type="primary", use_container_width=True):
         st.session_state.analysis_run = False
     else:
         st.session_state.analysis_run = True
-        st.session_state.params = {
-            'valor_bem': valor_bem, 'valor_entrada': valor_entrada,
-            'taxa_juros_anual_fin': taxa_juros_anual_fin, 'prazo_meses_fin': prazo_meses_fin,
-            'taxa_selic_anual': taxa_selic_anual, 'prazo_meses_con': prazo_meses_con,
-            'taxa_adm_total': taxa_adm_total, 'fundo_reserva_total': fundo_reserva_total
-        }
+        st.session_state.params = ParametrosAnalise(
+            valor_bem=valor_bem, valor_entrada=valor_entrada,
+            taxa_juros_anual_fin=taxa_juros_anual_fin, prazo_meses_fin=prazo_meses_fin,
+            taxa_selic_anual=taxa_selic_anual, prazo_meses_con=prazo_meses_con,
+            taxa_adm_total=taxa_adm_total, fundo_reserva_total=fundo_reserva_total
+        )
 
 # --- Lógica de Exibição (só roda se a análise foi iniciada) ---
 if st.session_state.analysis_run:
+    # Parâmetros imutáveis: servem de chave para os caches de core.memoizacao, que
+    # reaproveitam entre reruns (e entre sessões) tudo o que não mudou
     params = st.session_state.params
-    valor_a_financiar = params['valor_bem'] - params['valor_entrada']
-    parcela_fin = calcula_parcela_price(valor_a_financiar, params['taxa_juros_anual_fin'], params['prazo_meses_fin'])
-    parcela_con = calcula_parcela_consorcio(params['valor_bem'], params['prazo_meses_con'], params['taxa_adm_total'], params['fundo_reserva_total'])
-    params.update({
-        'valor_a_financiar': valor_a_financiar, 'parcela_fin': parcela_fin,
-        'parcela_con': parcela_con, 'carta_credito': params['valor_bem']
-    })
-
-    tab1, tab2, tab3 = st.tabs(["📊 Resultado Principal", "📈 Análise de Cenários", "🎯 Estratégias de Consórcio"])
-
-    with tab1:
-        custo_vp_fin = calcula_vp_custo_financiamento(params['valor_entrada'], params['valor_a_financiar'], params['taxa_juros_anual_fin'], params['prazo_meses_fin'], params['taxa_selic_anual'])
-        custo_vp_con = calcula_vp_custo_consorcio(params['parcela_con'], params['prazo_meses_con'], params['taxa_selic_anual'])
+    valor_a_financiar = params.valor_a_financiar
+    parcela_fin = params.parcela_fin
+    parcela_con = params.parcela_con
+
+    # Só a seção escolhida é calculada e desenhada: com st.tabs, as três rodariam (e montariam
+    # todas as figuras) a cada rerun, mesmo escondidas
+    secoes = ["📊 Resultado Principal", "📈 Análise de Cenários", "🎯 Estratégias de Consórcio"]
+    secao = st.radio("Seção", secoes, horizontal=True, key="secao", label_visibility="collapsed")
+
+    if secao == secoes[0]:
+        custo_vp_fin, custo_vp_con = memoizacao.custos_vp(params)
         
         st.header("Resultados da Análise (Cenário Realista)")
         col1, col2 = st.columns(2)
@@ -84,8 +95,12 @@ if st.session_state.analysis_run:
             st.metric(label="Custo Total em Valor Presente", value=f"R$ {custo_vp_fin:,.2f}")
             st.metric(label="Parcela Mensal", value=f"R$ {parcela_fin:,.2f}")
             with st.expander("Ver Tabela de Amortização"):
-                tabela_amortizacao = gera_tabela_amortizacao(valor_a_financiar, params['taxa_juros_anual_fin'], params['prazo_meses_fin'])
+                sistema_amortizacao = st.radio("Sistema de Amortização", ["Price", "SAC"], horizontal=True, key="sistema_amortizacao").lower()
+                tabela_amortizacao = memoizacao.tabela_amortizacao(valor_a_financiar, params.taxa_juros_anual_fin, params.prazo_meses_fin, sistema_amortizacao)
                 st.dataframe(tabela_amortizacao)
+                csv_amortizacao = memoizacao.tabela_amortizacao_csv(valor_a_financiar, params.taxa_juros_anual_fin, params.prazo_meses_fin, sistema_amortizacao)
+                st.download_button("Exportar Tabela (CSV)", csv_amortizacao, file_name=f"amortizacao_{sistema_amortizacao}.csv", mime="text/csv")
+                st.plotly_chart(memoizacao.figura_amortizacao(valor_a_financiar, params.taxa_juros_anual_fin, params.prazo_meses_fin, sistema_amortizacao), use_container_width=True)
         with col2:
             st.subheader("Consórcio")
             st.metric(label="Custo Total em Valor Presente", value=f"R$ {abs(custo_vp_con):,.2f}")
@@ -93,7 +108,7 @@ if st.session_state.analysis_run:
             st.info("Cálculo do VP considera a contemplação no final do plano (pior cenário).")
         
         st.subheader("Gráfico Comparativo de Custos")
-        fig_comparativo = plot_custo_total_bar_chart(custo_vp_fin, abs(custo_vp_con))
+        fig_comparativo = memoizacao.figura_custo_total(params)
         st.plotly_chart(fig_comparativo, use_container_width=True)
 
         diferenca_vp = abs(custo_vp_fin - abs(custo_vp_con))
@@ -102,42 +117,148 @@ if st.session_state.analysis_run:
         else:
             st.info(f"**Conclusão:** No cenário realista, o **Consórcio** parece ser mais vantajoso por uma diferença de R$ {diferenca_vp:,.2f} em valor presente.")
 
-    with tab2:
+        with st.expander("Pontos de Empate (Break-even)"):
+            st.markdown("Valor de cada parâmetro, mantidos os demais, em que os custos em VP do financiamento e do consórcio se igualam.")
+            empates = memoizacao.pontos_de_empate(params)
+            st.table(formata_tabela_break_even(params.como_dict(), empates))
+
+    if secao == secoes[1]:
         st.header("Análise de Sensibilidade à Taxa de Oportunidade (Selic)")
         st.markdown("Esta análise mostra como a decisão pode mudar se a taxa de juros da economia (Selic) variar.")
-        df_cenarios = run_scenario_analysis(params)
-        st.table(df_cenarios)
+        df_cenarios = memoizacao.cenarios(params)
+        st.table(formata_tabela_cenarios(df_cenarios))
         st.subheader("Gráfico Comparativo dos Cenários")
-        fig_cenarios = plot_scenario_analysis_bar_chart(df_cenarios)
+        fig_cenarios = memoizacao.figura_cenarios(params)
         st.plotly_chart(fig_cenarios, use_container_width=True)
 
-    with tab3:
+        st.subheader("Curvas de Juros e Indexadores")
+        st.markdown("Em vez de uma Selic fixa, desconta os fluxos por trajetórias da Selic mês a mês. "
+                    "As parcelas também podem ser corrigidas por um indexador (IGPM/INCC no consórcio, TR no financiamento).")
+        col_idx1, col_idx2 = st.columns(2)
+        with col_idx1:
+            indexador_con = st.selectbox("Indexador das Parcelas do Consórcio", ["Nenhum", "IGPM", "INCC"], key="indexador_con")
+            taxa_indexador_con = None
+            if indexador_con != "Nenhum":
+                taxa_indexador_con = st.number_input(f"{indexador_con} Projetado (% a.a.)", 0.0, 30.0, TAXAS_INDEXADORES[indexador_con] * 100, step=0.25, key="taxa_indexador_con") / 100
+        with col_idx2:
+            corrige_tr = st.checkbox("Corrigir o Financiamento pela TR", key="corrige_tr")
+            taxa_indexador_fin = None
+            if corrige_tr:
+                taxa_indexador_fin = st.number_input("TR Projetada (% a.a.)", 0.0, 10.0, TAXAS_INDEXADORES['TR'] * 100, step=0.25, key="taxa_indexador_fin") / 100
+        df_curvas = memoizacao.cenarios_curvas(params, taxa_indexador_con, taxa_indexador_fin)
+        st.table(formata_tabela_cenarios(df_curvas).rename(columns={"Taxa Selic Anual": "Taxa Equivalente Anual"}))
+        st.plotly_chart(memoizacao.figura_cenarios_curvas(params, taxa_indexador_con, taxa_indexador_fin), use_container_width=True)
+
+        st.subheader("Mapa de Sensibilidade: Selic × Taxa do Financiamento")
+        st.markdown("Cada célula compara os dois custos em VP. Abaixo da linha de break-even o financiamento é mais vantajoso; acima, o consórcio.")
+        fig_grade = memoizacao.figura_sensibilidade(params, {
+            'taxa_juros_anual_fin': np.arange(0.01, 0.2501, 0.0025),
+            'taxa_selic_anual': np.arange(0.01, 0.2001, 0.0025)
+        }, eixo_x='taxa_selic_anual', eixo_y='taxa_juros_anual_fin')
+        st.plotly_chart(fig_grade, use_container_width=True)
+
+    if secao == secoes[2]:
         st.header("Simulador de Estratégias para o Consórcio")
         st.info("Explore cenários alternativos para sua carta de consórcio, tratando-a como um ativo financeiro.")
         col1, col2, col3 = st.columns(3)
         with col1:
             st.subheader("Estratégia de Lance")
             lance_perc = st.slider("Lance Ofertado (% da carta)", 0, 100, 25, key="lance_perc")
-            if st.button("Simular Lance"):
-                resultado = simular_estrategia_lance(params['parcela_con'], params['prazo_meses_con'], params['carta_credito'], lance_perc, params['taxa_selic_anual'])
-                st.metric("Novo Custo em VP (com lance)", f"R$ {resultado['custo_vp']:,.2f}")
-                st.write(f"Prazo efetivo reduzido para ~{resultado['novo_prazo']} meses.")
+            area_lance = st.container()
+            with st.expander("Otimizar Lance"):
+                st.caption("Varre lances de 0% a 100% da carta em cada mês do grupo, incluindo o custo do próprio lance em VP e o valor da carta recebida.")
+                considera_contemplacao = st.checkbox("Lance vencedor antecipa a contemplação", value=True, key="lance_contempla")
+                lance_minimo = st.slider("Lance Mínimo Vencedor (% da carta)", 0.0, 100.0, 40.0, step=0.5, key="lance_minimo",
+                                         disabled=not considera_contemplacao)
+                lance_minimo = lance_minimo if considera_contemplacao else None
+                if st.button("Encontrar Melhor Lance"):
+                    otimo = memoizacao.otimizacao_lance(parcela_con, params.prazo_meses_con, params.carta_credito, params.taxa_selic_anual, lance_minimo)
+                    st.metric("Lance de Menor Custo", f"{otimo['percentual_otimo']:.1f}% no mês {otimo['mes_otimo']}")
+                    st.metric("Custo Líquido em VP", f"R$ {otimo['custo_vp_otimo']:,.2f}")
+                    st.plotly_chart(memoizacao.figura_curva_lance(parcela_con, params.prazo_meses_con, params.carta_credito, params.taxa_selic_anual, lance_minimo), use_container_width=True)
         with col2:
             st.subheader("Estratégia de Venda")
-            mes_contemplacao_venda = st.slider("Mês da Contemplação (p/ Venda)", 1, params['prazo_meses_con'], int(params['prazo_meses_con']/2), key="mes_venda")
+            mes_contemplacao_venda = st.slider("Mês da Contemplação (p/ Venda)", 1, params.prazo_meses_con, int(params.prazo_meses_con/2), key="mes_venda")
             agio_venda = st.slider("Ágio na Venda (% sobre valor pago)", -10, 50, 15, key="agio_venda")
-            if st.button("Simular Venda da Cota"):
-                resultado = simular_estrategia_venda(params['parcela_con'], mes_contemplacao_venda, agio_venda, params['taxa_selic_anual'])
-                st.metric("VPL da Operação", f"R$ {resultado['vpl']:,.2f}")
-                st.metric("TIR Anualizada", f"{resultado['tir_anual']:.2%}")
+            area_venda = st.container()
+            with st.expander("Ver Grade Mês × Ágio"):
+                st.plotly_chart(memoizacao.figura_grade_venda(parcela_con, params.prazo_meses_con, params.taxa_selic_anual), use_container_width=True)
         with col3:
             st.subheader("Estratégia de Aluguel")
-            mes_contemplacao_aluguel = st.slider("Mês da Contemplação (p/ Aluguel)", 1, params['prazo_meses_con'], int(params['prazo_meses_con']/4), key="mes_aluguel")
-            valor_aluguel = st.number_input("Valor Mensal do Aluguel (R$)", value=int(params['carta_credito']*0.005), key="valor_aluguel")
-            if st.button("Simular Aluguel do Bem"):
-                resultado = simular_estrategia_aluguel(params['parcela_con'], params['prazo_meses_con'], mes_contemplacao_aluguel, valor_aluguel, params['taxa_selic_anual'])
+            mes_contemplacao_aluguel = st.slider("Mês da Contemplação (p/ Aluguel)", 1, params.prazo_meses_con, int(params.prazo_meses_con/4), key="mes_aluguel")
+            valor_aluguel = st.number_input("Valor Mensal do Aluguel (R$)", value=int(params.carta_credito*0.005), key="valor_aluguel")
+            area_aluguel = st.container()
+
+        if st.button("Simular Estratégias", type="primary"):
+            # As três estratégias rodam ao mesmo tempo no pool compartilhado; a tela espera só pela mais lenta
+            futuros = servico.servico_compartilhado().simula_estrategias(params, lance_perc, mes_contemplacao_venda, agio_venda,
+                                                                         mes_contemplacao_aluguel, valor_aluguel)
+            resultados = servico.resultados(futuros)
+            with area_lance:
+                resultado = resultados['lance']
+                st.metric("Novo Custo em VP (com lance)", f"R$ {resultado['custo_vp']:,.2f}")
+                st.write(f"Prazo efetivo reduzido para ~{resultado['novo_prazo']} meses.")
+            with area_venda:
+                resultado = resultados['venda']
+                st.metric("VPL da Operação", f"R$ {resultado['vpl']:,.2f}")
+                if resultado['tir_convergiu']:
+                    st.metric("TIR Anualizada", f"{resultado['tir_anual']:.2%}")
+                else:
+                    st.metric("TIR Anualizada", "Indefinida")
+                    st.caption("O fluxo desta operação não tem TIR no intervalo de busca.")
+            with area_aluguel:
+                resultado = resultados['aluguel']
                 st.metric("VPL da Operação", f"R$ {resultado['vpl']:,.2f}")
                 if resultado['vpl'] > 0:
                     st.success("VPL positivo: as receitas de aluguel superam os custos das parcelas em valor presente.")
                 else:
-                    st.warning("VPL negativo: os custos superam as receitas em valor presente.")
\ No newline at end of file
+                    st.warning("VPL negativo: os custos superam as receitas em valor presente.")
+
+            st.subheader("Comparação das Estratégias")
+            st.caption("Resultado líquido de cada estratégia em valor presente: parcelas e lance (saídas) menos a carta recebida na "
+                       "contemplação, ou o valor de venda da cota. Manter e Lance supõem a contemplação no último mês.")
+            comparacao = servico.compara_estrategias(params, resultados, lance_perc, mes_contemplacao_aluguel)
+            st.table(formata_tabela_estrategias(comparacao))
+            st.success(f"Melhor resultado líquido em VP: **{comparacao['Resultado Líquido em VP (R$)'].idxmax()}**.")
+
+        st.subheader("Simulação de Monte Carlo: Contemplação e Selic Incertas")
+        st.markdown("Em vez de supor a contemplação no último mês, sorteia o mês de contemplação e trajetórias da Selic. "
+                    "O custo líquido desconta o valor da carta recebida (consórcio) ou do bem (financiamento).")
+        col_mc1, col_mc2, col_mc3 = st.columns(3)
+        with col_mc1:
+            n_caminhos = st.select_slider("Número de Caminhos", options=[10_000, 50_000, 100_000, 200_000], value=100_000, key="mc_caminhos")
+        with col_mc2:
+            prob_lance_mc = st.slider("Chance Mensal de Vencer por Lance (%)", 0.0, 10.0, 0.0, step=0.5, key="mc_prob_lance") / 100
+        with col_mc3:
+            volatilidade_mc = st.slider("Volatilidade da Selic (p.p. ao ano)", 0.0, 5.0, 2.0, step=0.5, key="mc_volatilidade") / 100
+        if st.button("Simular Monte Carlo"):
+            resultado = memoizacao.monte_carlo(params, n_caminhos=n_caminhos, semente=0, prob_lance=prob_lance_mc, volatilidade_selic=volatilidade_mc)
+            col_r1, col_r2, col_r3 = st.columns(3)
+            col_r1.metric("Prob. do Consórcio Vencer", f"{resultado['prob_consorcio_vence']:.1%}")
+            col_r2.metric("Mês Médio de Contemplação", f"{resultado['mes_contemplacao_medio']:.0f}")
+            col_r3.metric("Custo Líquido Médio (Consórcio)", f"R$ {resultado['vp_consorcio_medio']:,.2f}")
+            st.plotly_chart(memoizacao.figura_monte_carlo(params, n_caminhos=n_caminhos, semente=0, prob_lance=prob_lance_mc, volatilidade_selic=volatilidade_mc), use_container_width=True)
+
+# --- Painel de Debug (oculto; abra com ?debug=1) ---
+if instrumentacao.esta_ativa():
+    instrumentacao.registra("app.rerun", time.perf_counter() - inicio_rerun)
+if modo_debug:
+    with st.expander("🛠️ Debug: Métricas de Desempenho", expanded=True):
+        coleta_ligada = st.toggle("Coletar métricas", value=instrumentacao.esta_ativa(),
+                                  help="Liga a coleta para o processo inteiro: todas as sessões passam a medir as chamadas do core. "
+                                       "Desligue ao terminar.")
+        if coleta_ligada != instrumentacao.esta_ativa():
+            instrumentacao.ativa(coleta_ligada)
+            st.rerun()
+        if coleta_ligada:
+            st.warning("Coleta ligada para todas as sessões deste servidor.")
+        st.caption("Chamadas, latência e tamanho das entradas das funções do core desde a última limpeza; "
+                   "resultados servidos pelos caches não passam pelas funções e aparecem só na tabela de caches.")
+        metricas = instrumentacao.metricas()
+        st.dataframe(formata_tabela_metricas(metricas))
+        st.dataframe(formata_tabela_caches(metricas))
+        col_d1, col_d2, col_d3 = st.columns(3)
+        col_d1.download_button("Exportar (Prometheus)", instrumentacao.exporta_prometheus(), file_name="metricas.prom", mime="text/plain")
+        col_d2.download_button("Exportar (JSON)", instrumentacao.exporta_json(), file_name="metricas.json", mime="application/json")
+        if col_d3.button("Zerar Métricas"):
+            instrumentacao.limpa()
@@ -0,0 +1,46 @@
+"""
+Benchmark da tabela de amortização: laço mês a mês (implementação anterior) vs. geração vetorizada.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_amortizacao
+"""
+import timeit
+
+import pandas as pd
+
+from core.calculations import calcula_parcela_price, gera_tabela_amortizacao, gera_tabela_amortizacao_em_blocos
+
+
+def gera_tabela_amortizacao_laco(valor_financiado: float, taxa_juros_anual: float, prazo_meses: int) -> pd.DataFrame:
+    """Implementação anterior (laço em Python), mantida apenas como referência de desempenho."""
+    taxa_juros_mensal = (1 + taxa_juros_anual)**(1/12) - 1
+    parcela = calcula_parcela_price(valor_financiado, taxa_juros_anual, prazo_meses)
+
+    saldo_devedor = valor_financiado
+    dados_tabela = []
+    for mes in range(1, prazo_meses + 1):
+        juros_periodo = saldo_devedor * taxa_juros_mensal
+        amortizacao = parcela - juros_periodo
+        saldo_devedor -= amortizacao
+        if mes == prazo_meses:
+            saldo_devedor = 0.0
+        dados_tabela.append({
+            "Mês": mes, "Parcela (R$)": parcela, "Juros (R$)": juros_periodo,
+            "Amortização (R$)": amortizacao, "Saldo Devedor (R$)": saldo_devedor
+        })
+    return pd.DataFrame(dados_tabela)
+
+
+def mede(funcao, repeticoes: int = 50) -> float:
+    """Retorna o melhor tempo médio (em ms) de `funcao` em 5 rodadas."""
+    return min(timeit.repeat(funcao, number=repeticoes, repeat=5)) / repeticoes * 1000
+
+
+if __name__ == "__main__":
+    valor, taxa = 240000, 0.115
+    print(f"{'Prazo':>6} | {'Laço (ms)':>10} | {'Vetorizado (ms)':>15} | {'Blocos (ms)':>11} | {'Ganho':>6}")
+    for prazo in (360, 420):
+        t_laco = mede(lambda: gera_tabela_amortizacao_laco(valor, taxa, prazo))
+        t_vetor = mede(lambda: gera_tabela_amortizacao(valor, taxa, prazo))
+        t_blocos = mede(lambda: sum(len(bloco) for bloco in gera_tabela_amortizacao_em_blocos(valor, taxa, prazo)))
+        print(f"{prazo:>6} | {t_laco:>10.3f} | {t_vetor:>15.3f} | {t_blocos:>11.3f} | {t_laco / t_vetor:>5.1f}x")
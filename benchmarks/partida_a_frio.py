@@ -0,0 +1,79 @@
+"""
+Tempo de partida a frio do app, como em um pod recém-criado pelo autoscaler.
+
+Cada rodada abre um interpretador novo, importa o Streamlit e os módulos do core usados pelo
+app.py e executa a primeira renderização (streamlit.testing.v1.AppTest, sem acesso à rede).
+O resultado é a mediana das rodadas por fase; o total inclui a subida do próprio interpretador.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.partida_a_frio --rodadas 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Meta da partida completa (interpretador + importações + primeira renderização), em segundos
+TEMPO_ALVO_SEGUNDOS = 4.0
+
+# Executado no interpretador novo: imprime o tempo de cada fase em JSON
+_CODIGO_PARTIDA = """
+import json, sys, time
+inicio = time.perf_counter()
+import streamlit
+streamlit_pronto = time.perf_counter()
+from core import memoizacao, servico, formatting, parametros
+core_pronto = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+from benchmarks.suite import modo_offline
+with modo_offline():
+    app = AppTest.from_file("app.py", default_timeout=120).run()
+fim = time.perf_counter()
+print(json.dumps({
+    "importa_streamlit": streamlit_pronto - inicio,
+    "importa_core": core_pronto - streamlit_pronto,
+    "primeira_renderizacao": fim - core_pronto,
+    "erros": len(app.exception)
+}))
+"""
+
+
+def mede_partida() -> dict:
+    """Uma partida a frio: fases (em segundos) medidas no interpretador novo, mais o total de fora."""
+    inicio = time.perf_counter()
+    processo = subprocess.run([sys.executable, "-c", _CODIGO_PARTIDA], cwd=RAIZ, capture_output=True, text=True, check=True)
+    total = time.perf_counter() - inicio
+    fases = json.loads(processo.stdout.strip().splitlines()[-1])
+    if fases.pop("erros"):
+        raise RuntimeError("O app.py lançou exceções na primeira renderização.")
+    return {**fases, "total": total}
+
+
+def mede_partidas(rodadas: int = 5) -> dict:
+    """Mediana de cada fase em `rodadas` partidas a frio."""
+    medidas = [mede_partida() for _ in range(rodadas)]
+    return {fase: statistics.median(medida[fase] for medida in medidas) for fase in medidas[0]}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.partida_a_frio", description="Mede a partida a frio do app.")
+    parser.add_argument("--rodadas", type=int, default=5, help="Número de partidas medidas (padrão: 5)")
+    args = parser.parse_args(argv)
+
+    medianas = mede_partidas(args.rodadas)
+    for fase, segundos in medianas.items():
+        print(f"{fase:<24}| {segundos:8.3f} s")
+    if medianas["total"] > TEMPO_ALVO_SEGUNDOS:
+        print(f"Acima da meta de {TEMPO_ALVO_SEGUNDOS:.1f} s.")
+        return 1
+    print(f"Dentro da meta de {TEMPO_ALVO_SEGUNDOS:.1f} s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+Suíte de benchmarks do core (calculations e analysis) com baseline gravado em disco.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.suite                    # mede e compara com benchmarks/baseline.json
+    python -m benchmarks.suite --grava-baseline   # mede e regrava o baseline
+    python -m benchmarks.suite --filtro lote      # só os casos cujo nome contém "lote"
+
+Os tempos são normalizados por uma carga de calibração fixa (NumPy + laço em Python) medida junto
+com cada caso, para que o baseline gravado em uma máquina sirva de referência em outra. Casos de
+uso interativo têm também um orçamento absoluto (ORCAMENTOS_MS), independente do baseline.
+Roda sem rede: a busca da Selic (core.data_fetcher) é substituída pela taxa padrão.
+"""
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import os
+import platform
+import sys
+import timeit
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from core import calculations, analysis, data_fetcher, monte_carlo
+from core.curvas import curva_constante, curvas_selic_padrao
+
+CAMINHO_BASELINE = Path(__file__).with_name("baseline.json")
+# Um caso regrediu se o tempo normalizado passar de LIMITE_REGRESSAO × o do baseline
+LIMITE_REGRESSAO = float(os.environ.get("BENCH_LIMITE", 2.0))
+# Duração mínima de cada rodada de medição, em segundos
+DURACAO_RODADA = 0.02
+
+PRAZOS = (12, 120, 420)
+TAMANHOS_LOTE = (1, 1_000, 1_000_000)
+# A TIR em lote é iterativa (~7 µs por fluxo): 1M de fluxos tornaria a suíte lenta demais
+TAMANHO_MAXIMO_LOTE_TIR = 10_000
+# Orçamento absoluto (ms) dos casos que rodam a cada clique no app: acima dele, o caso falha.
+# A simulação de Monte Carlo roda no app com 100.000 caminhos por padrão
+ORCAMENTOS_MS = {
+    "monte_carlo[n=100000]": 750.0
+}
+
+PARAMS = {
+    'valor_bem': 300000, 'valor_entrada': 60000, 'valor_a_financiar': 240000,
+    'taxa_juros_anual_fin': 0.115, 'prazo_meses_fin': 360,
+    'taxa_selic_anual': data_fetcher.TAXA_SELIC_PADRAO, 'prazo_meses_con': 180,
+    'taxa_adm_total': 18.0, 'fundo_reserva_total': 1.0
+}
+
+
+@contextlib.contextmanager
+def modo_offline(taxa_selic: float = data_fetcher.TAXA_SELIC_PADRAO):
+    """Substitui a busca da Selic por uma taxa fixa e desliga a atualização pela rede."""
+    with mock.patch.object(data_fetcher, "busca_taxa_selic_atual", return_value=taxa_selic), \
+         mock.patch.object(data_fetcher, "ultima_taxa_selic", return_value=(taxa_selic, None)), \
+         mock.patch.object(data_fetcher, "atualiza_serie_selic_em_segundo_plano", return_value=None):
+        yield
+
+
+# --- CASOS ---
+
+def _cotacoes(n: int, semente: int = 0) -> dict:
+    """Lote sintético de `n` cotações com prazos e taxas realistas."""
+    rng = np.random.default_rng(semente)
+    valor_bem = rng.integers(50, 1000, n) * 1000.0
+    return {
+        'valor_bem': valor_bem,
+        'valor_entrada': valor_bem * rng.uniform(0.0, 0.5, n),
+        'taxa_juros_anual_fin': rng.uniform(0.06, 0.20, n),
+        'prazo_meses_fin': rng.integers(1, 36, n) * 12.0,
+        'prazo_meses_con': rng.integers(1, 21, n) * 12.0,
+        'taxa_adm_total': rng.uniform(10, 25, n),
+        'fundo_reserva_total': rng.uniform(0, 3, n),
+        'taxa_selic_anual': rng.uniform(0.05, 0.15, n)
+    }
+
+
+def monta_casos() -> list:
+    """
+    Lista de (nome, função medida, chamada sem argumentos). A função medida serve para
+    conferir que todas as funções públicas de calculations e analysis têm ao menos um caso.
+    """
+    c, a = calculations, analysis
+    p = PARAMS
+    selic = data_fetcher.busca_taxa_selic_atual()
+    parcela_con = c.calcula_parcela_consorcio(p['valor_bem'], p['prazo_meses_con'], p['taxa_adm_total'], p['fundo_reserva_total'])
+    params_cenario = {**p, 'taxa_selic_anual': selic, 'parcela_con': parcela_con}
+    params_monte_carlo = {**params_cenario, 'carta_credito': p['valor_bem']}
+    casos = []
+
+    for prazo in PRAZOS:
+        casos += [
+            (f"parcela_price[prazo={prazo}]", c.calcula_parcela_price, lambda prazo=prazo: c.calcula_parcela_price(240000, 0.115, prazo)),
+            (f"vp_financiamento[prazo={prazo}]", c.calcula_vp_custo_financiamento, lambda prazo=prazo: c.calcula_vp_custo_financiamento(60000, 240000, 0.115, prazo, selic)),
+            (f"parcela_consorcio[prazo={prazo}]", c.calcula_parcela_consorcio, lambda prazo=prazo: c.calcula_parcela_consorcio(300000, prazo, 18.0, 1.0)),
+            (f"vp_consorcio[prazo={prazo}]", c.calcula_vp_custo_consorcio, lambda prazo=prazo: c.calcula_vp_custo_consorcio(2000.0, prazo, selic)),
+            (f"fator_anuidade[prazo={prazo}]", c.fator_anuidade_antecipada, lambda prazo=prazo: c.fator_anuidade_antecipada(0.008, prazo)),
+            (f"tabela_price[prazo={prazo}]", c.gera_tabela_amortizacao, lambda prazo=prazo: c.gera_tabela_amortizacao(240000, 0.115, prazo)),
+            (f"tabela_sac[prazo={prazo}]", c.gera_tabela_amortizacao, lambda prazo=prazo: c.gera_tabela_amortizacao(240000, 0.115, prazo, "sac")),
+            (f"tabela_em_blocos[prazo={prazo}]", c.gera_tabela_amortizacao_em_blocos, lambda prazo=prazo: sum(len(b) for b in c.gera_tabela_amortizacao_em_blocos(240000, 0.115, prazo))),
+            (f"exporta_csv[prazo={prazo}]", c.exporta_tabela_amortizacao_csv, lambda prazo=prazo: c.exporta_tabela_amortizacao_csv(io.StringIO(), 240000, 0.115, prazo)),
+            (f"estrategia_lance[prazo={prazo}]", a.simular_estrategia_lance, lambda prazo=prazo: a.simular_estrategia_lance(2000.0, prazo, 300000, 25, selic)),
+            (f"estrategia_venda[prazo={prazo}]", a.simular_estrategia_venda, lambda prazo=prazo: a.simular_estrategia_venda(2000.0, prazo // 2 or 1, 15, selic)),
+            (f"estrategia_aluguel[prazo={prazo}]", a.simular_estrategia_aluguel, lambda prazo=prazo: a.simular_estrategia_aluguel(2000.0, prazo, prazo // 4, 1500.0, selic)),
+        ]
+
+    for n in TAMANHOS_LOTE:
+        q = _cotacoes(n)
+        financiado = q['valor_bem'] - q['valor_entrada']
+        parcelas = c.calcula_parcela_consorcio_lote(q['valor_bem'], q['prazo_meses_con'], q['taxa_adm_total'], q['fundo_reserva_total'])
+        meses = np.maximum(q['prazo_meses_con'] // 2, 1)
+        casos += [
+            (f"fator_anuidade_lote[n={n}]", c.fator_anuidade_lote, lambda q=q: c.fator_anuidade_lote(selic, q['prazo_meses_con'])),
+            (f"fator_desconto_lote[n={n}]", c.fator_desconto_lote, lambda q=q: c.fator_desconto_lote(q['taxa_selic_anual'].round(3), q['prazo_meses_con'])),
+            (f"taxa_mensal_lote[n={n}]", c.taxa_anual_para_mensal, lambda q=q: c.taxa_anual_para_mensal(q['taxa_selic_anual'])),
+            (f"parcela_price_lote[n={n}]", c.calcula_parcela_price_lote, lambda q=q, f=financiado: c.calcula_parcela_price_lote(f, q['taxa_juros_anual_fin'], q['prazo_meses_fin'])),
+            (f"vp_financiamento_lote[n={n}]", c.calcula_vp_custo_financiamento_lote, lambda q=q, f=financiado: c.calcula_vp_custo_financiamento_lote(q['valor_entrada'], f, q['taxa_juros_anual_fin'], q['prazo_meses_fin'], q['taxa_selic_anual'])),
+            (f"parcela_consorcio_lote[n={n}]", c.calcula_parcela_consorcio_lote, lambda q=q: c.calcula_parcela_consorcio_lote(q['valor_bem'], q['prazo_meses_con'], q['taxa_adm_total'], q['fundo_reserva_total'])),
+            (f"vp_consorcio_lote_selic_unica[n={n}]", c.calcula_vp_custo_consorcio_lote, lambda q=q, pc=parcelas: c.calcula_vp_custo_consorcio_lote(pc, q['prazo_meses_con'], selic)),
+            (f"vp_consorcio_lote[n={n}]", c.calcula_vp_custo_consorcio_lote, lambda q=q, pc=parcelas: c.calcula_vp_custo_consorcio_lote(pc, q['prazo_meses_con'], q['taxa_selic_anual'])),
+        ]
+        n_tir = min(n, TAMANHO_MAXIMO_LOTE_TIR)
+        casos.append((f"estrategia_venda_lote[n={n_tir}]", a.simular_estrategia_venda_lote,
+                      lambda pc=parcelas[:n_tir], m=meses[:n_tir]: a.simular_estrategia_venda_lote(pc, m, 15, selic)))
+        amostra = {nome: valores[:n_tir] for nome, valores in q.items()}
+        casos += [
+            (f"break_even_lote[{parametro},n={n_tir}]", a.calcula_break_even_lote, lambda parametro=parametro, amostra=amostra: a.calcula_break_even_lote(amostra, parametro))
+            for parametro in ('taxa_selic_anual', 'prazo_meses_fin', 'valor_entrada')
+        ]
+
+    grade_2d = {'taxa_juros_anual_fin': np.arange(0.01, 0.2501, 0.0025), 'taxa_selic_anual': np.arange(0.01, 0.2001, 0.0025)}
+    grade_3d = {**grade_2d, 'prazo_meses_con': np.arange(12, 241, 12)}
+    resultado_2d = a.run_sensitivity_grid(p, grade_2d)
+    resultado_3d = a.run_sensitivity_grid(p, grade_3d)
+    curvas = curvas_selic_padrao(selic, max(PRAZOS))
+    indexador = curva_constante(0.05, max(PRAZOS))
+    prazos_lote = _cotacoes(1_000_000)['prazo_meses_con']
+    casos += [
+        ("cenarios", a.run_scenario_analysis, lambda: a.run_scenario_analysis(params_cenario)),
+        ("grade_sensibilidade[2d]", a.run_sensitivity_grid, lambda: a.run_sensitivity_grid(p, grade_2d)),
+        ("grade_sensibilidade[3d]", a.run_sensitivity_grid, lambda: a.run_sensitivity_grid(p, grade_3d)),
+        ("fronteira_break_even[2d]", a.calcula_fronteira_break_even, lambda: a.calcula_fronteira_break_even(resultado_2d, 'taxa_selic_anual')),
+        ("fronteira_break_even[3d]", a.calcula_fronteira_break_even, lambda: a.calcula_fronteira_break_even(resultado_3d, 'taxa_selic_anual')),
+        ("grade_venda[240x61]", a.simular_estrategia_venda_grade, lambda: a.simular_estrategia_venda_grade(2000.0, np.arange(1, 241), np.arange(-10, 51), selic)),
+        ("analise_curvas[3]", a.run_curve_analysis, lambda: a.run_curve_analysis(params_cenario, curvas)),
+        ("vp_financiamento_curva[n=1000000]", c.calcula_vp_custo_financiamento_curva, lambda: c.calcula_vp_custo_financiamento_curva(60000, 240000, 0.115, prazos_lote, curvas["Selic Constante"])),
+        ("vp_consorcio_curva[n=1000000]", c.calcula_vp_custo_consorcio_curva, lambda: c.calcula_vp_custo_consorcio_curva(2000.0, prazos_lote, curvas["Queda Gradual (Focus)"], indexador)),
+        ("break_even[taxa_juros_anual_fin]", a.calcula_break_even, lambda: a.calcula_break_even(params_cenario, 'taxa_juros_anual_fin')),
+        ("otimiza_lance[240x201]", a.otimiza_lance, lambda: a.otimiza_lance(2000.0, 240, 400000, selic, lance_minimo_vencedor=40)),
+        ("monte_carlo[n=100000]", monte_carlo.simula_monte_carlo_consorcio,
+         lambda: monte_carlo.simula_monte_carlo_consorcio(params_monte_carlo, n_caminhos=100_000, semente=0)),
+    ]
+    return casos
+
+
+def funcoes_publicas(modulo) -> set:
+    """Funções públicas definidas no próprio módulo (sem as importadas de outros)."""
+    return {nome for nome, objeto in inspect.getmembers(modulo, inspect.isfunction)
+            if not nome.startswith("_") and objeto.__module__ == modulo.__name__}
+
+
+# --- MEDIÇÃO ---
+
+_X_CALIBRACAO = np.linspace(0.0, 1.0, 10_000)
+
+def _calibracao():
+    # Carga fixa que mistura operações vetoriais do NumPy e laço em Python, como o core.
+    # Os dados cabem no cache da CPU: alocar arrays grandes aqui deixaria a calibração ruidosa
+    total = 0.0
+    for _ in range(50):
+        total += float(np.expm1(_X_CALIBRACAO).sum())
+    for i in range(5_000):
+        total += i * 0.5
+    return total
+
+
+def mede(funcao, rodadas: int = 5) -> float:
+    """Melhor tempo médio (em ms) de `funcao` em `rodadas` de pelo menos DURACAO_RODADA segundos."""
+    timer = timeit.Timer(funcao)
+    inicio = timeit.default_timer()
+    funcao()
+    duracao = max(timeit.default_timer() - inicio, 1e-7)
+    repeticoes = max(1, int(DURACAO_RODADA / duracao))
+    return min(timer.repeat(repeat=rodadas, number=repeticoes)) / repeticoes * 1000
+
+
+def mede_relativo(funcao) -> dict:
+    """
+    Mede `funcao` e a carga de calibração logo em seguida. A velocidade da máquina varia durante
+    a execução (frequência da CPU, vizinhos na mesma máquina), então cada caso usa a sua calibração.
+    """
+    ms = mede(funcao)
+    calibracao = mede(_calibracao, rodadas=3)
+    return {'ms': ms, 'relativo': ms / calibracao}
+
+
+def executa(filtro: str = None) -> dict:
+    """Mede todos os casos (offline). Retorna {'casos': {nome: {'ms', 'relativo'}}}."""
+    with modo_offline():
+        casos = monta_casos()
+        return {'casos': {nome: mede_relativo(chamada) for nome, _, chamada in casos if not filtro or filtro in nome}}
+
+
+def carrega_baseline(caminho: Path = CAMINHO_BASELINE) -> dict:
+    if not Path(caminho).exists():
+        return {'casos': {}}
+    return json.loads(Path(caminho).read_text(encoding="utf-8"))
+
+
+def grava_baseline(medicao: dict, caminho: Path = CAMINHO_BASELINE) -> None:
+    conteudo = {
+        'ambiente': {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__, 'maquina': platform.machine()},
+        **medicao
+    }
+    Path(caminho).write_text(json.dumps(conteudo, indent=2, ensure_ascii=False, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def compara(medicao: dict, baseline: dict, limite: float = LIMITE_REGRESSAO) -> list:
+    """Retorna (nome, razão) dos casos cujo tempo normalizado passou de `limite` × o baseline."""
+    regressoes = []
+    for nome, atual in medicao['casos'].items():
+        referencia = baseline['casos'].get(nome)
+        if referencia is None:
+            continue
+        razao = atual['relativo'] / referencia['relativo']
+        if razao > limite:
+            regressoes.append((nome, razao))
+    return regressoes
+
+
+def acima_do_orcamento(medicao: dict, orcamentos: dict = ORCAMENTOS_MS) -> list:
+    """Retorna (nome, ms, orçamento) dos casos medidos que passaram do orçamento absoluto."""
+    return [(nome, medicao['casos'][nome]['ms'], orcamento) for nome, orcamento in orcamentos.items()
+            if nome in medicao['casos'] and medicao['casos'][nome]['ms'] > orcamento]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Benchmarks do core com comparação contra o baseline.")
+    parser.add_argument("--grava-baseline", action="store_true", help="Regrava benchmarks/baseline.json com esta medição")
+    parser.add_argument("--filtro", default=None, help="Mede só os casos cujo nome contém este texto")
+    args = parser.parse_args(argv)
+
+    medicao = executa(args.filtro)
+    baseline = carrega_baseline()
+    print(f"{'Caso':<36} | {'Tempo (ms)':>11} | {'vs. baseline':>12}")
+    for nome, atual in medicao['casos'].items():
+        referencia = baseline['casos'].get(nome)
+        comparacao = f"{atual['relativo'] / referencia['relativo']:>11.2f}x" if referencia else f"{'(novo)':>12}"
+        print(f"{nome:<36} | {atual['ms']:>11.4f} | {comparacao}")
+
+    if args.grava_baseline:
+        if args.filtro:
+            medicao = {**medicao, 'casos': {**baseline['casos'], **medicao['casos']}}
+        grava_baseline(medicao)
+        print(f"Baseline gravado em {CAMINHO_BASELINE}.")
+        return 0
+
+    regressoes = compara(medicao, baseline)
+    for nome, razao in regressoes:
+        print(f"REGRESSÃO: {nome} está {razao:.2f}x mais lento que o baseline (limite {LIMITE_REGRESSAO:.2f}x).")
+    estouros = acima_do_orcamento(medicao)
+    for nome, ms, orcamento in estouros:
+        print(f"ORÇAMENTO: {nome} levou {ms:.1f} ms (orçamento {orcamento:.0f} ms).")
+    return 1 if regressoes or estouros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,34 @@
+import numpy as np
 import pandas as pd
-import numpy_financial as npf
-from .calculations import calcula_vp_custo_financiamento, calcula_vp_custo_consorcio
+from .calculations import (
+    taxa_anual_para_mensal, fator_anuidade_antecipada, fator_anuidade_lote, fator_desconto_lote,
+    calcula_parcela_consorcio_lote, calcula_vp_custo_financiamento_lote, calcula_vp_custo_consorcio_lote,
+    calcula_vp_custo_financiamento_curva, calcula_vp_custo_consorcio_curva
+)
+from .curvas import curva_constante_compartilhada
+from .solvers import newton_bissecao_lote, calcula_tir_lote
+from .instrumentacao import instrumenta
 
+# Tamanho das entradas registrado pela instrumentação (core.instrumentacao)
+def _tamanho_grade(params, eixos):
+    return int(np.prod([len(valores) for valores in eixos.values()]))
+
+def _tamanho_grade_venda(parcela, meses_contemplacao, agios_venda_percentuais, *args, **kwargs):
+    return np.size(meses_contemplacao) * np.size(agios_venda_percentuais)
+
+def _tamanho_lote(params, *args, **kwargs):
+    return max(np.size(params[nome]) for nome in params)
+
+@instrumenta()
 def run_scenario_analysis(params: dict) -> pd.DataFrame:
     """
     Executa a análise de sensibilidade com base em variações da taxa de desconto.
 
     A análise de cenário considera o efeito da mudança de parâmetros-chave
     [cite_start]no resultado de um projeto ou decisão financeira. [cite: 1915]
+
+    Retorna um DataFrame NUMÉRICO (taxas em decimal, custos em R$ como float);
+    a formatação para exibição fica em `core.formatting.formata_tabela_cenarios`.
     """
     base_discount_rate = params['taxa_selic_anual']
 
@@ -17,47 +38,298 @@ def run_scenario_analysis(params: dict) -> pd.DataFrame:
         "Realista (Selic Atual)": base_discount_rate,
         "Otimista (Selic Cai)": max(0.01, base_discount_rate - 0.02)
     }
-    
-    results = []
-    
-    # Recalcula os VPs para cada cenário
-    for name, rate in scenarios.items():
-        vp_fin = calcula_vp_custo_financiamento(
-            valor_entrada=params['valor_entrada'],
-            valor_financiado=params['valor_a_financiar'],
-            taxa_juros_anual=params['taxa_juros_anual_fin'],
-            prazo_meses=params['prazo_meses_fin'],
-            taxa_desconto_anual=rate
-        )
-        
-        vp_con = calcula_vp_custo_consorcio(
-            parcela=params['parcela_con'],
-            prazo=params['prazo_meses_con'],
-            taxa_desconto_anual=rate
+    rates = np.array(list(scenarios.values()))
+
+    # Recalcula os VPs de todos os cenários de uma só vez
+    vp_fin = calcula_vp_custo_financiamento_lote(
+        params['valor_entrada'], params['valor_a_financiar'],
+        params['taxa_juros_anual_fin'], params['prazo_meses_fin'], rates
+    )
+    vp_con = np.abs(calcula_vp_custo_consorcio_lote(params['parcela_con'], params['prazo_meses_con'], rates))
+
+    return pd.DataFrame({
+        "Taxa Selic Anual": rates,
+        "VP Custo Financiamento (R$)": vp_fin,
+        "VP Custo Consórcio (R$)": vp_con,
+        "Melhor Opção": np.where(vp_fin < vp_con, "Financiamento", "Consórcio")
+    }, index=pd.Index(list(scenarios), name="Cenário"))
+
+
+@instrumenta(tamanho="curvas")
+def run_curve_analysis(params: dict, curvas: dict, indexador_consorcio=None, indexador_financiamento=None) -> pd.DataFrame:
+    """
+    Compara os custos em VP sob várias curvas de desconto (ex: Selic constante, queda pelo Focus, alta).
+
+    `curvas` mapeia nomes para core.curvas.CurvaDeTaxas. Opcionalmente, as parcelas do consórcio
+    (IGPM/INCC) e do financiamento (TR) são corrigidas pelas curvas dos indexadores.
+    Retorna um DataFrame no mesmo formato de run_scenario_analysis, com a taxa anual constante
+    equivalente de cada curva no prazo mais longo.
+    """
+    horizonte = max(params['prazo_meses_fin'], params['prazo_meses_con'])
+    linhas = []
+    for curva in curvas.values():
+        vp_fin = calcula_vp_custo_financiamento_curva(
+            params['valor_entrada'], params['valor_a_financiar'], params['taxa_juros_anual_fin'],
+            params['prazo_meses_fin'], curva, indexador_financiamento
         )
-        
-        best_option = "Financiamento" if vp_fin < abs(vp_con) else "Consórcio"
-        
-        results.append({
-            "Cenário": name,
-            "Taxa Selic Anual": f"{rate:.2%}",
-            "VP Custo Financiamento (R$)": f"{vp_fin:,.2f}",
-            "VP Custo Consórcio (R$)": f"{abs(vp_con):,.2f}",
-            "Melhor Opção": best_option
-        })
-        
-    return pd.DataFrame(results).set_index("Cenário")
+        vp_con = abs(calcula_vp_custo_consorcio_curva(params['parcela_con'], params['prazo_meses_con'], curva, indexador_consorcio))
+        linhas.append((curva.taxa_anual_equivalente(horizonte), float(vp_fin), float(vp_con)))
+
+    taxas, vp_fin, vp_con = (np.array(coluna) for coluna in zip(*linhas))
+    return pd.DataFrame({
+        "Taxa Selic Anual": taxas,
+        "VP Custo Financiamento (R$)": vp_fin,
+        "VP Custo Consórcio (R$)": vp_con,
+        "Melhor Opção": np.where(vp_fin < vp_con, "Financiamento", "Consórcio")
+    }, index=pd.Index(list(curvas), name="Curva"))
+
+
+# --- GRADE DE SENSIBILIDADE (N-D) ---
+
+# Parâmetros de `params` que podem virar eixos da grade
+EIXOS_GRADE = (
+    'taxa_selic_anual', 'taxa_juros_anual_fin', 'prazo_meses_fin', 'valor_entrada',
+    'prazo_meses_con', 'taxa_adm_total', 'fundo_reserva_total'
+)
+
+@instrumenta(tamanho=_tamanho_grade)
+def run_sensitivity_grid(params: dict, eixos: dict) -> pd.DataFrame:
+    """
+    Avalia o VP do financiamento e do consórcio sobre uma malha N-D de parâmetros.
+
+    `eixos` mapeia nomes de EIXOS_GRADE para sequências de valores (ex: Selic × taxa do
+    financiamento × prazo). Os demais parâmetros vêm de `params`. Toda a malha é calculada
+    em uma única passada vetorizada (broadcasting), sem laço por cenário.
+    Retorna um DataFrame numérico com um MultiIndex na ordem de `eixos`.
+    """
+    invalidos = [nome for nome in eixos if nome not in EIXOS_GRADE]
+    if invalidos:
+        raise ValueError(f"Eixos inválidos para a grade: {invalidos}. Use um de {EIXOS_GRADE}.")
+
+    nomes = list(eixos)
+    valores = [np.asarray(eixos[nome], dtype=float) for nome in nomes]
+    # Malha esparsa: cada eixo ocupa uma dimensão e o broadcasting monta o produto cartesiano
+    malha = dict(zip(nomes, np.meshgrid(*valores, indexing='ij', sparse=True)))
+    p = {nome: malha.get(nome, params[nome]) for nome in EIXOS_GRADE}
+
+    parcela_con = calcula_parcela_consorcio_lote(params['valor_bem'], p['prazo_meses_con'], p['taxa_adm_total'], p['fundo_reserva_total'])
+    vp_fin = calcula_vp_custo_financiamento_lote(
+        p['valor_entrada'], params['valor_bem'] - p['valor_entrada'],
+        p['taxa_juros_anual_fin'], p['prazo_meses_fin'], p['taxa_selic_anual']
+    )
+    vp_con = np.abs(calcula_vp_custo_consorcio_lote(parcela_con, p['prazo_meses_con'], p['taxa_selic_anual']))
+
+    formato = tuple(len(v) for v in valores)
+    vp_fin = np.broadcast_to(vp_fin, formato).ravel()
+    vp_con = np.broadcast_to(vp_con, formato).ravel()
+    return pd.DataFrame({
+        "VP Custo Financiamento (R$)": vp_fin,
+        "VP Custo Consórcio (R$)": vp_con,
+        "Diferença (R$)": vp_fin - vp_con,
+        "Melhor Opção": np.where(vp_fin < vp_con, "Financiamento", "Consórcio")
+    }, index=pd.MultiIndex.from_product(valores, names=nomes))
+
+
+@instrumenta(tamanho="grade")
+def calcula_fronteira_break_even(grade: pd.DataFrame, eixo: str):
+    """
+    Encontra, ao longo de `eixo`, o valor em que a melhor opção se inverte (VPs iguais).
+
+    Usa interpolação linear entre os dois pontos da grade em que a diferença troca de sinal.
+    Retorna uma Series indexada pelos demais eixos (NaN onde não há inversão no intervalo)
+    ou um float, se a grade tiver um único eixo.
+    """
+    nomes = list(grade.index.names)
+    niveis = [grade.index.get_level_values(nome).unique().to_numpy() for nome in nomes]
+    posicao = nomes.index(eixo)
+
+    diferenca = grade["Diferença (R$)"].to_numpy().reshape([len(nivel) for nivel in niveis])
+    diferenca = np.moveaxis(diferenca, posicao, -1)
+    ordem = np.argsort(niveis[posicao])
+    x = niveis[posicao][ordem]
+    diferenca = diferenca[..., ordem]
+
+    sinal = np.sign(diferenca)
+    troca = sinal[..., :-1] != sinal[..., 1:]
+    indice = np.argmax(troca, axis=-1)[..., np.newaxis]
+    d0 = np.take_along_axis(diferenca, indice, axis=-1)[..., 0]
+    d1 = np.take_along_axis(diferenca, indice + 1, axis=-1)[..., 0]
+    x0, x1 = x[indice[..., 0]], x[indice[..., 0] + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fronteira = np.where(d1 == d0, x0, x0 - d0 * (x1 - x0) / (d1 - d0))
+    fronteira = np.where(troca.any(axis=-1), fronteira, np.nan)
+
+    outros = [nome for nome in nomes if nome != eixo]
+    if not outros:
+        return float(fronteira)
+    if len(outros) == 1:
+        indice_saida = pd.Index(niveis[nomes.index(outros[0])], name=outros[0])
+    else:
+        indice_saida = pd.MultiIndex.from_product([niveis[nomes.index(nome)] for nome in outros], names=outros)
+    return pd.Series(fronteira.ravel(), index=indice_saida, name=f"Break-even {eixo}")
+
+
+# --- BREAK-EVEN (PONTO DE EMPATE) ---
+
+# Parâmetros que calcula_break_even_lote sabe resolver
+PARAMETROS_BREAK_EVEN = (
+    'taxa_selic_anual', 'taxa_juros_anual_fin', 'taxa_adm_total', 'valor_entrada', 'prazo_meses_con', 'prazo_meses_fin'
+)
+# Intervalos de busca padrão (taxas em decimal, tx. adm. em %, prazos em meses); a entrada é
+# sempre buscada entre 0 e o valor do bem
+INTERVALOS_BREAK_EVEN = {
+    'taxa_selic_anual': (0.0, 1.0), 'taxa_juros_anual_fin': (0.0, 1.0), 'taxa_adm_total': (0.0, 50.0),
+    'prazo_meses_con': (1.0, 600.0), 'prazo_meses_fin': (1.0, 600.0)
+}
+# Pontos da varredura que localiza as trocas de sinal antes do Newton: a diferença de VPs pode cruzar
+# zero mais de uma vez no intervalo (ex: Selic de 10% e de 36%), e aí os extremos têm o mesmo sinal
+PONTOS_VARREDURA_BREAK_EVEN = 41
+
+def _anuidade_e_derivadas(taxa_mensal, prazo) -> tuple:
+    """Fator de anuidade antecipada A(m, n) e as derivadas dA/dm e dA/dn, em forma fechada."""
+    m = np.asarray(taxa_mensal, dtype=float)
+    log = np.log1p(m)
+    q = np.exp(-prazo * log)
+    anuidade = fator_anuidade_antecipada(m, prazo)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d_taxa = np.where(m == 0, -prazo * (prazo - 1) / 2, (q * (1 + prazo * m) - 1) / m**2)
+        d_prazo = np.where(m == 0, 1.0, (1 + m) * q * log / m)
+    return anuidade, d_taxa, d_prazo
+
+def _price_e_derivadas(taxa_mensal, prazo) -> tuple:
+    """Parcela Price por real financiado k(m, n) = m / (1 - (1 + m)**-n) e as derivadas dk/dm e dk/dn."""
+    m = np.asarray(taxa_mensal, dtype=float)
+    log = np.log1p(m)
+    q = np.exp(-prazo * log)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.where(m == 0, 1 / prazo, m / (1 - q))
+        d_taxa = np.where(m == 0, (prazo + 1) / (2 * prazo), ((1 - q) - m * prazo * q / (1 + m)) / (1 - q)**2)
+        d_prazo = np.where(m == 0, -1 / prazo**2, -m * q * log / (1 - q)**2)
+    return k, d_taxa, d_prazo
+
+def _derivada_taxa_mensal(taxa_anual):
+    # d/di [(1 + i)**(1/12) - 1]
+    return (1 + taxa_anual)**(-11 / 12) / 12
+
+def _diferenca_vp_valor(p: dict) -> np.ndarray:
+    """Só a diferença de _diferenca_vp, sem as derivadas (usada na varredura do break-even)."""
+    selic = taxa_anual_para_mensal(p['taxa_selic_anual'])
+    k = _price_e_derivadas(taxa_anual_para_mensal(p['taxa_juros_anual_fin']), p['prazo_meses_fin'])[0]
+    total_con = p['valor_bem'] * (1 + p['taxa_adm_total'] / 100 + p['fundo_reserva_total'] / 100)
+    return (p['valor_entrada'] + (p['valor_bem'] - p['valor_entrada']) * k * fator_anuidade_antecipada(selic, p['prazo_meses_fin'])
+            - total_con * fator_anuidade_antecipada(selic, p['prazo_meses_con']) / p['prazo_meses_con'])
+
+def _diferenca_vp(p: dict, parametro: str) -> tuple:
+    """
+    VP do financiamento - VP do consórcio (cenário realista) e a derivada em relação a `parametro`.
+    Mesma convenção de calcula_vp_custo_*_lote: parcelas a partir de t=0, taxas mensais efetivas.
+    """
+    selic = taxa_anual_para_mensal(p['taxa_selic_anual'])
+    juros = taxa_anual_para_mensal(p['taxa_juros_anual_fin'])
+    prazo_fin, prazo_con = p['prazo_meses_fin'], p['prazo_meses_con']
+    financiado = p['valor_bem'] - p['valor_entrada']
+    total_con = p['valor_bem'] * (1 + p['taxa_adm_total'] / 100 + p['fundo_reserva_total'] / 100)
+
+    a_fin, da_fin_taxa, da_fin_prazo = _anuidade_e_derivadas(selic, prazo_fin)
+    a_con, da_con_taxa, da_con_prazo = _anuidade_e_derivadas(selic, prazo_con)
+    k, dk_taxa, dk_prazo = _price_e_derivadas(juros, prazo_fin)
+    diferenca = p['valor_entrada'] + financiado * k * a_fin - total_con * a_con / prazo_con
+
+    if parametro == 'taxa_selic_anual':
+        derivada = (financiado * k * da_fin_taxa - total_con * da_con_taxa / prazo_con) * _derivada_taxa_mensal(p['taxa_selic_anual'])
+    elif parametro == 'taxa_juros_anual_fin':
+        derivada = financiado * a_fin * dk_taxa * _derivada_taxa_mensal(p['taxa_juros_anual_fin'])
+    elif parametro == 'prazo_meses_fin':
+        derivada = financiado * (dk_prazo * a_fin + k * da_fin_prazo)
+    else:
+        derivada = -total_con * (da_con_prazo * prazo_con - a_con) / prazo_con**2
+    return diferenca, derivada
+
+@instrumenta(tamanho=_tamanho_lote)
+def calcula_break_even_lote(params, parametro: str, intervalo: tuple = None) -> np.ndarray:
+    """
+    Valor de `parametro` em que o VP do financiamento e o do consórcio empatam, para várias
+    cotações de uma só vez.
+
+    `params` é um dict (ou DataFrame) com valor_bem e os parâmetros de EIXOS_GRADE; os valores
+    podem ser escalares ou arrays (com broadcasting). Falta de algum deles gera KeyError. O valor
+    atual de `parametro` é opcional: quando há mais de um empate no intervalo, vale o mais próximo dele.
+    - 'taxa_adm_total' e 'valor_entrada' entram linearmente nos VPs: solução em forma fechada.
+    - Selic, taxa do financiamento e prazos: varredura de PONTOS_VARREDURA_BREAK_EVEN pontos em
+      `intervalo` (padrão: INTERVALOS_BREAK_EVEN) para achar as trocas de sinal, e Newton com as
+      derivadas analíticas dos VPs, protegido por bissecção, na troca escolhida. Prazos saem em meses
+      fracionários.
+    Onde não há empate (no intervalo ou no domínio do parâmetro) o resultado é NaN.
+    """
+    if parametro not in PARAMETROS_BREAK_EVEN:
+        raise ValueError(f"Parâmetro inválido para o break-even: '{parametro}'. Use um de {PARAMETROS_BREAK_EVEN}.")
+    nomes = ('valor_bem',) + EIXOS_GRADE
+    faltantes = [nome for nome in nomes if nome != parametro and nome not in params]
+    if faltantes:
+        raise KeyError(f"Parâmetros ausentes para o break-even: {faltantes}.")
+    p = {nome: np.asarray(params[nome], dtype=float) for nome in nomes if nome != parametro}
+    formato = np.broadcast_shapes(*(np.shape(v) for v in p.values()))
+    atual = np.broadcast_to(np.asarray(params[parametro], dtype=float), formato) if parametro in params else None
+
+    if parametro in ('taxa_adm_total', 'valor_entrada'):
+        selic = taxa_anual_para_mensal(p['taxa_selic_anual'])
+        a_fin = fator_anuidade_antecipada(selic, p['prazo_meses_fin'])
+        a_con = fator_anuidade_antecipada(selic, p['prazo_meses_con'])
+        k = _price_e_derivadas(taxa_anual_para_mensal(p['taxa_juros_anual_fin']), p['prazo_meses_fin'])[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if parametro == 'taxa_adm_total':
+                vp_fin = p['valor_entrada'] + (p['valor_bem'] - p['valor_entrada']) * k * a_fin
+                raiz = 100 * (vp_fin * p['prazo_meses_con'] / (p['valor_bem'] * a_con) - 1) - p['fundo_reserva_total']
+                baixo, alto = INTERVALOS_BREAK_EVEN[parametro] if intervalo is None else intervalo
+                no_dominio = (raiz >= baixo) & (raiz <= alto)
+            else:
+                vp_con = p['valor_bem'] * (1 + p['taxa_adm_total'] / 100 + p['fundo_reserva_total'] / 100) * a_con / p['prazo_meses_con']
+                raiz = (vp_con - p['valor_bem'] * k * a_fin) / (1 - k * a_fin)
+                no_dominio = (raiz >= 0) & (raiz < p['valor_bem'])
+        return np.broadcast_to(np.where(no_dominio, raiz, np.nan), formato).copy()
+
+    baixo, alto = INTERVALOS_BREAK_EVEN[parametro] if intervalo is None else intervalo
+    # Varredura: diferença de VPs em cada ponto da grade, para todas as cotações de uma vez
+    grade = np.linspace(float(baixo), float(alto), PONTOS_VARREDURA_BREAK_EVEN).reshape((-1,) + (1,) * len(formato))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        sinais = np.sign(_diferenca_vp_valor({**p, parametro: grade}))
+    troca = (sinais[:-1] * sinais[1:] <= 0) & (sinais[:-1] != sinais[1:])
+    inicio, fim = np.broadcast_to(grade[:-1], troca.shape), np.broadcast_to(grade[1:], troca.shape)
+    # Entre as trocas de sinal, a mais próxima do valor atual (sem ele, a de menor valor)
+    distancia = np.zeros(troca.shape) if atual is None else np.maximum(np.maximum(inicio - atual, atual - fim), 0.0)
+    escolhida = np.argmin(np.where(troca, distancia, np.inf), axis=0)[np.newaxis]
+    tem_troca = troca.any(axis=0)
+    # Sem troca de sinal, um intervalo degenerado faz o resolvedor devolver NaN
+    baixo_escolhido = np.where(tem_troca, np.take_along_axis(inicio, escolhida, axis=0)[0], float(alto))
+    alto_escolhido = np.where(tem_troca, np.take_along_axis(fim, escolhida, axis=0)[0], float(alto))
+
+    ultimo = {}
+
+    def avalia(x):
+        # O resolvedor pede f(x) e f'(x) no mesmo x: calcula os dois de uma vez
+        if ultimo.get('x') is not x:
+            ultimo['x'], ultimo['valores'] = x, _diferenca_vp({**p, parametro: x}, parametro)
+        return ultimo['valores']
+
+    raiz, _ = newton_bissecao_lote(lambda x: avalia(x)[0], baixo_escolhido, alto_escolhido,
+                                   derivada=lambda x: avalia(x)[1], tolerancia=1e-10)
+    return np.where(tem_troca, raiz, np.nan)
+
+def calcula_break_even(params, parametro: str, intervalo: tuple = None) -> float:
+    """Ponto de empate de uma única cotação (ver calcula_break_even_lote)."""
+    return float(calcula_break_even_lote(params, parametro, intervalo))
 
 
 # --- NOVAS FUNÇÕES DE ESTRATÉGIA ---
 
-def simular_estrategia_lance(parcela: float, prazo: int, carta_credito: float, valor_lance_percentual: float, taxa_desconto_anual: float) -> dict:
+@instrumenta(tamanho="prazo")
+def simular_estrategia_lance(parcela: float, prazo: int, carta_credito: float, valor_lance_percentual: float, taxa_desconto_anual: float,
+                             curva_desconto=None) -> dict:
     """
     Simula o impacto de dar um lance para reduzir o prazo do consórcio.
-    Retorna o novo custo em Valor Presente.
+    Retorna o novo custo em Valor Presente. Com `curva_desconto` (core.curvas.CurvaDeTaxas),
+    desconta pela curva em vez da taxa única.
     """
-    taxa_desconto_mensal = (1 + taxa_desconto_anual)**(1/12) - 1
-    
     valor_do_lance = carta_credito * (valor_lance_percentual / 100)
     parcelas_abatidas = valor_do_lance / parcela
     novo_prazo = round(prazo - parcelas_abatidas)
@@ -65,56 +337,139 @@ def simular_estrategia_lance(parcela: float, prazo: int, carta_credito: float, v
     if novo_prazo <= 0:
         return {'custo_vp': carta_credito, 'novo_prazo': 0}
 
-    fluxo_de_caixa = [-parcela] * novo_prazo
-    custo_vp = abs(npf.npv(taxa_desconto_mensal, fluxo_de_caixa))
+    # Série uniforme de parcelas: VP pela soma acumulada dos fatores de desconto, sem montar a lista de fluxos
+    curva = curva_desconto if curva_desconto is not None else curva_constante_compartilhada(taxa_desconto_anual, novo_prazo)
+    custo_vp = abs(float(-parcela * curva.vp_anuidade(novo_prazo)))
     
     return {'custo_vp': custo_vp, 'novo_prazo': novo_prazo}
 
 
-def simular_estrategia_venda(parcela: float, mes_contemplacao: int, agio_venda_percentual: float, taxa_desconto_anual: float) -> dict:
+@instrumenta(tamanho="prazo")
+def otimiza_lance(parcela: float, prazo: int, carta_credito: float, taxa_desconto_anual: float,
+                  percentuais=None, meses_lance=None, lance_minimo_vencedor: float = None) -> dict:
+    """
+    Varre o percentual do lance (por padrão de 0% a 100%, de 0,5 em 0,5 p.p.) × o mês em que ele é
+    dado (por padrão 1..prazo) em uma única passada vetorizada e retorna o lance de menor custo.
+
+    Diferente de simular_estrategia_lance, o desembolso do lance entra no custo, descontado ao mês
+    em que é pago. O lance abate as últimas parcelas (no máximo as que ainda faltam pagar), sem
+    arredondar o número de parcelas abatidas.
+    Custo líquido em VP = parcelas + lance - carta recebida na contemplação. Sem lance vencedor, a
+    contemplação é no último mês (como no resultado principal); com `lance_minimo_vencedor` (% da carta),
+    lances a partir dele contemplam a cota no próprio mês do lance.
+
+    Retorna o percentual e o mês ótimos, o custo líquido mínimo, o novo prazo e a curva completa
+    (DataFrame indexado por mês × percentual; combinações impossíveis ficam com NaN).
+    """
+    percentuais = np.arange(0, 100.25, 0.5) if percentuais is None else np.asarray(percentuais, dtype=float)
+    meses = np.arange(1, prazo + 1) if meses_lance is None else np.asarray(meses_lance, dtype=int)
+    if np.any((meses < 1) | (meses > prazo)):
+        raise ValueError("O mês do lance deve estar entre 1 e o prazo do consórcio.")
+
+    taxa_desconto_mensal = taxa_anual_para_mensal(taxa_desconto_anual)
+    desconto = fator_desconto_lote(taxa_desconto_anual, meses[:, np.newaxis] - 1)
+    valor_do_lance = carta_credito * percentuais[np.newaxis, :] / 100
+
+    # O lance dado no mês m (junto com a m-ésima parcela) só pode abater as prazo - m parcelas restantes.
+    # O abatimento fracionário é mantido (sem arredondar o prazo), para a curva não ter degraus artificiais;
+    # por isso as parcelas usam o fator de anuidade em forma fechada, e não as curvas em cache
+    parcelas_abatidas = valor_do_lance / parcela
+    viavel = parcelas_abatidas <= prazo - meses[:, np.newaxis]
+    prazo_efetivo = np.maximum(prazo - parcelas_abatidas, meses[:, np.newaxis])
+    novo_prazo = np.ceil(prazo_efetivo - 1e-9)
+
+    custo_parcelas = parcela * fator_anuidade_antecipada(taxa_desconto_mensal, prazo_efetivo)
+    custo_lance = valor_do_lance * desconto
+    if lance_minimo_vencedor is None:
+        contemplado = np.zeros(novo_prazo.shape, dtype=bool)
+    else:
+        contemplado = np.broadcast_to(percentuais[np.newaxis, :] >= lance_minimo_vencedor, novo_prazo.shape)
+    desconto_contemplacao = np.where(contemplado, desconto, fator_desconto_lote(taxa_desconto_anual, prazo - 1))
+    custo_liquido = np.where(viavel, custo_parcelas + custo_lance - carta_credito * desconto_contemplacao, np.nan)
+
+    otimo = np.unravel_index(np.nanargmin(custo_liquido), custo_liquido.shape)
+    curva = pd.DataFrame({
+        "Custo Parcelas VP (R$)": np.where(viavel, custo_parcelas, np.nan).ravel(),
+        "Custo Lance VP (R$)": np.where(viavel, custo_lance, np.nan).ravel(),
+        "Custo Líquido VP (R$)": custo_liquido.ravel(),
+        "Novo Prazo": novo_prazo.ravel(),
+        "Contemplado": contemplado.ravel()
+    }, index=pd.MultiIndex.from_product([meses, percentuais], names=["Mês do Lance", "Lance (%)"]))
+    return {
+        'percentual_otimo': float(percentuais[otimo[1]]),
+        'mes_otimo': int(meses[otimo[0]]),
+        'custo_vp_otimo': float(custo_liquido[otimo]),
+        'novo_prazo_otimo': int(novo_prazo[otimo]),
+        'curva': curva
+    }
+
+
+def simular_estrategia_venda_lote(parcela, mes_contemplacao, agio_venda_percentual, taxa_desconto_anual, curva_desconto=None) -> dict:
+    """
+    Versão vetorizada de simular_estrategia_venda: aceita arrays (com broadcasting) de mês de
+    contemplação, ágio e taxa. Retorna arrays de VPL, TIR anual e se a TIR convergiu.
+    Com `curva_desconto`, o VPL é descontado pela curva (a TIR não depende do desconto).
+    """
+    parcela = np.asarray(parcela, dtype=float)
+    meses = np.asarray(mes_contemplacao, dtype=float)
+
+    valor_pago_ate_contemplacao = parcela * meses
+    valor_de_venda = valor_pago_ate_contemplacao * (1 + np.asarray(agio_venda_percentual, dtype=float) / 100)
+
+    # Fluxo: N saídas (parcelas) e 1 entrada (venda) no mesmo mês da última parcela paga.
+    # VPL = fluxo[0] + npv(taxa, fluxo[1:]), em forma fechada
+    if curva_desconto is not None:
+        vpl_demais = -parcela * curva_desconto.vp_anuidade(meses - 1) + valor_de_venda * curva_desconto.fator_desconto(np.maximum(meses - 2, 0))
+    else:
+        vpl_demais = -parcela * fator_anuidade_lote(taxa_desconto_anual, meses - 1) + valor_de_venda * fator_desconto_lote(taxa_desconto_anual, meses - 2)
+    vpl = np.where(meses > 1, -parcela + vpl_demais, valor_de_venda - parcela)
+
+    tir_mensal, convergiu = calcula_tir_lote(parcela, meses, valor_de_venda)
+    # Anualiza a TIR para melhor interpretação (NaN quando não há TIR)
+    tir_anual = (1 + tir_mensal) ** 12 - 1
+    return {'vpl': vpl, 'tir_anual': tir_anual, 'tir_convergiu': convergiu}
+
+
+@instrumenta(tamanho="mes_contemplacao")
+def simular_estrategia_venda(parcela: float, mes_contemplacao: int, agio_venda_percentual: float, taxa_desconto_anual: float, curva_desconto=None) -> dict:
     """
     Simula a venda da cota contemplada como um investimento.
     Retorna o VPL e a TIR da operação. [cite_start]O VPL é o valor presente da sequência de fluxos de caixa [cite: 936][cite_start], e a TIR é a taxa que iguala o VPL a zero. [cite: 1287, 1288]
+    Se a TIR não puder ser calculada, 'tir_anual' é NaN e 'tir_convergiu' é False.
     """
-    taxa_desconto_mensal = (1 + taxa_desconto_anual)**(1/12) - 1
-    
-    valor_pago_ate_contemplacao = parcela * mes_contemplacao
-    valor_de_venda = valor_pago_ate_contemplacao * (1 + agio_venda_percentual / 100)
-    
-    # Fluxo de caixa: N saídas (parcelas) e 1 entrada (venda) no final
-    fluxo_de_caixa = [-parcela] * mes_contemplacao
-    fluxo_de_caixa[-1] += valor_de_venda # A venda acontece no mesmo mês da última parcela paga
-    
-    vpl = npf.npv(taxa_desconto_mensal, fluxo_de_caixa[1:]) + fluxo_de_caixa[0]
-    
-    try:
-        tir_mensal = npf.irr(fluxo_de_caixa)
-        # Anualiza a TIR para melhor interpretação
-        tir_anual = (1 + tir_mensal) ** 12 - 1 if tir_mensal is not None else 0
-    except:
-        tir_anual = 0 # Retorna 0 se a TIR não puder ser calculada
+    resultado = simular_estrategia_venda_lote(parcela, mes_contemplacao, agio_venda_percentual, taxa_desconto_anual, curva_desconto)
+    return {
+        'vpl': float(resultado['vpl']),
+        'tir_anual': float(resultado['tir_anual']),
+        'tir_convergiu': bool(resultado['tir_convergiu'])
+    }
+
 
-    return {'vpl': vpl, 'tir_anual': tir_anual}
+@instrumenta(tamanho=_tamanho_grade_venda)
+def simular_estrategia_venda_grade(parcela: float, meses_contemplacao, agios_venda_percentuais, taxa_desconto_anual: float) -> pd.DataFrame:
+    """Varre mês de contemplação × ágio de venda em uma única chamada vetorizada."""
+    meses = np.asarray(meses_contemplacao, dtype=int)
+    agios = np.asarray(agios_venda_percentuais, dtype=float)
+    resultado = simular_estrategia_venda_lote(parcela, meses[:, np.newaxis], agios[np.newaxis, :], taxa_desconto_anual)
+    return pd.DataFrame({
+        "VPL (R$)": resultado['vpl'].ravel(),
+        "TIR Anual": resultado['tir_anual'].ravel(),
+        "TIR Convergiu": resultado['tir_convergiu'].ravel()
+    }, index=pd.MultiIndex.from_product([meses, agios], names=["Mês da Contemplação", "Ágio (%)"]))
 
 
-def simular_estrategia_aluguel(parcela: float, prazo: int, mes_contemplacao: int, valor_aluguel: float, taxa_desconto_anual: float) -> dict:
+@instrumenta(tamanho="prazo")
+def simular_estrategia_aluguel(parcela: float, prazo: int, mes_contemplacao: int, valor_aluguel: float, taxa_desconto_anual: float,
+                               curva_desconto=None) -> dict:
     """
     Simula a estratégia de alugar o bem após a contemplação.
     [cite_start]Retorna o VPL total da operação (custos e receitas). [cite: 936]
+    Com `curva_desconto` (core.curvas.CurvaDeTaxas), desconta pela curva em vez da taxa única.
     """
-    taxa_desconto_mensal = (1 + taxa_desconto_anual)**(1/12) - 1
-    
-    fluxo_de_caixa = []
-    # O primeiro pagamento é no tempo 0 (entrada implícita), mas para simplificar o VPL, consideramos todos a partir do período 1
-    for mes in range(1, prazo + 1):
-        pagamento = -parcela
-        receita_aluguel = 0
-        
-        if mes > mes_contemplacao:
-            receita_aluguel = valor_aluguel
-            
-        fluxo_de_caixa.append(receita_aluguel + pagamento)
-        
-    vpl = npf.npv(taxa_desconto_mensal, fluxo_de_caixa)
-    
-    return {'vpl': vpl}
\ No newline at end of file
+    # Fluxo dos meses 1..prazo: -parcela em todos e +aluguel depois da contemplação.
+    # Como no npf.npv, o primeiro fluxo fica em t=0: VPL = -parcela * S[prazo] + aluguel * (S[prazo] - S[mes])
+    recebimento = min(max(mes_contemplacao, 0), prazo)
+    curva = curva_desconto if curva_desconto is not None else curva_constante_compartilhada(taxa_desconto_anual, prazo)
+    vpl = -parcela * curva.vp_anuidade(prazo) + valor_aluguel * curva.vp_anuidade(prazo - recebimento, inicio=recebimento)
+
+    return {'vpl': float(vpl)}
@@ -0,0 +1,227 @@
+"""
+Precificação em lote (sem interface) de cotações de financiamento vs. consórcio.
+
+Uso pela linha de comando (na raiz do projeto):
+    python -m core.batch cotacoes.csv resultado.csv --tamanho-bloco 100000 --processos 4
+
+Cada linha de entrada traz os mesmos parâmetros da barra lateral do app.py:
+valor_bem, valor_entrada, taxa_juros_anual_fin, prazo_meses_fin, prazo_meses_con, taxa_adm_total
+e, opcionalmente, fundo_reserva_total e taxa_selic_anual (taxas em decimal; tx. adm. e fundo em %).
+"""
+import argparse
+import collections
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .calculations import (
+    calcula_parcela_price_lote, calcula_parcela_consorcio_lote,
+    calcula_vp_custo_financiamento_lote, calcula_vp_custo_consorcio_lote
+)
+from .instrumentacao import instrumenta
+
+COLUNAS_OBRIGATORIAS = (
+    'valor_bem', 'valor_entrada', 'taxa_juros_anual_fin', 'prazo_meses_fin', 'prazo_meses_con', 'taxa_adm_total'
+)
+COLUNAS_OPCIONAIS = ('fundo_reserva_total', 'taxa_selic_anual')
+
+
+@instrumenta(tamanho="cotacoes")
+def precifica_cotacoes(cotacoes: pd.DataFrame, taxa_selic_anual: float = None) -> pd.DataFrame:
+    """
+    Precifica um bloco de cotações de uma só vez (cálculo vetorizado, sem laço por linha).
+
+    A taxa de desconto vem da coluna 'taxa_selic_anual', se existir, ou do argumento `taxa_selic_anual`.
+    Valores vazios ou não numéricos nas colunas de entrada viram NaN. Linhas inválidas (entrada >=
+    valor do bem, prazo <= 0 ou algum valor NaN/infinito) saem com parcelas e custos NaN e sem melhor opção.
+    Retorna as colunas de entrada acrescidas das parcelas, dos custos em VP e da melhor opção.
+    """
+    faltantes = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in cotacoes.columns]
+    if faltantes:
+        raise ValueError(f"Colunas obrigatórias ausentes: {faltantes}.")
+    coluna = lambda nome: pd.to_numeric(cotacoes[nome], errors='coerce').to_numpy(dtype=float)
+    if 'taxa_selic_anual' in cotacoes.columns:
+        selic = coluna('taxa_selic_anual')
+    elif taxa_selic_anual is not None:
+        selic = taxa_selic_anual
+    else:
+        raise ValueError("Informe a coluna 'taxa_selic_anual' ou o argumento taxa_selic_anual.")
+
+    valor_bem, valor_entrada = coluna('valor_bem'), coluna('valor_entrada')
+    fundo_reserva = coluna('fundo_reserva_total') if 'fundo_reserva_total' in cotacoes.columns else 0.0
+    validas = (valor_entrada < valor_bem) & (coluna('prazo_meses_fin') > 0) & (coluna('prazo_meses_con') > 0)
+    for valores in (*(coluna(nome) for nome in COLUNAS_OBRIGATORIAS), fundo_reserva, selic):
+        validas &= np.isfinite(valores)
+    # Linhas inválidas viram NaN antes do cálculo, para que nenhuma saída pareça confiável
+    invalida_se_preciso = lambda valores: np.where(validas, valores, np.nan)
+    valor_bem, valor_entrada = invalida_se_preciso(valor_bem), invalida_se_preciso(valor_entrada)
+    taxa_juros_fin, prazo_fin = invalida_se_preciso(coluna('taxa_juros_anual_fin')), invalida_se_preciso(coluna('prazo_meses_fin'))
+    prazo_con = invalida_se_preciso(coluna('prazo_meses_con'))
+
+    valor_a_financiar = valor_bem - valor_entrada
+    with np.errstate(invalid='ignore'):
+        parcela_fin = calcula_parcela_price_lote(valor_a_financiar, taxa_juros_fin, prazo_fin)
+        parcela_con = calcula_parcela_consorcio_lote(valor_bem, prazo_con, coluna('taxa_adm_total'), fundo_reserva)
+        vp_fin = calcula_vp_custo_financiamento_lote(valor_entrada, valor_a_financiar, taxa_juros_fin, prazo_fin, selic)
+        vp_con = np.abs(calcula_vp_custo_consorcio_lote(parcela_con, prazo_con, selic))
+
+    resultado = cotacoes.copy()
+    # Colunas de entrada sempre em float64: um bloco com célula vazia não muda o tipo da saída
+    for nome in (*COLUNAS_OBRIGATORIAS, *COLUNAS_OPCIONAIS):
+        if nome in resultado.columns:
+            resultado[nome] = coluna(nome)
+    resultado['valor_a_financiar'] = valor_a_financiar
+    resultado['parcela_fin'] = invalida_se_preciso(parcela_fin)
+    resultado['parcela_con'] = invalida_se_preciso(parcela_con)
+    resultado['vp_custo_financiamento'] = invalida_se_preciso(vp_fin)
+    resultado['vp_custo_consorcio'] = invalida_se_preciso(vp_con)
+    resultado['melhor_opcao'] = np.where(~validas, None, np.where(vp_fin < vp_con, "Financiamento", "Consórcio"))
+    return resultado
+
+
+# --- LEITURA E ESCRITA EM BLOCOS ---
+
+def _eh_parquet(caminho) -> bool:
+    return Path(caminho).suffix.lower() in (".parquet", ".pq")
+
+
+def le_cotacoes_em_blocos(caminho, tamanho_bloco: int = 100_000):
+    """Lê um CSV ou Parquet em blocos de até `tamanho_bloco` linhas, sem carregar o arquivo inteiro."""
+    if _eh_parquet(caminho):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as erro:
+            raise ImportError("A leitura de Parquet requer o pacote 'pyarrow'.") from erro
+        for lote in pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_bloco):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(caminho, chunksize=tamanho_bloco)
+
+
+def _esquema_parquet(bloco: pd.DataFrame):
+    """Esquema fixo da saída: colunas numéricas em float64, as demais (ex: melhor_opcao) em texto."""
+    import pyarrow as pa
+    return pa.schema([
+        (nome, pa.float64() if pd.api.types.is_numeric_dtype(tipo) and not pd.api.types.is_bool_dtype(tipo) else pa.string())
+        for nome, tipo in bloco.dtypes.items()
+    ])
+
+
+def _tabela_no_esquema(bloco: pd.DataFrame, esquema):
+    """Converte um bloco para o esquema da saída (valores que não cabem numa coluna numérica viram NaN)."""
+    import pyarrow as pa
+    colunas = {
+        campo.name: pd.to_numeric(bloco[campo.name], errors='coerce').astype('float64') if pa.types.is_floating(campo.type)
+        else bloco[campo.name].astype('string')
+        for campo in esquema
+    }
+    return pa.Table.from_pandas(pd.DataFrame(colunas), schema=esquema, preserve_index=False)
+
+
+class _EscritorResultados:
+    """
+    Escreve blocos de resultado de forma incremental em CSV ou Parquet. Grava em um arquivo
+    temporário ao lado do destino e só o renomeia em `fecha(sucesso=True)`: uma execução
+    interrompida não deixa um resultado truncado no lugar do arquivo pedido.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+        self._temporario = self.caminho.with_name(self.caminho.name + ".parcial")
+        self._parquet = None
+        self._esquema = None
+        self._primeiro_bloco = True
+
+    def escreve(self, bloco: pd.DataFrame) -> None:
+        if _eh_parquet(self.caminho):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError as erro:
+                raise ImportError("A escrita de Parquet requer o pacote 'pyarrow'.") from erro
+            if self._parquet is None:
+                self._esquema = _esquema_parquet(bloco)
+                self._parquet = pq.ParquetWriter(self._temporario, self._esquema)
+            self._parquet.write_table(_tabela_no_esquema(bloco, self._esquema))
+        else:
+            bloco.to_csv(self._temporario, index=False, header=self._primeiro_bloco, mode='w' if self._primeiro_bloco else 'a')
+        self._primeiro_bloco = False
+
+    def fecha(self, sucesso: bool = True) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        if sucesso and not self._primeiro_bloco:
+            os.replace(self._temporario, self.caminho)
+        else:
+            self._temporario.unlink(missing_ok=True)
+
+
+@instrumenta()
+def precifica_arquivo(entrada, saida, tamanho_bloco: int = 100_000, processos: int = 1, taxa_selic_anual: float = None) -> int:
+    """
+    Precifica um arquivo de cotações bloco a bloco, gravando cada resultado assim que fica pronto.
+
+    Com `processos` > 1, os blocos são distribuídos em um pool de processos; no máximo
+    2 × processos blocos ficam em memória ao mesmo tempo e a ordem de saída é preservada.
+    Sem coluna 'taxa_selic_anual' nem `taxa_selic_anual`, usa a Selic atual (core.data_fetcher).
+    Retorna o número de linhas precificadas.
+    """
+    blocos = le_cotacoes_em_blocos(entrada, tamanho_bloco)
+    primeiro = next(blocos, None)
+    if primeiro is None:
+        return 0
+    blocos = itertools.chain([primeiro], blocos)
+    if taxa_selic_anual is None and 'taxa_selic_anual' not in primeiro.columns:
+        from .data_fetcher import busca_taxa_selic_atual
+        taxa_selic_anual = busca_taxa_selic_atual()
+
+    escritor = _EscritorResultados(saida)
+    total = 0
+    sucesso = False
+    try:
+        if processos <= 1:
+            for bloco in blocos:
+                resultado = precifica_cotacoes(bloco, taxa_selic_anual)
+                escritor.escreve(resultado)
+                total += len(resultado)
+        else:
+            with ProcessPoolExecutor(max_workers=processos) as pool:
+                pendentes = collections.deque()
+                for bloco in blocos:
+                    pendentes.append(pool.submit(precifica_cotacoes, bloco, taxa_selic_anual))
+                    if len(pendentes) >= 2 * processos:
+                        resultado = pendentes.popleft().result()
+                        escritor.escreve(resultado)
+                        total += len(resultado)
+                while pendentes:
+                    resultado = pendentes.popleft().result()
+                    escritor.escreve(resultado)
+                    total += len(resultado)
+        sucesso = True
+    finally:
+        escritor.fecha(sucesso)
+    return total
+
+
+# --- LINHA DE COMANDO ---
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.batch", description="Precifica cotações de financiamento vs. consórcio em lote.")
+    parser.add_argument("entrada", help="Arquivo de cotações (.csv ou .parquet)")
+    parser.add_argument("saida", help="Arquivo de resultado (.csv ou .parquet)")
+    parser.add_argument("--tamanho-bloco", type=int, default=100_000, help="Linhas por bloco (padrão: 100000)")
+    parser.add_argument("--processos", type=int, default=1, help="Número de processos (padrão: 1)")
+    parser.add_argument("--selic", type=float, default=None, help="Selic anual em decimal, se a entrada não tiver a coluna taxa_selic_anual")
+    args = parser.parse_args(argv)
+
+    total = precifica_arquivo(args.entrada, args.saida, args.tamanho_bloco, args.processos, args.selic)
+    print(f"{total} cotações precificadas em {args.saida}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
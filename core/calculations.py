@@ -1,6 +1,138 @@
-import numpy_financial as npf
+import os
+
+import numpy as np
 import pandas as pd
 
+from .curvas import curva_constante_compartilhada
+from .instrumentacao import instrumenta
+
+# --- FUNÇÕES AUXILIARES (FORMA FECHADA, VETORIZADAS) ---
+
+def taxa_anual_para_mensal(taxa_anual):
+    """Converte taxa(s) anual(is) em taxa(s) mensal(is) EFETIVA(s): (1 + i)**(1/12) - 1."""
+    return (1 + np.asarray(taxa_anual, dtype=float))**(1/12) - 1
+
+def fator_anuidade_antecipada(taxa_mensal, prazo):
+    """
+    Fator de Valor Presente de `prazo` pagamentos unitários, o primeiro em t=0.
+    Equivale a `npf.npv(taxa_mensal, [1] * prazo)`, mas em forma fechada e aceitando arrays.
+    """
+    taxa, prazo = np.broadcast_arrays(np.asarray(taxa_mensal, dtype=float), np.asarray(prazo, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # expm1/log1p mantêm a precisão para taxas muito pequenas
+        fator = -np.expm1(-prazo * np.log1p(taxa)) / taxa * (1 + taxa)
+    fator = np.where(taxa == 0, prazo, fator)
+    return np.where(prazo > 0, fator, 0.0)
+
+# Arrays de taxas maiores que isso (ex: uma taxa por cotação) usam a forma fechada:
+# agrupar as taxas distintas custaria mais do que calcular os fatores diretamente
+MAXIMO_TAXAS_AGRUPADAS = 256
+
+def _agrupa_por_taxa(taxa_anual, meses):
+    """
+    Agrupa as taxas anuais distintas e devolve (curvas, código da taxa, meses inteiros), ou None quando
+    o cache de curvas não se aplica (meses fracionários, taxas inválidas ou em número grande demais).
+    Meses não finitos ou negativos viram 0. O agrupamento é feito antes do broadcasting,
+    então uma grade com um eixo de taxas só agrupa os valores desse eixo.
+    """
+    taxa = np.asarray(taxa_anual, dtype=float)
+    if taxa.size > MAXIMO_TAXAS_AGRUPADAS or not np.all(taxa > -1) or not np.all(np.isfinite(taxa)):
+        return None
+    meses = np.asarray(meses, dtype=float)
+    meses = np.where(np.isfinite(meses) & (meses > 0), meses, 0.0)
+    meses_inteiros = np.rint(meses)
+    if not np.array_equal(meses, meses_inteiros):
+        return None
+    if taxa.ndim == 0:
+        taxas_distintas, codigos = [float(taxa)], np.zeros((), dtype=np.intp)
+    else:
+        taxas_distintas, codigos = np.unique(taxa, return_inverse=True)
+        codigos = codigos.reshape(taxa.shape)
+    horizonte = int(meses_inteiros.max()) if meses_inteiros.size else 0
+    curvas = [curva_constante_compartilhada(t, max(horizonte, 1)) for t in taxas_distintas]
+    return curvas, codigos, meses_inteiros.astype(np.intp)
+
+def _fator_escalar(taxa_anual, meses, atributo: str):
+    """Atalho para uma única taxa e um único prazo (o caso das funções escalares e das estratégias)."""
+    if not (taxa_anual > -1 and np.isfinite(taxa_anual)):
+        return None
+    mes = meses if np.isfinite(meses) and meses > 0 else 0
+    if mes != int(mes):
+        return None
+    return getattr(curva_constante_compartilhada(taxa_anual, max(int(mes), 1)), atributo)[int(mes)]
+
+def _consulta_curvas(grupos, atributo: str) -> np.ndarray:
+    curvas, codigos, meses = grupos
+    if len(curvas) == 1:
+        return getattr(curvas[0], atributo)[meses]
+    horizonte = int(meses.max()) + 1
+    tabela = np.stack([getattr(curva, atributo)[:horizonte] for curva in curvas])
+    return tabela[codigos, meses]
+
+def fator_anuidade_lote(taxa_anual, prazo) -> np.ndarray:
+    """
+    Fator de anuidade antecipada (como fator_anuidade_antecipada) para taxas ANUAIS.
+    Lê a soma acumulada dos fatores de desconto das curvas em cache (core.curvas), calculada uma
+    vez por taxa e faixa de horizonte; recai na forma fechada quando o cache não se aplica
+    (prazos fracionários ou mais de MAXIMO_TAXAS_AGRUPADAS taxas).
+    """
+    if np.size(taxa_anual) == 1 and np.size(prazo) == 1:
+        fator = _fator_escalar(float(np.ravel(taxa_anual)[0]), float(np.ravel(prazo)[0]), 'acumulados')
+        if fator is not None:
+            formato = np.broadcast_shapes(np.shape(taxa_anual), np.shape(prazo))
+            return np.full(formato, fator) if formato else fator
+    grupos = _agrupa_por_taxa(taxa_anual, prazo)
+    if grupos is None:
+        return fator_anuidade_antecipada(taxa_anual_para_mensal(taxa_anual), prazo)
+    return _consulta_curvas(grupos, 'acumulados')
+
+def fator_desconto_lote(taxa_anual, meses) -> np.ndarray:
+    """Fator de desconto em t=`meses` para taxas ANUAIS, lido das curvas em cache (t negativo vale 1)."""
+    if np.size(taxa_anual) == 1 and np.size(meses) == 1:
+        fator = _fator_escalar(float(np.ravel(taxa_anual)[0]), float(np.ravel(meses)[0]), 'fatores')
+        if fator is not None:
+            formato = np.broadcast_shapes(np.shape(taxa_anual), np.shape(meses))
+            return np.full(formato, fator) if formato else fator
+    grupos = _agrupa_por_taxa(taxa_anual, meses)
+    if grupos is None:
+        return (1 + taxa_anual_para_mensal(taxa_anual)) ** -np.maximum(np.asarray(meses, dtype=float), 0)
+    return _consulta_curvas(grupos, 'fatores')
+
+# --- FUNÇÕES DE FINANCIAMENTO (LOTE) ---
+
+def calcula_parcela_price_lote(valor_financiado, taxa_juros_anual, prazo_meses) -> np.ndarray:
+    """Calcula as parcelas (PMT) do sistema Price para arrays de parâmetros (com broadcasting)."""
+    valor, taxa, prazo = np.broadcast_arrays(
+        np.asarray(valor_financiado, dtype=float),
+        taxa_anual_para_mensal(taxa_juros_anual),
+        np.asarray(prazo_meses, dtype=float)
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        parcela = valor * taxa / -np.expm1(-prazo * np.log1p(taxa))
+        parcela = np.where(taxa == 0, valor / prazo, parcela)
+    return np.where(prazo > 0, parcela, 0.0)
+
+def calcula_vp_custo_financiamento_lote(valor_entrada, valor_financiado, taxa_juros_anual, prazo_meses, taxa_desconto_anual) -> np.ndarray:
+    """Calcula o custo total em VP de vários financiamentos de uma só vez."""
+    parcela = calcula_parcela_price_lote(valor_financiado, taxa_juros_anual, prazo_meses)
+    fator = fator_anuidade_lote(taxa_desconto_anual, prazo_meses)
+    return np.asarray(valor_entrada, dtype=float) + np.abs(parcela * fator)
+
+# --- FUNÇÕES DE CONSÓRCIO (LOTE) ---
+
+def calcula_parcela_consorcio_lote(carta_credito, prazo, tx_adm, fundo_reserva=0.0) -> np.ndarray:
+    """Calcula as parcelas mensais de vários consórcios de uma só vez (com broadcasting)."""
+    prazo = np.asarray(prazo, dtype=float)
+    if np.any(prazo <= 0):
+        raise ValueError("O prazo deve ser um número positivo de meses.")
+    valor_total_pago = np.asarray(carta_credito, dtype=float) * (1 + np.asarray(tx_adm, dtype=float) / 100 + np.asarray(fundo_reserva, dtype=float) / 100)
+    return valor_total_pago / prazo
+
+def calcula_vp_custo_consorcio_lote(parcela, prazo, taxa_desconto_anual) -> np.ndarray:
+    """Calcula o VP (negativo, como saída de caixa) do custo de vários consórcios de uma só vez."""
+    fator = fator_anuidade_lote(taxa_desconto_anual, prazo)
+    return -np.asarray(parcela, dtype=float) * fator
+
 # --- FUNÇÕES DE FINANCIAMENTO ---
 
 def calcula_parcela_price(valor_financiado: float, taxa_juros_anual: float, prazo_meses: int) -> float:
@@ -8,42 +140,75 @@ def calcula_parcela_price(valor_financiado: float, taxa_juros_anual: float, praz
     if prazo_meses <= 0:
         return 0.0
     # PADRONIZAÇÃO: Usa a taxa de juros mensal EFETIVA
-    taxa_juros_mensal = (1 + taxa_juros_anual)**(1/12) - 1
-    parcela = npf.pmt(rate=taxa_juros_mensal, nper=prazo_meses, pv=-valor_financiado)
-    return parcela
+    return float(calcula_parcela_price_lote(valor_financiado, taxa_juros_anual, prazo_meses))
 
-def gera_tabela_amortizacao(valor_financiado: float, taxa_juros_anual: float, prazo_meses: int) -> pd.DataFrame:
-    """Gera uma tabela de amortização completa para um financiamento pelo sistema Price."""
+SISTEMAS_AMORTIZACAO = ("price", "sac")
+
+def _colunas_amortizacao(valor_financiado: float, taxa_juros_anual: float, prazo_meses: int, sistema: str, meses: np.ndarray) -> dict:
+    """Calcula, em forma fechada, as colunas da tabela de amortização para os meses pedidos."""
+    if sistema not in SISTEMAS_AMORTIZACAO:
+        raise ValueError(f"Sistema de amortização inválido: '{sistema}'. Use um de {SISTEMAS_AMORTIZACAO}.")
     # PADRONIZAÇÃO: Usa a taxa de juros mensal EFETIVA
-    taxa_juros_mensal = (1 + taxa_juros_anual)**(1/12) - 1
-    parcela = calcula_parcela_price(valor_financiado, taxa_juros_anual, prazo_meses)
-    
-    saldo_devedor = valor_financiado
-    dados_tabela = []
-    for mes in range(1, prazo_meses + 1):
-        juros_periodo = saldo_devedor * taxa_juros_mensal
-        amortizacao = parcela - juros_periodo
-        saldo_devedor -= amortizacao
-        if mes == prazo_meses:
-            saldo_devedor = 0.0
-        dados_tabela.append({
-            "Mês": mes, "Parcela (R$)": parcela, "Juros (R$)": juros_periodo,
-            "Amortização (R$)": amortizacao, "Saldo Devedor (R$)": saldo_devedor
-        })
-    return pd.DataFrame(dados_tabela)
+    taxa_juros_mensal = float(taxa_anual_para_mensal(taxa_juros_anual))
+    meses_anteriores = meses - 1
+
+    if sistema == "price":
+        parcela = calcula_parcela_price(valor_financiado, taxa_juros_anual, prazo_meses)
+        if taxa_juros_mensal == 0:
+            saldo_anterior = valor_financiado - parcela * meses_anteriores
+        else:
+            # Saldo após k meses: V*(1+i)^k - PMT*((1+i)^k - 1)/i
+            crescimento = np.expm1(meses_anteriores * np.log1p(taxa_juros_mensal))
+            saldo_anterior = valor_financiado * (1 + crescimento) - parcela * crescimento / taxa_juros_mensal
+        juros = saldo_anterior * taxa_juros_mensal
+        amortizacao = parcela - juros
+        parcelas = np.full(len(meses), parcela)
+    else:
+        # SAC: amortização constante, parcela decrescente
+        amortizacao = np.full(len(meses), valor_financiado / prazo_meses if prazo_meses > 0 else 0.0)
+        saldo_anterior = valor_financiado - amortizacao * meses_anteriores
+        juros = saldo_anterior * taxa_juros_mensal
+        parcelas = amortizacao + juros
+
+    saldo_devedor = saldo_anterior - amortizacao
+    saldo_devedor[meses == prazo_meses] = 0.0
+    return {
+        "Mês": meses, "Parcela (R$)": parcelas, "Juros (R$)": juros,
+        "Amortização (R$)": amortizacao, "Saldo Devedor (R$)": saldo_devedor
+    }
+
+@instrumenta(tamanho="prazo_meses")
+def gera_tabela_amortizacao(valor_financiado: float, taxa_juros_anual: float, prazo_meses: int, sistema: str = "price") -> pd.DataFrame:
+    """Gera uma tabela de amortização completa (sistema Price ou SAC) em uma única passada vetorizada."""
+    meses = np.arange(1, prazo_meses + 1)
+    return pd.DataFrame(_colunas_amortizacao(valor_financiado, taxa_juros_anual, prazo_meses, sistema, meses))
+
+def gera_tabela_amortizacao_em_blocos(valor_financiado: float, taxa_juros_anual: float, prazo_meses: int, sistema: str = "price", tamanho_bloco: int = 120):
+    """
+    Gera a tabela de amortização em blocos de `tamanho_bloco` meses, sem materializar a tabela inteira.
+    Útil para exportação (ex: CSV) de contratos longos.
+    """
+    if tamanho_bloco <= 0:
+        raise ValueError("O tamanho do bloco deve ser um número positivo de meses.")
+    for inicio in range(1, prazo_meses + 1, tamanho_bloco):
+        meses = np.arange(inicio, min(inicio + tamanho_bloco, prazo_meses + 1))
+        yield pd.DataFrame(_colunas_amortizacao(valor_financiado, taxa_juros_anual, prazo_meses, sistema, meses))
+
+@instrumenta(tamanho="prazo_meses")
+def exporta_tabela_amortizacao_csv(destino, valor_financiado: float, taxa_juros_anual: float, prazo_meses: int, sistema: str = "price", tamanho_bloco: int = 120) -> None:
+    """Escreve a tabela de amortização em CSV (caminho ou arquivo aberto), bloco a bloco."""
+    if isinstance(destino, (str, os.PathLike)):
+        with open(destino, 'w', newline='', encoding='utf-8') as arquivo:
+            exporta_tabela_amortizacao_csv(arquivo, valor_financiado, taxa_juros_anual, prazo_meses, sistema, tamanho_bloco)
+        return
+    blocos = gera_tabela_amortizacao_em_blocos(valor_financiado, taxa_juros_anual, prazo_meses, sistema, tamanho_bloco)
+    for indice, bloco in enumerate(blocos):
+        bloco.to_csv(destino, index=False, header=(indice == 0))
 
 def calcula_vp_custo_financiamento(valor_entrada: float, valor_financiado: float, taxa_juros_anual: float, prazo_meses: int, taxa_desconto_anual: float) -> float:
     """Calcula o custo total de um financiamento em Valor Presente (VP)."""
-    parcela = calcula_parcela_price(valor_financiado, taxa_juros_anual, prazo_meses)
-    
-    # PADRONIZAÇÃO: Usa a taxa de desconto mensal EFETIVA
-    taxa_desconto_mensal = (1 + taxa_desconto_anual)**(1/12) - 1
-    
-    fluxo_parcelas = [-parcela] * prazo_meses
-    vp_das_parcelas = npf.npv(rate=taxa_desconto_mensal, values=fluxo_parcelas)
-    
-    custo_total_vp = valor_entrada + abs(vp_das_parcelas)
-    return custo_total_vp
+    # PADRONIZAÇÃO: Usa as taxas mensais EFETIVAS (ver calcula_vp_custo_financiamento_lote)
+    return float(calcula_vp_custo_financiamento_lote(valor_entrada, valor_financiado, taxa_juros_anual, prazo_meses, taxa_desconto_anual))
 
 # --- FUNÇÕES DE CONSÓRCIO ---
 
@@ -62,7 +227,26 @@ def calcula_vp_custo_consorcio(parcela: float, prazo: int, taxa_desconto_anual:
     if prazo <= 0:
         return 0.0
     # PADRONIZAÇÃO: Usa a taxa de desconto mensal EFETIVA
-    taxa_desconto_mensal = (1 + taxa_desconto_anual)**(1/12) - 1
-    fluxo_de_caixa = [-parcela] * prazo
-    valor_presente = npf.npv(taxa_desconto_mensal, fluxo_de_caixa)
-    return valor_presente
\ No newline at end of file
+    return float(calcula_vp_custo_consorcio_lote(parcela, prazo, taxa_desconto_anual))
+
+# --- FUNÇÕES COM CURVA DE TAXAS (core.curvas.CurvaDeTaxas) ---
+
+@instrumenta(tamanho="prazo_meses")
+def calcula_vp_custo_financiamento_curva(valor_entrada, valor_financiado, taxa_juros_anual, prazo_meses, curva_desconto, indexador=None) -> np.ndarray:
+    """
+    Custo total do financiamento em VP, descontado por uma curva de taxas (ex: trajetória da Selic).
+    Com `indexador` (ex: TR), as parcelas são corrigidas mês a mês pela curva do indexador.
+    Aceita arrays de prazo (uma consulta à soma acumulada da curva por contrato).
+    """
+    parcela = calcula_parcela_price_lote(valor_financiado, taxa_juros_anual, prazo_meses)
+    curva = curva_desconto if indexador is None else curva_desconto.deflacionada_por(indexador)
+    return np.asarray(valor_entrada, dtype=float) + np.abs(parcela * curva.vp_anuidade(prazo_meses))
+
+@instrumenta(tamanho="prazo")
+def calcula_vp_custo_consorcio_curva(parcela, prazo, curva_desconto, indexador=None) -> np.ndarray:
+    """
+    VP (negativo, como saída de caixa) do custo do consórcio descontado por uma curva de taxas.
+    Com `indexador` (ex: IGPM, INCC), as parcelas são corrigidas mês a mês pela curva do indexador.
+    """
+    curva = curva_desconto if indexador is None else curva_desconto.deflacionada_por(indexador)
+    return -np.asarray(parcela, dtype=float) * curva.vp_anuidade(prazo)
@@ -0,0 +1,147 @@
+import numpy as np
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from .instrumentacao import registra_cache
+
+# --- CURVAS DE TAXAS (DESCONTO E INDEXADORES) ---
+#
+# Uma curva guarda uma taxa mensal efetiva por mês (a taxa que vale de t a t+1) e, calculados uma
+# única vez na criação, os fatores de desconto D[t] = 1 / prod((1 + r_k), k < t), t = 0..horizonte,
+# e a soma acumulada S[n] = D[0] + ... + D[n-1]. Com isso:
+# - VP de uma série uniforme de n pagamentos (o primeiro em t=0): parcela * S[n]
+# - VP de um fluxo qualquer: um produto escalar com D
+# A mesma curva é compartilhada por financiamento, consórcio e estratégias.
+
+@dataclass(frozen=True, eq=False)
+class CurvaDeTaxas:
+    """
+    Curva de taxas mensais efetivas (ex: trajetória da Selic, projeção de IGPM/INCC/TR).
+    Imutável; os arrays são somente leitura. Igualdade e hash são por identidade.
+    """
+    taxas_mensais: np.ndarray
+    nome: str = ""
+    fatores: np.ndarray = field(init=False, repr=False)
+    acumulados: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        taxas = np.array(self.taxas_mensais, dtype=float)
+        if taxas.ndim != 1 or len(taxas) == 0:
+            raise ValueError("A curva deve ter ao menos uma taxa mensal.")
+        if np.any(taxas <= -1):
+            raise ValueError("As taxas mensais devem ser maiores que -100%.")
+        fatores = np.empty(len(taxas) + 1)
+        fatores[0] = 1.0
+        np.exp(-np.cumsum(np.log1p(taxas)), out=fatores[1:])
+        acumulados = np.empty(len(taxas) + 1)
+        acumulados[0] = 0.0
+        np.cumsum(fatores[:-1], out=acumulados[1:])
+        for nome, array in (('taxas_mensais', taxas), ('fatores', fatores), ('acumulados', acumulados)):
+            array.flags.writeable = False
+            object.__setattr__(self, nome, array)
+
+    @property
+    def horizonte(self) -> int:
+        """Número de meses cobertos pela curva."""
+        return len(self.taxas_mensais)
+
+    def _indices(self, meses):
+        if np.ndim(meses) == 0:
+            # Atalho para um único mês, sem criar arrays
+            indice = round(float(meses))
+            if not 0 <= indice <= self.horizonte:
+                raise ValueError(f"A curva '{self.nome}' cobre apenas {self.horizonte} meses.")
+            return indice
+        indices = np.rint(np.asarray(meses)).astype(int)
+        if np.any(indices < 0) or np.any(indices > self.horizonte):
+            raise ValueError(f"A curva '{self.nome}' cobre apenas {self.horizonte} meses.")
+        return indices
+
+    def fator_desconto(self, t):
+        """Fator de desconto no mês t (aceita arrays)."""
+        return self.fatores[self._indices(t)]
+
+    def vp_anuidade(self, prazo, inicio=0):
+        """VP de `prazo` pagamentos unitários mensais, o primeiro em t=`inicio` (aceita arrays)."""
+        return self.acumulados[self._indices(np.add(inicio, prazo))] - self.acumulados[self._indices(inicio)]
+
+    def vp(self, fluxos) -> float:
+        """VP de um fluxo mensal qualquer, o primeiro em t=0: um único produto escalar."""
+        fluxos = np.asarray(fluxos, dtype=float)
+        self._indices(len(fluxos) - 1)
+        return float(fluxos @ self.fatores[:len(fluxos)])
+
+    def deflacionada_por(self, indexador: "CurvaDeTaxas") -> "CurvaDeTaxas":
+        """
+        Curva para descontar pagamentos corrigidos por `indexador` (ex: parcelas reajustadas pelo INCC):
+        descontar p * I[t] pela curva original equivale a descontar p pela taxa (1 + r) / (1 + g) - 1.
+        """
+        horizonte = min(self.horizonte, indexador.horizonte)
+        taxas = (1 + self.taxas_mensais[:horizonte]) / (1 + indexador.taxas_mensais[:horizonte]) - 1
+        return CurvaDeTaxas(taxas, nome=f"{self.nome} / {indexador.nome}")
+
+    def taxa_anual_equivalente(self, prazo: int = None) -> float:
+        """Taxa anual constante que daria o mesmo fator de desconto em `prazo` meses (padrão: horizonte)."""
+        prazo = self.horizonte if prazo is None else prazo
+        return float(self.fator_desconto(prazo) ** (-12 / prazo) - 1)
+
+
+def curva_de_taxas_anuais(taxas_anuais, nome: str = "") -> CurvaDeTaxas:
+    """Curva a partir de uma taxa ANUAL por mês (ex: projeção mensal da Selic)."""
+    return CurvaDeTaxas((1 + np.asarray(taxas_anuais, dtype=float))**(1/12) - 1, nome=nome)
+
+
+def curva_constante(taxa_anual: float, horizonte: int, nome: str = "") -> CurvaDeTaxas:
+    """Curva com a mesma taxa anual em todos os meses (equivale ao desconto atual com taxa única)."""
+    return curva_de_taxas_anuais(np.full(horizonte, float(taxa_anual)), nome=nome or f"{taxa_anual:.2%} a.a.")
+
+
+# Curvas constantes compartilhadas: o horizonte é arredondado para cima em faixas de FAIXA_HORIZONTE
+# meses, para que prazos diferentes com a mesma taxa reaproveitem a mesma curva
+FAIXA_HORIZONTE = 120
+TAMANHO_CACHE_CURVAS = 512
+
+@lru_cache(maxsize=TAMANHO_CACHE_CURVAS)
+def _curva_constante_em_cache(taxa_anual: float, horizonte: int) -> CurvaDeTaxas:
+    return curva_constante(taxa_anual, horizonte)
+
+
+registra_cache("curvas._curva_constante_em_cache", _curva_constante_em_cache)
+
+
+def curva_constante_compartilhada(taxa_anual: float, horizonte: int) -> CurvaDeTaxas:
+    """
+    Curva constante que cobre pelo menos `horizonte` meses, vinda de um cache LRU limitado
+    e chaveado por (taxa, faixa do horizonte). É a fonte dos fatores de desconto das funções de
+    core.calculations e core.analysis que usam taxa única.
+    """
+    faixa = max(1, -(-int(horizonte) // FAIXA_HORIZONTE)) * FAIXA_HORIZONTE
+    return _curva_constante_em_cache(float(taxa_anual), faixa)
+
+
+def curva_por_vertices(vertices: dict, horizonte: int, nome: str = "") -> CurvaDeTaxas:
+    """
+    Curva a partir de vértices {mês: taxa anual}, como as projeções do Boletim Focus.
+    Interpola linearmente entre os vértices e mantém a taxa do último vértice depois dele.
+    """
+    meses = np.array(sorted(vertices), dtype=float)
+    taxas = np.array([vertices[mes] for mes in sorted(vertices)], dtype=float)
+    return curva_de_taxas_anuais(np.interp(np.arange(horizonte), meses, taxas), nome=nome)
+
+
+# --- CURVAS PADRÃO ---
+
+# Taxas anuais de referência dos indexadores (editáveis na interface)
+TAXAS_INDEXADORES = {'IGPM': 0.04, 'INCC': 0.05, 'TR': 0.01}
+
+def curvas_selic_padrao(taxa_selic_anual: float, horizonte: int) -> dict:
+    """
+    Trajetórias da Selic usadas na aba de cenários: constante, queda gradual (3 p.p. em 24 meses,
+    no formato das projeções do Focus) e alta (2 p.p. em 12 meses). Nenhuma fica abaixo de 2% a.a.
+    """
+    queda = max(0.02, taxa_selic_anual - 0.03)
+    return {
+        "Selic Constante": curva_constante(taxa_selic_anual, horizonte, nome="Selic Constante"),
+        "Queda Gradual (Focus)": curva_por_vertices({0: taxa_selic_anual, 24: queda}, horizonte, nome="Queda Gradual (Focus)"),
+        "Alta da Selic": curva_por_vertices({0: taxa_selic_anual, 12: taxa_selic_anual + 0.02}, horizonte, nome="Alta da Selic")
+    }
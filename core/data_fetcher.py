@@ -1,30 +1,162 @@
-import requests
-import streamlit as st
+import csv
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
 
-@st.cache_data(ttl=3600) # Atualiza a cada hora
-def busca_taxa_selic_atual() -> float:
+from .instrumentacao import instrumenta
+
+logger = logging.getLogger(__name__)
+
+# Código da série no SGS para a Selic Meta: 432
+SERIE_SELIC_META = 432
+URL_SGS = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.{serie}/dados"
+# Primeira data da série 432 no SGS
+DATA_INICIAL_SERIE = date(1999, 3, 5)
+# O SGS limita consultas de séries diárias a 10 anos por requisição
+JANELA_MAXIMA_DIAS = 3650
+# Tempo para considerar a cópia local desatualizada e tentar buscar dados novos
+INTERVALO_ATUALIZACAO_SEGUNDOS = 3600
+
+TAXA_SELIC_PADRAO = 0.105 # 10.5% como fallback
+
+_trava_atualizacao = threading.Lock()
+_ultimas_tentativas = {}
+
+
+# --- ARMAZENAMENTO LOCAL (DISCO) ---
+
+def caminho_cache_selic() -> Path:
+    """Arquivo CSV local com a série da Selic. Pode ser alterado pela variável SELIC_CACHE_DIR."""
+    diretorio = os.environ.get("SELIC_CACHE_DIR") or Path.home() / ".cache" / "app-custo-fin-vs-con"
+    return Path(diretorio) / f"sgs_{SERIE_SELIC_META}.csv"
+
+
+def carrega_serie_selic(caminho: Path = None) -> list:
     """
-    Busca a última taxa Selic meta anualizada na API do Banco Central do Brasil.
-    Retorna a taxa em formato decimal (ex: 0.105 para 10.5%).
-    Em caso de falha, retorna um valor padrão e exibe um aviso.
+    Lê a série histórica da Selic gravada em disco.
+    Retorna uma lista de (data, taxa_decimal) em ordem cronológica; vazia se não houver cópia local.
     """
-    # Código da série no SGS para a Selic Meta: 432
-    url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.432/dados/ultimos/1?formato=json"
-    
-    valor_padrao = 0.105 # 10.5% como fallback
+    caminho = Path(caminho or caminho_cache_selic())
+    if not caminho.exists():
+        return []
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        return [(date.fromisoformat(linha['data']), float(linha['valor']) / 100) for linha in csv.DictReader(arquivo)]
 
+
+def _grava_serie(caminho: Path, serie: list) -> None:
+    """Grava a série de forma atômica (arquivo temporário + rename), para leitores nunca verem meio arquivo."""
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=caminho.parent, suffix=".tmp")
     try:
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            dados = response.json()
-            if dados:
-                taxa_percentual = float(dados[0]['valor'])
-                return taxa_percentual / 100
-        else:
-            # st.warning é um jeito elegante de mostrar avisos no Streamlit
-            st.warning(f"Não foi possível buscar a Selic (Status: {response.status_code}). Usando taxa padrão de {valor_padrao*100}%.")
-            return valor_padrao
-            
-    except requests.exceptions.RequestException:
-        st.warning(f"Erro de conexão ao buscar a Selic. Usando taxa padrão de {valor_padrao*100}%.")
-        return valor_padrao
\ No newline at end of file
+        with os.fdopen(descritor, 'w', newline='', encoding='utf-8') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(["data", "valor"])
+            for data, taxa in serie:
+                escritor.writerow([data.isoformat(), f"{taxa * 100:.4f}"])
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+# --- ATUALIZAÇÃO INCREMENTAL (REDE) ---
+
+def _baixa_janela(url: str, inicio: date, fim: date, timeout: float) -> list:
+    """Baixa um intervalo da série no SGS. Intervalos sem dados retornam lista vazia."""
+    import requests
+
+    parametros = {"formato": "json", "dataInicial": inicio.strftime("%d/%m/%Y"), "dataFinal": fim.strftime("%d/%m/%Y")}
+    response = requests.get(url, params=parametros, timeout=timeout)
+    if response.status_code == 404:
+        return []
+    response.raise_for_status()
+    return [(datetime.strptime(ponto['data'], "%d/%m/%Y").date(), float(ponto['valor']) / 100) for ponto in response.json()]
+
+
+@instrumenta()
+def atualiza_serie_selic(caminho: Path = None, url: str = None, timeout: float = 5, hoje: date = None,
+                         janela_dias: int = JANELA_MAXIMA_DIAS, data_inicial: date = DATA_INICIAL_SERIE) -> int:
+    """
+    Busca no SGS apenas as datas posteriores à última gravada em disco (ou a série completa, na
+    primeira vez), em janelas de até `janela_dias`, e grava o resultado.
+    Retorna o número de pontos novos. Erros de rede são propagados (requests.exceptions.RequestException).
+    """
+    caminho = Path(caminho or caminho_cache_selic())
+    url = url or URL_SGS.format(serie=SERIE_SELIC_META)
+    hoje = hoje or date.today()
+
+    serie = carrega_serie_selic(caminho)
+    inicio = serie[-1][0] + timedelta(days=1) if serie else data_inicial
+    novos = []
+    while inicio <= hoje:
+        fim = min(inicio + timedelta(days=janela_dias - 1), hoje)
+        novos.extend(ponto for ponto in _baixa_janela(url, inicio, fim, timeout) if ponto[0] >= inicio)
+        inicio = fim + timedelta(days=1)
+
+    if novos or not caminho.exists():
+        _grava_serie(caminho, serie + novos)
+    else:
+        # Nada novo: apenas marca a cópia local como verificada agora
+        caminho.touch()
+    return len(novos)
+
+
+def _cache_desatualizado(caminho: Path) -> bool:
+    return not caminho.exists() or time.time() - caminho.stat().st_mtime > INTERVALO_ATUALIZACAO_SEGUNDOS
+
+
+def atualiza_serie_selic_em_segundo_plano(caminho: Path = None, **kwargs) -> threading.Thread:
+    """
+    Dispara atualiza_serie_selic em uma thread daemon, sem bloquear quem chamou.
+    Retorna a thread, ou None se já houver uma atualização em andamento ou uma tentativa recente.
+    """
+    caminho = Path(caminho or caminho_cache_selic())
+    with _trava_atualizacao:
+        if time.time() - _ultimas_tentativas.get(caminho, 0.0) < INTERVALO_ATUALIZACAO_SEGUNDOS / 12:
+            return None
+        _ultimas_tentativas[caminho] = time.time()
+
+    def executa():
+        try:
+            novos = atualiza_serie_selic(caminho, **kwargs)
+            logger.info("Série da Selic atualizada: %d ponto(s) novo(s).", novos)
+        except Exception as erro:
+            logger.warning("Não foi possível atualizar a série da Selic: %s", erro)
+
+    thread = threading.Thread(target=executa, name="atualiza-selic", daemon=True)
+    thread.start()
+    return thread
+
+
+# --- LEITURA ---
+
+@instrumenta()
+def ultima_taxa_selic(caminho: Path = None, atualizar: bool = True) -> tuple:
+    """
+    Retorna (taxa_decimal, data) da última Selic meta gravada em disco, sem esperar pela rede.
+    Se a cópia local estiver desatualizada, dispara uma atualização em segundo plano.
+    Sem cópia local, retorna (TAXA_SELIC_PADRAO, None).
+    """
+    caminho = Path(caminho or caminho_cache_selic())
+    if atualizar and _cache_desatualizado(caminho):
+        atualiza_serie_selic_em_segundo_plano(caminho)
+    serie = carrega_serie_selic(caminho)
+    if not serie:
+        return TAXA_SELIC_PADRAO, None
+    data, taxa = serie[-1]
+    return taxa, data
+
+
+@instrumenta()
+def busca_taxa_selic_atual() -> float:
+    """
+    Busca a última taxa Selic meta anualizada (cópia local da série do Banco Central do Brasil).
+    Retorna a taxa em formato decimal (ex: 0.105 para 10.5%).
+    Sem dados locais ainda, retorna o valor padrão enquanto a série é baixada em segundo plano.
+    """
+    taxa, _ = ultima_taxa_selic()
+    return taxa
@@ -0,0 +1,71 @@
+import pandas as pd
+
+# --- CAMADA DE APRESENTAÇÃO ---
+# As funções de análise retornam apenas números; a conversão para texto acontece
+# aqui, uma única vez, e somente para exibição na interface (app.py).
+
+def formata_percentual(taxa: float) -> str:
+    """Formata uma taxa decimal como percentual (ex: 0.105 -> 10.50%)."""
+    return f"{taxa:.2%}"
+
+def formata_tabela_cenarios(df_cenarios: pd.DataFrame) -> pd.DataFrame:
+    """Converte o resultado numérico de run_scenario_analysis em uma tabela de texto para st.table."""
+    return pd.DataFrame({
+        "Taxa Selic Anual": df_cenarios["Taxa Selic Anual"].map(formata_percentual),
+        "VP Custo Financiamento (R$)": df_cenarios["VP Custo Financiamento (R$)"].map("{:,.2f}".format),
+        "VP Custo Consórcio (R$)": df_cenarios["VP Custo Consórcio (R$)"].map("{:,.2f}".format),
+        "Melhor Opção": df_cenarios["Melhor Opção"]
+    }, index=df_cenarios.index)
+
+# Rótulo e formatação de cada parâmetro de core.analysis.PARAMETROS_BREAK_EVEN
+_FORMATOS_BREAK_EVEN = {
+    'taxa_selic_anual': ("Taxa Selic Anual", formata_percentual),
+    'taxa_juros_anual_fin': ("Taxa de Juros do Financiamento", formata_percentual),
+    'taxa_adm_total': ("Taxa de Administração", "{:.2f}%".format),
+    'valor_entrada': ("Valor da Entrada", "R$ {:,.2f}".format),
+    'prazo_meses_con': ("Prazo do Consórcio", "{:.1f} meses".format),
+    'prazo_meses_fin': ("Prazo do Financiamento", "{:.1f} meses".format)
+}
+
+def formata_tabela_break_even(valores_atuais: dict, empates: dict) -> pd.DataFrame:
+    """Tabela de texto com o valor atual e o de empate de cada parâmetro (NaN = sem empate)."""
+    linhas = {
+        _FORMATOS_BREAK_EVEN[nome][0]: (
+            _FORMATOS_BREAK_EVEN[nome][1](valores_atuais[nome]),
+            "Sem empate" if pd.isna(empate) else _FORMATOS_BREAK_EVEN[nome][1](empate)
+        )
+        for nome, empate in empates.items()
+    }
+    return pd.DataFrame.from_dict(linhas, orient='index', columns=["Valor Atual", "Valor de Empate"]).rename_axis("Parâmetro")
+
+def formata_tabela_estrategias(comparacao: pd.DataFrame) -> pd.DataFrame:
+    """Converte o resultado numérico de core.servico.compara_estrategias em texto para st.table."""
+    return comparacao.map("R$ {:,.2f}".format)
+
+def formata_tabela_metricas(metricas: dict) -> pd.DataFrame:
+    """Resumo por função de core.instrumentacao.metricas() (chamadas, latência e tamanho da entrada)."""
+    linhas = {
+        nome: {
+            "Chamadas": dados["chamadas"],
+            "Erros": dados["erros"],
+            "Latência Média (ms)": f"{dados['latencia_segundos']['soma'] / dados['chamadas'] * 1000:,.2f}",
+            "Latência Máxima (ms)": f"{dados['latencia_segundos']['maximo'] * 1000:,.2f}",
+            "Tempo Total (ms)": f"{dados['latencia_segundos']['soma'] * 1000:,.1f}",
+            "Entrada Média": (f"{dados['tamanho_entrada']['soma'] / dados['tamanho_entrada']['contagem']:,.0f}"
+                              if dados['tamanho_entrada']['contagem'] else "-")
+        }
+        for nome, dados in metricas["funcoes"].items()
+    }
+    return pd.DataFrame.from_dict(linhas, orient='index').rename_axis("Função")
+
+def formata_tabela_caches(metricas: dict) -> pd.DataFrame:
+    """Taxa de acerto e ocupação de cada cache registrado em core.instrumentacao."""
+    linhas = {
+        nome: {
+            "Acertos": dados["acertos"], "Faltas": dados["faltas"],
+            "Taxa de Acerto": "-" if dados["taxa_acerto"] is None else formata_percentual(dados["taxa_acerto"]),
+            "Ocupação": f"{dados['tamanho']}/{dados['capacidade']}"
+        }
+        for nome, dados in metricas["caches"].items()
+    }
+    return pd.DataFrame.from_dict(linhas, orient='index').rename_axis("Cache")
@@ -0,0 +1,259 @@
+"""
+Instrumentação opcional do core: contagem de chamadas, histogramas de latência, tamanho das
+entradas (prazo, tamanho do lote) e taxa de acerto dos caches.
+
+Desligada por padrão: as funções decoradas só fazem um teste de flag por chamada. Liga com a
+variável de ambiente CALCULADORA_METRICAS=1 ou com `ativa()` (o painel de debug do app.py, aberto
+com ?debug=1, tem um controle para ligar e desligar). A coleta é do processo inteiro, compartilhada
+entre threads e sessões.
+
+    @instrumenta(tamanho="prazo_meses")
+    def gera_tabela_amortizacao(...): ...
+
+    with mede("app.render"):
+        ...
+
+As métricas saem em texto no formato do Prometheus (exporta_prometheus) ou em JSON (exporta_json).
+"""
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Limites superiores dos baldes dos histogramas (o último balde, +Inf, é implícito)
+LIMITES_LATENCIA_SEGUNDOS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+LIMITES_TAMANHO = (1, 12, 60, 120, 240, 420, 1_000, 10_000, 100_000, 1_000_000)
+
+# Prefixo dos nomes das métricas exportadas
+PREFIXO = "calculadora"
+
+_ativa = os.environ.get("CALCULADORA_METRICAS") == "1"
+_trava = threading.Lock()
+_metricas = {}
+_caches = {}
+
+
+def ativa(ligada: bool = True) -> None:
+    """Liga (ou desliga) a coleta em todo o processo."""
+    global _ativa
+    _ativa = ligada
+
+
+def esta_ativa() -> bool:
+    return _ativa
+
+
+def limpa() -> None:
+    """Zera as métricas coletadas (os caches registrados continuam registrados)."""
+    with _trava:
+        _metricas.clear()
+
+
+# --- COLETA ---
+
+class _Histograma:
+    __slots__ = ("limites", "baldes", "soma", "contagem", "maximo")
+
+    def __init__(self, limites: tuple):
+        self.limites = limites
+        self.baldes = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.contagem = 0
+        self.maximo = 0.0
+
+    def observa(self, valor: float) -> None:
+        indice = 0
+        while indice < len(self.limites) and valor > self.limites[indice]:
+            indice += 1
+        self.baldes[indice] += 1
+        self.soma += valor
+        self.contagem += 1
+        self.maximo = max(self.maximo, valor)
+
+    def como_dict(self) -> dict:
+        acumulados, total = {}, 0
+        for limite, contagem in zip(self.limites + (math.inf,), self.baldes):
+            total += contagem
+            acumulados["+Inf" if limite == math.inf else repr(limite)] = total
+        return {"baldes": acumulados, "soma": self.soma, "contagem": self.contagem, "maximo": self.maximo}
+
+
+class _Metrica:
+    __slots__ = ("chamadas", "erros", "latencia", "tamanho")
+
+    def __init__(self):
+        self.chamadas = 0
+        self.erros = 0
+        self.latencia = _Histograma(LIMITES_LATENCIA_SEGUNDOS)
+        self.tamanho = _Histograma(LIMITES_TAMANHO)
+
+
+def registra(nome: str, segundos: float, tamanho: float = None, erro: bool = False) -> None:
+    """Registra uma chamada de `nome` (usado por instrumenta/mede; útil para medições manuais)."""
+    with _trava:
+        metrica = _metricas.get(nome)
+        if metrica is None:
+            metrica = _metricas[nome] = _Metrica()
+        metrica.chamadas += 1
+        metrica.erros += erro
+        metrica.latencia.observa(segundos)
+        if tamanho is not None:
+            metrica.tamanho.observa(tamanho)
+
+
+def _tamanho_de(valor):
+    # Prazo (escalar), lote (array/Series/DataFrame: número de linhas) ou coleção (número de itens)
+    if valor is None:
+        return None
+    if hasattr(valor, "shape"):
+        return float(valor.shape[0]) if len(valor.shape) else float(valor)
+    if hasattr(valor, "__len__"):
+        return float(len(valor))
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _extrator_de_tamanho(funcao, tamanho):
+    """Converte `tamanho` (nome de argumento ou função dos argumentos) em f(args, kwargs) -> número."""
+    if tamanho is None:
+        return None
+    if callable(tamanho):
+        return lambda args, kwargs: _tamanho_de(tamanho(*args, **kwargs))
+    parametros = list(inspect.signature(funcao).parameters.values())
+    posicao = [parametro.name for parametro in parametros].index(tamanho)
+    padrao = parametros[posicao].default
+    padrao = None if padrao is inspect.Parameter.empty else padrao
+    return lambda args, kwargs: _tamanho_de(args[posicao] if len(args) > posicao else kwargs.get(tamanho, padrao))
+
+
+def instrumenta(nome: str = None, tamanho=None):
+    """
+    Decorador que mede cada chamada quando a coleta está ligada. `nome` padrão: módulo.função.
+    `tamanho` é o nome do argumento que dá o tamanho da entrada (ex: "prazo_meses", "cotacoes")
+    ou uma função que recebe os mesmos argumentos e o devolve.
+    """
+    def decorador(funcao):
+        rotulo = nome or f"{funcao.__module__}.{funcao.__qualname__}"
+        extrai_tamanho = _extrator_de_tamanho(funcao, tamanho)
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if not _ativa:
+                return funcao(*args, **kwargs)
+            inicio = time.perf_counter()
+            erro = True
+            try:
+                resultado = funcao(*args, **kwargs)
+                erro = False
+                return resultado
+            finally:
+                registra(rotulo, time.perf_counter() - inicio, extrai_tamanho(args, kwargs) if extrai_tamanho else None, erro)
+        return medida
+    return decorador
+
+
+@contextmanager
+def mede(nome: str, tamanho: float = None):
+    """Mede o bloco `with` como uma chamada de `nome` (só quando a coleta está ligada)."""
+    if not _ativa:
+        yield
+        return
+    inicio = time.perf_counter()
+    erro = True
+    try:
+        yield
+        erro = False
+    finally:
+        registra(nome, time.perf_counter() - inicio, tamanho, erro)
+
+
+# --- CACHES ---
+
+def registra_cache(nome: str, funcao_cacheada) -> None:
+    """Registra uma função com lru_cache para que a taxa de acerto apareça nas métricas."""
+    _caches[nome] = funcao_cacheada
+
+
+def info_caches() -> dict:
+    """Acertos, faltas, tamanho, capacidade e taxa de acerto de cada cache registrado."""
+    info = {}
+    for nome, cache in _caches.items():
+        estatisticas = cache.cache_info()
+        consultas = estatisticas.hits + estatisticas.misses
+        info[nome] = {
+            "acertos": estatisticas.hits, "faltas": estatisticas.misses,
+            "tamanho": estatisticas.currsize, "capacidade": estatisticas.maxsize,
+            "taxa_acerto": estatisticas.hits / consultas if consultas else None
+        }
+    return info
+
+
+# --- EXPORTAÇÃO ---
+
+def metricas() -> dict:
+    """Fotografia das métricas: {'funcoes': {nome: {...}}, 'caches': {nome: {...}}}."""
+    with _trava:
+        funcoes = {
+            nome: {
+                "chamadas": metrica.chamadas, "erros": metrica.erros,
+                "latencia_segundos": metrica.latencia.como_dict(),
+                "tamanho_entrada": metrica.tamanho.como_dict()
+            }
+            for nome, metrica in sorted(_metricas.items())
+        }
+    return {"funcoes": funcoes, "caches": info_caches()}
+
+
+def exporta_json(indentacao: int = 2) -> str:
+    return json.dumps(metricas(), indent=indentacao, ensure_ascii=False)
+
+
+def _rotulos(**rotulos) -> str:
+    return "{" + ",".join(f'{chave}="{valor}"' for chave, valor in rotulos.items()) + "}"
+
+
+def _linhas_histograma(metrica: str, rotulo: str, valor: str, histograma: dict) -> list:
+    linhas = [f"{metrica}_bucket{_rotulos(**{rotulo: valor, 'le': limite})} {contagem}" for limite, contagem in histograma["baldes"].items()]
+    linhas.append(f"{metrica}_sum{_rotulos(**{rotulo: valor})} {histograma['soma']!r}")
+    linhas.append(f"{metrica}_count{_rotulos(**{rotulo: valor})} {histograma['contagem']}")
+    return linhas
+
+
+def exporta_prometheus() -> str:
+    """Métricas no formato de texto do Prometheus (para um endpoint /metrics ou um arquivo)."""
+    dados = metricas()
+    funcoes, caches = dados["funcoes"], dados["caches"]
+    linhas = [
+        f"# HELP {PREFIXO}_chamadas_total Chamadas por função instrumentada.",
+        f"# TYPE {PREFIXO}_chamadas_total counter",
+        *(f"{PREFIXO}_chamadas_total{_rotulos(funcao=nome)} {m['chamadas']}" for nome, m in funcoes.items()),
+        f"# HELP {PREFIXO}_erros_total Chamadas que terminaram em exceção.",
+        f"# TYPE {PREFIXO}_erros_total counter",
+        *(f"{PREFIXO}_erros_total{_rotulos(funcao=nome)} {m['erros']}" for nome, m in funcoes.items()),
+        f"# HELP {PREFIXO}_latencia_segundos Latência por função.",
+        f"# TYPE {PREFIXO}_latencia_segundos histogram"
+    ]
+    for nome, m in funcoes.items():
+        linhas += _linhas_histograma(f"{PREFIXO}_latencia_segundos", "funcao", nome, m["latencia_segundos"])
+    linhas += [
+        f"# HELP {PREFIXO}_tamanho_entrada Tamanho da entrada (prazo em meses, linhas do lote, itens).",
+        f"# TYPE {PREFIXO}_tamanho_entrada histogram"
+    ]
+    for nome, m in funcoes.items():
+        if m["tamanho_entrada"]["contagem"]:
+            linhas += _linhas_histograma(f"{PREFIXO}_tamanho_entrada", "funcao", nome, m["tamanho_entrada"])
+    for metrica, chave, tipo, ajuda in (
+        ("cache_acertos_total", "acertos", "counter", "Acertos por cache."),
+        ("cache_faltas_total", "faltas", "counter", "Faltas por cache."),
+        ("cache_entradas", "tamanho", "gauge", "Entradas ocupadas por cache."),
+        ("cache_taxa_acerto", "taxa_acerto", "gauge", "Acertos / consultas por cache (NaN sem consultas).")
+    ):
+        linhas += [f"# HELP {PREFIXO}_{metrica} {ajuda}", f"# TYPE {PREFIXO}_{metrica} {tipo}"]
+        linhas += [f"{PREFIXO}_{metrica}{_rotulos(cache=nome)} {'NaN' if info[chave] is None else info[chave]}" for nome, info in caches.items()]
+    return "\n".join(linhas) + "\n"
@@ -0,0 +1,211 @@
+"""
+Camada de memoização sobre os cálculos do core.
+
+Cada rerun do Streamlit executa o app.py do início ao fim; sem cache, qualquer mudança em um
+widget recalcula tabelas, grades, simulações e figuras que não dependem dele. As funções
+abaixo guardam os resultados em caches LRU limitados (functools.lru_cache), chaveados por
+ParametrosAnalise (imutável e hashável) ou pelos escalares de que cada resultado depende.
+Os caches ficam no processo, então são compartilhados entre reruns e entre sessões.
+
+Os objetos retornados (DataFrames, figuras, arrays) são compartilhados: não os modifique.
+"""
+import io
+from dataclasses import replace
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .parametros import ParametrosAnalise
+from .instrumentacao import registra_cache
+from .calculations import (
+    calcula_vp_custo_financiamento, calcula_vp_custo_consorcio,
+    gera_tabela_amortizacao, exporta_tabela_amortizacao_csv
+)
+from .curvas import curva_constante, curvas_selic_padrao
+from .analysis import (
+    run_scenario_analysis, run_curve_analysis, run_sensitivity_grid, calcula_fronteira_break_even, simular_estrategia_venda_grade, otimiza_lance,
+    calcula_break_even_lote, PARAMETROS_BREAK_EVEN
+)
+from .monte_carlo import simula_monte_carlo_consorcio
+from .plotting import (
+    plot_custo_total_bar_chart, plot_scenario_analysis_bar_chart, plot_sensitivity_heatmap,
+    plot_monte_carlo_histogram, plot_grade_venda_heatmap, plot_curva_lance, plot_amortizacao
+)
+
+# Número máximo de entradas por cache (as mais antigas são descartadas primeiro)
+TAMANHO_CACHE = 128
+# Resultados pesados (grades, simulações) guardam menos entradas
+TAMANHO_CACHE_PESADO = 16
+
+_caches = []
+
+def _memoiza(tamanho: int):
+    """lru_cache com registro, para que limpa_caches/info_caches enxerguem todos os caches do módulo."""
+    def decorador(funcao):
+        cacheada = lru_cache(maxsize=tamanho)(funcao)
+        _caches.append(cacheada)
+        registra_cache(f"memoizacao.{funcao.__name__}", cacheada)
+        return cacheada
+    return decorador
+
+
+def limpa_caches() -> None:
+    """Esvazia todos os caches do módulo."""
+    for cache in _caches:
+        cache.cache_clear()
+
+
+def info_caches() -> dict:
+    """Estatísticas (acertos, faltas, tamanho) de cada cache, pelo nome da função."""
+    return {cache.__name__: cache.cache_info() for cache in _caches}
+
+
+def _somente_leitura(*arrays) -> None:
+    for array in arrays:
+        array.flags.writeable = False
+
+
+# --- RESULTADOS ---
+
+@_memoiza(TAMANHO_CACHE)
+def custos_vp(params: ParametrosAnalise) -> tuple:
+    """(VP do financiamento, VP do consórcio em módulo) no cenário realista."""
+    vp_fin = calcula_vp_custo_financiamento(params.valor_entrada, params.valor_a_financiar, params.taxa_juros_anual_fin, params.prazo_meses_fin, params.taxa_selic_anual)
+    vp_con = abs(calcula_vp_custo_consorcio(params.parcela_con, params.prazo_meses_con, params.taxa_selic_anual))
+    return vp_fin, vp_con
+
+
+@_memoiza(TAMANHO_CACHE)
+def tabela_amortizacao(valor_financiado: float, taxa_juros_anual: float, prazo_meses: int, sistema: str = "price") -> pd.DataFrame:
+    return gera_tabela_amortizacao(valor_financiado, taxa_juros_anual, prazo_meses, sistema)
+
+
+@_memoiza(TAMANHO_CACHE)
+def tabela_amortizacao_csv(valor_financiado: float, taxa_juros_anual: float, prazo_meses: int, sistema: str = "price") -> str:
+    destino = io.StringIO()
+    exporta_tabela_amortizacao_csv(destino, valor_financiado, taxa_juros_anual, prazo_meses, sistema)
+    return destino.getvalue()
+
+
+@_memoiza(TAMANHO_CACHE)
+def cenarios(params: ParametrosAnalise) -> pd.DataFrame:
+    return run_scenario_analysis(params.como_dict())
+
+
+@_memoiza(TAMANHO_CACHE)
+def curvas_selic(taxa_selic_anual: float, horizonte: int) -> dict:
+    """Trajetórias padrão da Selic (core.curvas.curvas_selic_padrao), construídas uma vez por taxa e horizonte."""
+    return curvas_selic_padrao(taxa_selic_anual, horizonte)
+
+
+@_memoiza(TAMANHO_CACHE)
+def cenarios_curvas(params: ParametrosAnalise, taxa_indexador_consorcio: float = None, taxa_indexador_financiamento: float = None) -> pd.DataFrame:
+    """
+    run_curve_analysis memoizado sobre as curvas padrão da Selic. As taxas anuais dos indexadores
+    (ex: INCC para o consórcio, TR para o financiamento) viram curvas constantes; None = sem correção.
+    """
+    horizonte = max(params.prazo_meses_fin, params.prazo_meses_con)
+    indexador_con = None if taxa_indexador_consorcio is None else curva_constante(taxa_indexador_consorcio, horizonte)
+    indexador_fin = None if taxa_indexador_financiamento is None else curva_constante(taxa_indexador_financiamento, horizonte)
+    return run_curve_analysis(params.como_dict(), curvas_selic(params.taxa_selic_anual, horizonte), indexador_con, indexador_fin)
+
+
+@_memoiza(TAMANHO_CACHE)
+def pontos_de_empate(params: ParametrosAnalise) -> dict:
+    """Valor de empate (break-even) de cada parâmetro de PARAMETROS_BREAK_EVEN, mantidos os demais."""
+    dados = params.como_dict()
+    return {parametro: float(calcula_break_even_lote(dados, parametro)) for parametro in PARAMETROS_BREAK_EVEN}
+
+
+def _congela_eixos(eixos: dict) -> tuple:
+    return tuple((nome, tuple(np.asarray(valores, dtype=float).tolist())) for nome, valores in eixos.items())
+
+
+def _sem_eixos(params: ParametrosAnalise, eixos: tuple) -> ParametrosAnalise:
+    # Os parâmetros que viram eixos não afetam a grade: fixá-los no primeiro valor do eixo
+    # evita chaves distintas para o mesmo resultado (ex: mover a Selic com a Selic como eixo)
+    return replace(params, **{nome: valores[0] for nome, valores in eixos})
+
+
+@_memoiza(TAMANHO_CACHE_PESADO)
+def _grade_sensibilidade(params: ParametrosAnalise, eixos: tuple) -> pd.DataFrame:
+    return run_sensitivity_grid(params.como_dict(), dict(eixos))
+
+
+def grade_sensibilidade(params: ParametrosAnalise, eixos: dict) -> pd.DataFrame:
+    """run_sensitivity_grid memoizado; `eixos` no mesmo formato (nome -> valores)."""
+    eixos = _congela_eixos(eixos)
+    return _grade_sensibilidade(_sem_eixos(params, eixos), eixos)
+
+
+@_memoiza(TAMANHO_CACHE_PESADO)
+def grade_venda(parcela: float, prazo_meses_con: int, taxa_desconto_anual: float, agio_minimo: int = -10, agio_maximo: int = 50) -> pd.DataFrame:
+    """Grade mês de contemplação (1..prazo) × ágio (inteiros de agio_minimo a agio_maximo)."""
+    return simular_estrategia_venda_grade(parcela, np.arange(1, prazo_meses_con + 1), np.arange(agio_minimo, agio_maximo + 1), taxa_desconto_anual)
+
+
+@_memoiza(TAMANHO_CACHE_PESADO)
+def otimizacao_lance(parcela: float, prazo_meses_con: int, carta_credito: float, taxa_desconto_anual: float, lance_minimo_vencedor: float = None) -> dict:
+    """otimiza_lance memoizado, com a varredura padrão de percentuais e meses."""
+    return otimiza_lance(parcela, prazo_meses_con, carta_credito, taxa_desconto_anual, lance_minimo_vencedor=lance_minimo_vencedor)
+
+
+@_memoiza(TAMANHO_CACHE_PESADO)
+def monte_carlo(params: ParametrosAnalise, n_caminhos: int = 100_000, semente: int = 0, prob_lance: float = 0.0, volatilidade_selic: float = 0.02) -> dict:
+    """simula_monte_carlo_consorcio memoizado. Exige semente fixa: sem ela o resultado não é reproduzível."""
+    if semente is None:
+        raise ValueError("A simulação memoizada exige uma semente fixa.")
+    resultado = simula_monte_carlo_consorcio(params.como_dict(), n_caminhos=n_caminhos, semente=semente,
+                                             prob_lance=prob_lance, volatilidade_selic=volatilidade_selic)
+    _somente_leitura(resultado['meses_contemplacao'], resultado['vp_consorcio'], resultado['vp_financiamento'], resultado['tir_anual'])
+    return resultado
+
+
+# --- FIGURAS ---
+
+@_memoiza(TAMANHO_CACHE)
+def figura_custo_total(params: ParametrosAnalise):
+    return plot_custo_total_bar_chart(*custos_vp(params))
+
+
+@_memoiza(TAMANHO_CACHE)
+def figura_amortizacao(valor_financiado: float, taxa_juros_anual: float, prazo_meses: int, sistema: str = "price"):
+    return plot_amortizacao(tabela_amortizacao(valor_financiado, taxa_juros_anual, prazo_meses, sistema))
+
+
+@_memoiza(TAMANHO_CACHE)
+def figura_cenarios(params: ParametrosAnalise):
+    return plot_scenario_analysis_bar_chart(cenarios(params))
+
+
+@_memoiza(TAMANHO_CACHE)
+def figura_cenarios_curvas(params: ParametrosAnalise, taxa_indexador_consorcio: float = None, taxa_indexador_financiamento: float = None):
+    return plot_scenario_analysis_bar_chart(cenarios_curvas(params, taxa_indexador_consorcio, taxa_indexador_financiamento))
+
+
+@_memoiza(TAMANHO_CACHE_PESADO)
+def _figura_sensibilidade(params: ParametrosAnalise, eixos: tuple, eixo_x: str, eixo_y: str):
+    grade = _grade_sensibilidade(params, eixos)
+    return plot_sensitivity_heatmap(grade, eixo_x=eixo_x, eixo_y=eixo_y, fronteira=calcula_fronteira_break_even(grade, eixo_x))
+
+
+def figura_sensibilidade(params: ParametrosAnalise, eixos: dict, eixo_x: str, eixo_y: str):
+    """Mapa de calor da grade `eixo_y` × `eixo_x`, com a fronteira de break-even ao longo de `eixo_x`."""
+    eixos = _congela_eixos(eixos)
+    return _figura_sensibilidade(_sem_eixos(params, eixos), eixos, eixo_x, eixo_y)
+
+
+@_memoiza(TAMANHO_CACHE_PESADO)
+def figura_grade_venda(parcela: float, prazo_meses_con: int, taxa_desconto_anual: float):
+    return plot_grade_venda_heatmap(grade_venda(parcela, prazo_meses_con, taxa_desconto_anual))
+
+
+@_memoiza(TAMANHO_CACHE_PESADO)
+def figura_curva_lance(parcela: float, prazo_meses_con: int, carta_credito: float, taxa_desconto_anual: float, lance_minimo_vencedor: float = None):
+    return plot_curva_lance(otimizacao_lance(parcela, prazo_meses_con, carta_credito, taxa_desconto_anual, lance_minimo_vencedor))
+
+
+@_memoiza(TAMANHO_CACHE_PESADO)
+def figura_monte_carlo(params: ParametrosAnalise, n_caminhos: int = 100_000, semente: int = 0, prob_lance: float = 0.0, volatilidade_selic: float = 0.02):
+    return plot_monte_carlo_histogram(monte_carlo(params, n_caminhos, semente, prob_lance, volatilidade_selic))
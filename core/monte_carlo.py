@@ -0,0 +1,167 @@
+import numpy as np
+from .calculations import calcula_parcela_price_lote
+from .solvers import calcula_tir_lote
+from .instrumentacao import instrumenta
+
+# --- SIMULAÇÃO DE MONTE CARLO DO CONSÓRCIO ---
+#
+# Modelo:
+# - Contemplação: a cada mês o grupo faz `sorteios_por_mes` sorteios entre os participantes
+#   ainda não contemplados e `lances_por_mes` contemplações por lance. A chance do cliente
+#   vencer por lance em um mês é `prob_lance`. No último mês todos estão contemplados.
+# - Selic: passeio aleatório da taxa anual, constante em blocos de `passo_selic_meses`
+#   (aproximando as reuniões do Copom), com piso em `selic_minima`. Os caminhos saem em pares
+#   antitéticos (choques com sinais opostos): metade dos sorteios por caminho e menos variância.
+# - Custo líquido em VP: parcelas pagas (a primeira em t=0, como em calcula_vp_custo_consorcio)
+#   menos o VP da carta recebida na contemplação. Para o financiamento, entrada + parcelas
+#   menos o valor do bem, recebido em t=0. Assim as duas opções ficam comparáveis.
+
+def sorteia_meses_contemplacao(rng: np.random.Generator, n_caminhos: int, prazo: int, tamanho_grupo: int = None,
+                               sorteios_por_mes: int = 1, lances_por_mes: int = 1, prob_lance: float = 0.0) -> np.ndarray:
+    """Sorteia o mês de contemplação (1..prazo) de `n_caminhos` cotas pelo método da transformada inversa."""
+    contemplacoes_por_mes = sorteios_por_mes + lances_por_mes
+    if tamanho_grupo is None:
+        tamanho_grupo = prazo * contemplacoes_por_mes
+    meses = np.arange(1, prazo + 1)
+    restantes = np.maximum(tamanho_grupo - contemplacoes_por_mes * (meses - 1), 1)
+    # Probabilidade de ser contemplado no mês m, dado que não foi antes (sorteio ou lance)
+    risco = 1 - (1 - np.minimum(sorteios_por_mes / restantes, 1.0)) * (1 - prob_lance)
+    risco[-1] = 1.0
+    distribuicao = 1 - np.cumprod(1 - risco)
+    return np.searchsorted(distribuicao, rng.random(n_caminhos), side='right') + 1
+
+
+def _gera_passos_selic(rng: np.random.Generator, n_caminhos: int, n_passos: int, selic_inicial: float,
+                       volatilidade_anual: float, selic_minima: float, passo_meses: int, antiteticos: bool):
+    """
+    Gera a Selic anual de todos os caminhos, um passo de cada vez (um vetor por passo, sempre o mesmo
+    buffer: copie se precisar guardar). Os choques são sorteados de uma vez, caminho a caminho, e
+    percorridos no tempo: o passeio fica em um vetor, sem montar a matriz caminhos × passos.
+    """
+    sorteados = -(-n_caminhos // 2) if antiteticos else n_caminhos
+    choques = np.ascontiguousarray(rng.standard_normal((sorteados, max(n_passos - 1, 0))).T)
+    choques *= volatilidade_anual * np.sqrt(passo_meses / 12)
+    passeio = np.zeros(sorteados)
+    selic = np.empty(n_caminhos)
+    for indice in range(n_passos):
+        if indice:
+            passeio += choques[indice - 1]
+        if antiteticos:
+            np.add(passeio, selic_inicial, out=selic[0::2])
+            np.subtract(selic_inicial, passeio[:n_caminhos // 2], out=selic[1::2])
+        else:
+            np.add(passeio, selic_inicial, out=selic)
+        yield np.maximum(selic, selic_minima, out=selic)
+
+
+def simula_caminhos_selic(rng: np.random.Generator, n_caminhos: int, n_passos: int, selic_inicial: float,
+                          volatilidade_anual: float = 0.02, selic_minima: float = 0.02, passo_meses: int = 3,
+                          antiteticos: bool = False) -> np.ndarray:
+    """
+    Gera caminhos da Selic anual (n_caminhos × n_passos), constante em cada passo de `passo_meses`.
+    O primeiro passo é a Selic atual; os choques seguem um passeio aleatório gaussiano.
+    Com `antiteticos`, cada caminho de índice ímpar usa os choques do anterior com o sinal trocado:
+    metade dos sorteios (o passo mais caro) e menor variância nas médias.
+    """
+    caminhos = np.empty((n_caminhos, n_passos))
+    passos = _gera_passos_selic(rng, n_caminhos, n_passos, selic_inicial, volatilidade_anual, selic_minima, passo_meses, antiteticos)
+    for indice, selic in enumerate(passos):
+        caminhos[:, indice] = selic
+    return caminhos
+
+
+def _serie_geometrica(razao: np.ndarray, termos: int) -> np.ndarray:
+    """1 + razao + ... + razao^(termos-1), por Horner (sem potências nem divisão)."""
+    if termos == 0:
+        return np.zeros_like(razao)
+    soma = np.ones_like(razao)
+    for _ in range(termos - 1):
+        soma *= razao
+        soma += 1.0
+    return soma
+
+
+@instrumenta(tamanho="n_caminhos")
+def simula_monte_carlo_consorcio(params: dict, n_caminhos: int = 100_000, semente: int = None,
+                                 tamanho_grupo: int = None, sorteios_por_mes: int = 1, lances_por_mes: int = 1,
+                                 prob_lance: float = 0.0, volatilidade_selic: float = 0.02, selic_minima: float = 0.02,
+                                 passo_selic_meses: int = 3, tamanho_bloco: int = 25_000) -> dict:
+    """
+    Simula por Monte Carlo o mês de contemplação e a trajetória da Selic, comparando o custo
+    líquido em VP do consórcio com o do financiamento em cada caminho.
+
+    `params` segue o formato de st.session_state.params (valor_bem, valor_entrada, parcela_con, ...).
+    Os caminhos são processados em blocos de `tamanho_bloco` para limitar o uso de memória. Em cada
+    bloco, os descontos são acumulados passo a passo da Selic (vetores do tamanho do bloco, que cabem
+    no cache do processador), e cada soma é lida quando o passo chega ao prazo correspondente.
+    Retorna as amostras e um resumo: média, percentis, TIR e probabilidade de o consórcio vencer.
+    """
+    rng = np.random.default_rng(semente)
+    prazo_con, prazo_fin = params['prazo_meses_con'], params['prazo_meses_fin']
+    carta_credito, parcela_con = params['carta_credito'], params['parcela_con']
+    parcela_fin = float(calcula_parcela_price_lote(params['valor_a_financiar'], params['taxa_juros_anual_fin'], prazo_fin))
+    passo = passo_selic_meses
+    n_passos = -(-max(prazo_con, prazo_fin) // passo)
+
+    meses = sorteia_meses_contemplacao(rng, n_caminhos, prazo_con, tamanho_grupo, sorteios_por_mes, lances_por_mes, prob_lance)
+    vp_con = np.empty(n_caminhos)
+    vp_fin = np.empty(n_caminhos)
+    # Blocos de tamanho par: os pares antitéticos (e o resultado) não dependem de tamanho_bloco
+    tamanho_bloco += tamanho_bloco % 2
+    for inicio in range(0, n_caminhos, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, n_caminhos)
+        # Caminhos agrupados pelo passo da Selic em que são contemplados (a carta é descontada nele)
+        passo_contemplacao, deslocamento = np.divmod(meses[inicio:fim] - 1, passo)
+        ordem = np.argsort(passo_contemplacao, kind='stable')
+        limites = np.searchsorted(passo_contemplacao[ordem], np.arange(n_passos + 1))
+
+        desconto = np.ones(fim - inicio)      # fator de desconto no início do passo
+        soma = np.zeros(fim - inicio)         # soma dos fatores de desconto dos meses já percorridos
+        fator_carta = np.empty(fim - inicio)
+        somas = {}
+        passos_selic = _gera_passos_selic(rng, fim - inicio, n_passos, params['taxa_selic_anual'], volatilidade_selic,
+                                          selic_minima, passo, antiteticos=True)
+        for indice, selic in enumerate(passos_selic):
+            # Fator de desconto de um mês: 1 / (1 + taxa mensal efetiva) = (1 + Selic anual)^(-1/12)
+            mensal = np.log1p(selic)
+            mensal *= -1 / 12
+            np.exp(mensal, out=mensal)
+            contemplados = ordem[limites[indice]:limites[indice + 1]]
+            fator_carta[contemplados] = desconto[contemplados] * mensal[contemplados] ** deslocamento[contemplados]
+            for prazo in (prazo_con, prazo_fin):
+                completos, resto = divmod(prazo, passo)
+                if indice == completos:
+                    somas[prazo] = soma + desconto * _serie_geometrica(mensal, resto)
+            # Passo completo: desconto × (1 + v + ... + v^(passo-1)); o desconto seguinte é desconto × v^passo
+            serie = _serie_geometrica(mensal, passo)
+            soma += desconto * serie
+            mensal -= 1.0
+            mensal *= serie
+            mensal += 1.0
+            desconto *= mensal
+        # Prazos múltiplos do passo terminam junto com o último passo
+        somas.setdefault(prazo_con, soma)
+        somas.setdefault(prazo_fin, soma)
+
+        vp_con[inicio:fim] = parcela_con * somas[prazo_con] - carta_credito * fator_carta
+        vp_fin[inicio:fim] = params['valor_entrada'] + parcela_fin * somas[prazo_fin] - params['valor_bem']
+
+    # A TIR depende só do mês de contemplação: resolve uma vez por mês distinto
+    meses_unicos, posicao = np.unique(meses, return_inverse=True)
+    tir_mensal, _ = calcula_tir_lote(parcela_con, prazo_con, carta_credito, meses_unicos - 1)
+    tir_mensal = tir_mensal[posicao]
+    tir_anual = (1 + tir_mensal)**12 - 1
+
+    percentis = (5, 25, 50, 75, 95)
+    return {
+        'meses_contemplacao': meses,
+        'vp_consorcio': vp_con,
+        'vp_financiamento': vp_fin,
+        'tir_anual': tir_anual,
+        'vp_consorcio_medio': float(vp_con.mean()),
+        'vp_consorcio_percentis': dict(zip(percentis, np.percentile(vp_con, percentis))),
+        'vp_financiamento_medio': float(vp_fin.mean()),
+        'mes_contemplacao_medio': float(meses.mean()),
+        'tir_anual_mediana': float(np.nanmedian(tir_anual)) if np.isfinite(tir_anual).any() else float('nan'),
+        'prob_consorcio_vence': float((vp_con < vp_fin).mean())
+    }
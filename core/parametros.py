@@ -0,0 +1,45 @@
+from dataclasses import dataclass, asdict
+from .calculations import calcula_parcela_price, calcula_parcela_consorcio
+
+# --- PARÂMETROS DA ANÁLISE ---
+
+@dataclass(frozen=True)
+class ParametrosAnalise:
+    """
+    Parâmetros de entrada da barra lateral do app.py.
+
+    Imutável e hashável: serve de chave para os caches de core.memoizacao. Os valores
+    derivados (valor financiado, parcelas, carta) são propriedades, nunca gravados no objeto.
+    """
+    valor_bem: float
+    valor_entrada: float
+    taxa_juros_anual_fin: float
+    prazo_meses_fin: int
+    taxa_selic_anual: float
+    prazo_meses_con: int
+    taxa_adm_total: float
+    fundo_reserva_total: float = 0.0
+
+    @property
+    def valor_a_financiar(self) -> float:
+        return self.valor_bem - self.valor_entrada
+
+    @property
+    def carta_credito(self) -> float:
+        return self.valor_bem
+
+    @property
+    def parcela_fin(self) -> float:
+        return calcula_parcela_price(self.valor_a_financiar, self.taxa_juros_anual_fin, self.prazo_meses_fin)
+
+    @property
+    def parcela_con(self) -> float:
+        return calcula_parcela_consorcio(self.valor_bem, self.prazo_meses_con, self.taxa_adm_total, self.fundo_reserva_total)
+
+    def como_dict(self) -> dict:
+        """Dicionário no formato esperado por core.analysis e core.monte_carlo (entradas + derivados)."""
+        return {
+            **asdict(self),
+            'valor_a_financiar': self.valor_a_financiar, 'parcela_fin': self.parcela_fin,
+            'parcela_con': self.parcela_con, 'carta_credito': self.carta_credito
+        }
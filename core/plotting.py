@@ -1,10 +1,34 @@
-import plotly.graph_objects as go
+from typing import TYPE_CHECKING
+
+import numpy as np
 import pandas as pd
 
-def plot_custo_total_bar_chart(vp_fin: float, vp_con: float) -> go.Figure:
+from .instrumentacao import instrumenta
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# O plotly é importado dentro de cada função: quem só calcula (core.batch, testes, a primeira
+# renderização do app) não paga a importação, e o módulo é carregado na primeira figura.
+
+# Séries e eixos mais longos que isso são reamostrados antes de ir para o navegador
+# (ex: 420 meses de amortização viram ~120 pontos; o formato da curva não muda)
+MAXIMO_PONTOS_SERIE = 120
+MAXIMO_LINHAS_MAPA = 240
+
+def indices_reamostrados(tamanho: int, maximo: int = MAXIMO_PONTOS_SERIE) -> np.ndarray:
+    """Índices igualmente espaçados de 0 a tamanho-1 (sempre com o primeiro e o último), no máximo `maximo`."""
+    if tamanho <= maximo:
+        return np.arange(tamanho)
+    return np.unique(np.linspace(0, tamanho - 1, maximo).round().astype(int))
+
+
+@instrumenta()
+def plot_custo_total_bar_chart(vp_fin: float, vp_con: float) -> "go.Figure":
     """
     Cria um gráfico de barras comparando o Custo em Valor Presente do Financiamento vs. Consórcio.
     """
+    import plotly.graph_objects as go
     fig = go.Figure(data=[
         go.Bar(name='Financiamento', x=['Custo Total em VP'], y=[vp_fin], text=f"R$ {vp_fin:,.2f}", textposition='auto'),
         go.Bar(name='Consórcio', x=['Custo Total em VP'], y=[vp_con], text=f"R$ {vp_con:,.2f}", textposition='auto')
@@ -16,18 +40,19 @@ def plot_custo_total_bar_chart(vp_fin: float, vp_con: float) -> go.Figure:
     )
     return fig
 
-def plot_scenario_analysis_bar_chart(df_cenarios: pd.DataFrame) -> go.Figure:
+@instrumenta()
+def plot_scenario_analysis_bar_chart(df_cenarios: pd.DataFrame) -> "go.Figure":
     """
     Cria um gráfico de barras agrupado para a análise de cenários.
     """
-    # Precisamos converter as colunas de custo de string para float para o gráfico
-    df_plot = df_cenarios.copy()
-    df_plot['VP Custo Financiamento (R$)'] = df_plot['VP Custo Financiamento (R$)'].str.replace('R$ ', '', regex=False).str.replace('.', '', regex=False).str.replace(',', '.', regex=False).astype(float)
-    df_plot['VP Custo Consórcio (R$)'] = df_plot['VP Custo Consórcio (R$)'].str.replace('R$ ', '', regex=False).str.replace('.', '', regex=False).str.replace(',', '.', regex=False).astype(float)
+    import plotly.graph_objects as go
+    # As colunas de custo já chegam numéricas de run_scenario_analysis
+    vp_fin = df_cenarios['VP Custo Financiamento (R$)']
+    vp_con = df_cenarios['VP Custo Consórcio (R$)']
 
     fig = go.Figure(data=[
-        go.Bar(name='Financiamento', x=df_plot.index, y=df_plot['VP Custo Financiamento (R$)'], text=df_plot['VP Custo Financiamento (R$)'].apply(lambda x: f'R$ {x:,.2f}'), textposition='auto'),
-        go.Bar(name='Consórcio', x=df_plot.index, y=df_plot['VP Custo Consórcio (R$)'], text=df_plot['VP Custo Consórcio (R$)'].apply(lambda x: f'R$ {x:,.2f}'), textposition='auto')
+        go.Bar(name='Financiamento', x=df_cenarios.index, y=vp_fin, text=[f'R$ {x:,.2f}' for x in vp_fin], textposition='auto'),
+        go.Bar(name='Consórcio', x=df_cenarios.index, y=vp_con, text=[f'R$ {x:,.2f}' for x in vp_con], textposition='auto')
     ])
     fig.update_layout(
         title_text='Comparativo de Custos nos Diferentes Cenários',
@@ -35,4 +60,130 @@ def plot_scenario_analysis_bar_chart(df_cenarios: pd.DataFrame) -> go.Figure:
         yaxis_title="Custo em VP (R$)",
         barmode='group'
     )
-    return fig
\ No newline at end of file
+    return fig
+
+@instrumenta()
+def plot_sensitivity_heatmap(grade: pd.DataFrame, eixo_x: str, eixo_y: str, fronteira: pd.Series = None) -> "go.Figure":
+    """
+    Cria um mapa de calor da diferença de VP (Financiamento - Consórcio) em uma grade 2-D.
+    Valores negativos favorecem o financiamento; positivos, o consórcio.
+    Opcionalmente sobrepõe a fronteira de break-even (valor de `eixo_x` para cada `eixo_y`).
+    """
+    import plotly.graph_objects as go
+    matriz = grade["Diferença (R$)"].unstack(eixo_x)
+    matriz = matriz.iloc[indices_reamostrados(len(matriz), MAXIMO_LINHAS_MAPA)]
+    fig = go.Figure(data=[
+        go.Heatmap(
+            x=matriz.columns, y=matriz.index, z=matriz.to_numpy(),
+            colorscale='RdBu_r', zmid=0, colorbar=dict(title="Fin. - Cons. (R$)"),
+            hovertemplate=f"{eixo_x}: %{{x:.4f}}<br>{eixo_y}: %{{y:.4f}}<br>Diferença: R$ %{{z:,.2f}}<extra></extra>"
+        )
+    ])
+    if fronteira is not None:
+        fig.add_trace(go.Scatter(x=fronteira.to_numpy(), y=fronteira.index, mode='lines', name='Break-even', line=dict(color='black', width=2)))
+    fig.update_layout(
+        title_text='Mapa de Sensibilidade: Diferença de Custo em VP',
+        xaxis_title=eixo_x,
+        yaxis_title=eixo_y
+    )
+    return fig
+
+
+@instrumenta()
+def plot_monte_carlo_histogram(resultado: dict, n_faixas: int = 60) -> "go.Figure":
+    """
+    Cria histogramas sobrepostos do custo líquido em VP do consórcio e do financiamento
+    nos caminhos da simulação de Monte Carlo. As faixas são calculadas aqui (np.histogram),
+    para não enviar centenas de milhares de pontos ao navegador.
+    """
+    import plotly.graph_objects as go
+    amostras = np.concatenate([resultado['vp_financiamento'], resultado['vp_consorcio']])
+    faixas = np.histogram_bin_edges(amostras, bins=n_faixas)
+    centros = (faixas[:-1] + faixas[1:]) / 2
+    contagem_fin, _ = np.histogram(resultado['vp_financiamento'], bins=faixas)
+    contagem_con, _ = np.histogram(resultado['vp_consorcio'], bins=faixas)
+
+    fig = go.Figure(data=[
+        go.Bar(name='Financiamento', x=centros, y=contagem_fin, opacity=0.6),
+        go.Bar(name='Consórcio', x=centros, y=contagem_con, opacity=0.6)
+    ])
+    fig.update_layout(
+        title_text='Distribuição do Custo Líquido em VP (Monte Carlo)',
+        xaxis_title="Custo líquido em VP (R$)",
+        yaxis_title="Número de caminhos",
+        barmode='overlay',
+        bargap=0
+    )
+    return fig
+
+
+@instrumenta()
+def plot_grade_venda_heatmap(grade: pd.DataFrame) -> "go.Figure":
+    """
+    Cria um mapa de calor da TIR anual da venda da cota por mês de contemplação × ágio.
+    Células sem TIR (não convergiu) ficam em branco.
+    """
+    import plotly.graph_objects as go
+    matriz = grade["TIR Anual"].unstack("Ágio (%)")
+    matriz = matriz.iloc[indices_reamostrados(len(matriz), MAXIMO_LINHAS_MAPA)]
+    fig = go.Figure(data=[
+        go.Heatmap(
+            x=matriz.columns, y=matriz.index, z=matriz.to_numpy() * 100,
+            colorscale='RdBu', zmid=0, colorbar=dict(title="TIR anual (%)"),
+            hovertemplate="Ágio: %{x:.0f}%<br>Mês: %{y}<br>TIR anual: %{z:.2f}%<extra></extra>"
+        )
+    ])
+    fig.update_layout(
+        title_text='TIR Anual da Venda da Cota',
+        xaxis_title="Ágio na Venda (%)",
+        yaxis_title="Mês da Contemplação"
+    )
+    return fig
+
+
+@instrumenta()
+def plot_curva_lance(otimizacao: dict) -> "go.Figure":
+    """
+    Cria a curva de custo líquido em VP por percentual de lance, no mês ótimo de
+    core.analysis.otimiza_lance, marcando o lance de menor custo.
+    """
+    import plotly.graph_objects as go
+    curva = otimizacao['curva'].xs(otimizacao['mes_otimo'], level="Mês do Lance")
+    fig = go.Figure(data=[
+        go.Scatter(x=curva.index, y=curva["Custo Líquido VP (R$)"], mode='lines', name='Custo líquido'),
+        go.Scatter(
+            x=[otimizacao['percentual_otimo']], y=[otimizacao['custo_vp_otimo']], mode='markers', name='Lance ótimo',
+            marker=dict(size=12, symbol='star'), hovertemplate="Lance: %{x:.1f}%<br>Custo: R$ %{y:,.2f}<extra></extra>"
+        )
+    ])
+    fig.update_layout(
+        title_text=f"Custo Líquido em VP por Lance (lance no mês {otimizacao['mes_otimo']})",
+        xaxis_title="Lance (% da carta)",
+        yaxis_title="Custo líquido em VP (R$)"
+    )
+    return fig
+
+
+@instrumenta(tamanho="tabela")
+def plot_amortizacao(tabela: pd.DataFrame) -> "go.Figure":
+    """
+    Cria o gráfico do saldo devedor e da composição da parcela (juros × amortização) mês a mês,
+    a partir de core.calculations.gera_tabela_amortizacao. Prazos longos são reamostrados.
+    """
+    import plotly.graph_objects as go
+    tabela = tabela.iloc[indices_reamostrados(len(tabela))]
+    meses = tabela["Mês"]
+    fig = go.Figure(data=[
+        go.Scatter(x=meses, y=tabela["Saldo Devedor (R$)"], mode='lines', name='Saldo devedor', yaxis='y2'),
+        go.Bar(x=meses, y=tabela["Juros (R$)"], name='Juros'),
+        go.Bar(x=meses, y=tabela["Amortização (R$)"], name='Amortização')
+    ])
+    fig.update_layout(
+        title_text='Evolução do Financiamento',
+        xaxis_title="Mês",
+        yaxis=dict(title="Parcela (R$)"),
+        yaxis2=dict(title="Saldo devedor (R$)", overlaying='y', side='right', showgrid=False),
+        barmode='stack',
+        bargap=0
+    )
+    return fig
@@ -0,0 +1,138 @@
+"""
+Serviço de simulação concorrente das estratégias e dos cenários.
+
+O app.py chamava cada estratégia de forma síncrona, uma por clique, na thread do Streamlit.
+Aqui as avaliações são submetidas a um pool e devolvidas como concurrent.futures.Future, para que
+a interface peça tudo de uma vez e só espere pelo mais lento:
+- threads (padrão): os cálculos vetorizados do NumPy liberam o GIL, e os caches de
+  core.memoizacao continuam compartilhados com o processo do app;
+- processos (`processos=True`): para lotes grandes e puramente CPU, como em core.batch.
+
+As variantes `*_async` embrulham os mesmos futures para uso com asyncio (await).
+"""
+import asyncio
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import pandas as pd
+
+from . import memoizacao
+from .parametros import ParametrosAnalise
+from .calculations import fator_desconto_lote
+from .analysis import simular_estrategia_lance, simular_estrategia_venda, simular_estrategia_aluguel
+
+# Estratégias avaliadas por simula_estrategias, na ordem em que aparecem na comparação
+ESTRATEGIAS = ("lance", "venda", "aluguel")
+
+
+class ServicoSimulacao:
+    """
+    Pool de execução das simulações. Use como gerenciador de contexto ou chame `fecha()`.
+    Os métodos `simula_*`/`avalia_*` retornam dicionários de nome -> Future.
+    """
+
+    def __init__(self, max_trabalhadores: int = None, processos: bool = False):
+        self.processos = processos
+        if processos:
+            self._pool = ProcessPoolExecutor(max_workers=max_trabalhadores)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_trabalhadores, thread_name_prefix="simulacao")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fecha()
+
+    def fecha(self, espera: bool = True) -> None:
+        self._pool.shutdown(wait=espera)
+
+    def submete(self, funcao, *args, **kwargs):
+        """Submete uma chamada qualquer ao pool (em processos, `funcao` precisa ser de nível de módulo)."""
+        return self._pool.submit(funcao, *args, **kwargs)
+
+    # --- ESTRATÉGIAS ---
+
+    def simula_estrategias(self, params: ParametrosAnalise, lance_percentual: float, mes_venda: int, agio_venda: float,
+                           mes_aluguel: int, valor_aluguel: float) -> dict:
+        """Submete lance, venda e aluguel de uma vez, com as mesmas entradas da aba de estratégias."""
+        return {
+            "lance": self.submete(simular_estrategia_lance, params.parcela_con, params.prazo_meses_con, params.carta_credito,
+                                  lance_percentual, params.taxa_selic_anual),
+            "venda": self.submete(simular_estrategia_venda, params.parcela_con, mes_venda, agio_venda, params.taxa_selic_anual),
+            "aluguel": self.submete(simular_estrategia_aluguel, params.parcela_con, params.prazo_meses_con, mes_aluguel,
+                                    valor_aluguel, params.taxa_selic_anual)
+        }
+
+    async def simula_estrategias_async(self, *args, **kwargs) -> dict:
+        """simula_estrategias para asyncio: aguarda as três e retorna os resultados (não os futures)."""
+        return await _aguarda_todos(self.simula_estrategias(*args, **kwargs))
+
+    # --- CENÁRIOS ---
+
+    def avalia_cenarios(self, params: ParametrosAnalise) -> dict:
+        """Submete custos em VP, cenários de Selic, curvas de juros e pontos de empate (via core.memoizacao)."""
+        return {
+            "custos_vp": self.submete(memoizacao.custos_vp, params),
+            "cenarios": self.submete(memoizacao.cenarios, params),
+            "cenarios_curvas": self.submete(memoizacao.cenarios_curvas, params),
+            "pontos_de_empate": self.submete(memoizacao.pontos_de_empate, params)
+        }
+
+    async def avalia_cenarios_async(self, params: ParametrosAnalise) -> dict:
+        return await _aguarda_todos(self.avalia_cenarios(params))
+
+
+async def _aguarda_todos(futuros: dict) -> dict:
+    resultados = await asyncio.gather(*(asyncio.wrap_future(futuro) for futuro in futuros.values()))
+    return dict(zip(futuros, resultados))
+
+
+def resultados(futuros: dict, timeout: float = None) -> dict:
+    """Espera todos os futures de um dicionário e retorna os resultados com as mesmas chaves."""
+    return {nome: futuro.result(timeout=timeout) for nome, futuro in futuros.items()}
+
+
+# --- SERVIÇO COMPARTILHADO ---
+# Um único pool de threads por processo, compartilhado por todas as sessões do Streamlit:
+# criar um pool por rerun custaria mais do que as próprias simulações
+
+_servico = None
+_trava_servico = threading.Lock()
+
+def servico_compartilhado() -> ServicoSimulacao:
+    """Pool de threads do processo, criado na primeira chamada e fechado na saída do interpretador."""
+    global _servico
+    with _trava_servico:
+        if _servico is None:
+            _servico = ServicoSimulacao()
+            atexit.register(_servico.fecha, False)
+        return _servico
+
+
+# --- COMPARAÇÃO ---
+
+def compara_estrategias(params: ParametrosAnalise, resultados_estrategias: dict, lance_percentual: float,
+                        mes_aluguel: int) -> pd.DataFrame:
+    """
+    Resultado líquido em VP de cada estratégia ao lado de manter a cota até o fim, todos na mesma base:
+    -(parcelas + lance - carta recebida na contemplação), como em otimiza_lance e em core.monte_carlo.
+    - Manter até o Fim e Lance: contemplação no último mês (o lance, pago em t=0, só abate parcelas,
+      como em otimiza_lance sem lance vencedor);
+    - Venda da Cota: o valor de venda substitui a carta (o VPL da estratégia já o inclui);
+    - Aluguel do Bem: carta (o bem) no mês da contemplação, além dos aluguéis.
+    """
+    taxa = params.taxa_selic_anual
+    vp_carta_no_fim = params.carta_credito * float(fator_desconto_lote(taxa, params.prazo_meses_con - 1))
+    vp_carta_aluguel = params.carta_credito * float(fator_desconto_lote(taxa, min(max(mes_aluguel, 1), params.prazo_meses_con) - 1))
+    valor_do_lance = params.carta_credito * lance_percentual / 100
+    valores = {
+        "Manter até o Fim": vp_carta_no_fim - memoizacao.custos_vp(params)[1],
+        "Lance": vp_carta_no_fim - (resultados_estrategias["lance"]['custo_vp'] + valor_do_lance),
+        "Venda da Cota": resultados_estrategias["venda"]['vpl'],
+        "Aluguel do Bem": resultados_estrategias["aluguel"]['vpl'] + vp_carta_aluguel
+    }
+    comparacao = pd.DataFrame({"Resultado Líquido em VP (R$)": pd.Series(valores)}).rename_axis("Estratégia")
+    comparacao["Diferença vs. Manter (R$)"] = comparacao["Resultado Líquido em VP (R$)"] - valores["Manter até o Fim"]
+    return comparacao
@@ -0,0 +1,118 @@
+import numpy as np
+from .calculations import fator_anuidade_antecipada
+
+# --- RESOLVEDORES NUMÉRICOS VETORIZADOS ---
+
+def newton_bissecao_lote(funcao, baixo, alto, derivada=None, tolerancia: float = 1e-12, max_iteracoes: int = 100):
+    """
+    Encontra raízes de `funcao` em vários intervalos [baixo, alto] de uma só vez.
+
+    Usa Newton (quando `derivada` é dada) protegido por bissecção, como o rtsafe: o passo de Newton só
+    é aceito se cair dentro do intervalo que ainda contém a troca de sinal e se tiver no máximo metade
+    do tamanho do penúltimo passo; senão, o passo é de bissecção. Sem a segunda condição, Newton pode
+    avançar aos poucos pelo mesmo lado de uma função muito curva (ex: exponenciais em prazos longos)
+    e o intervalo quase não encolhe. Sem `derivada`, faz bissecção pura.
+    Retorna (raiz, convergiu). Intervalos sem troca de sinal ou que não convergem em
+    `max_iteracoes` ficam com raiz NaN e convergiu=False — nunca com um valor silencioso.
+    """
+    baixo, alto = np.broadcast_arrays(np.asarray(baixo, dtype=float), np.asarray(alto, dtype=float))
+    baixo, alto = baixo.copy(), alto.copy()
+    f_baixo, f_alto = funcao(baixo), funcao(alto)
+    com_troca = np.sign(f_baixo) != np.sign(f_alto)
+    # Orienta cada intervalo para que f(negativo) < 0 <= f(positivo)
+    inverte = f_baixo > f_alto
+    negativo = np.where(inverte, alto, baixo)
+    positivo = np.where(inverte, baixo, alto)
+    x = (negativo + positivo) / 2
+    convergiu = ~com_troca & ((f_baixo == 0) | (f_alto == 0))
+    x = np.where(f_baixo == 0, baixo, np.where(f_alto == 0, alto, x))
+    ativo = com_troca & ~convergiu
+    passo, passo_anterior = np.abs(alto - baixo), np.abs(alto - baixo)
+
+    for _ in range(max_iteracoes):
+        if not ativo.any():
+            break
+        f_x = funcao(x)
+        exata = ativo & (f_x == 0)
+        convergiu |= exata
+        ativo &= ~exata
+        abaixo = f_x < 0
+        negativo = np.where(ativo & abaixo, x, negativo)
+        positivo = np.where(ativo & ~abaixo, x, positivo)
+        proximo = (negativo + positivo) / 2
+        if derivada is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                passo_newton = x - f_x / derivada(x)
+            dentro = (passo_newton - negativo) * (passo_newton - positivo) < 0
+            rapido = np.abs(passo_newton - x) <= passo_anterior / 2
+            proximo = np.where(dentro & rapido, passo_newton, proximo)
+            passo_anterior, passo = passo, np.where(ativo, np.abs(proximo - x), passo)
+        terminou = ativo & (np.abs(proximo - x) <= tolerancia * (1 + np.abs(x)))
+        x = np.where(ativo, proximo, x)
+        convergiu |= terminou
+        ativo &= ~terminou
+
+    return np.where(convergiu, x, np.nan), convergiu
+
+
+# --- TIR DE SÉRIES UNIFORMES COM UM FLUXO ADICIONAL ---
+
+# Intervalo de busca da taxa mensal: de -50% a +100% ao mês
+_LOG_TAXA_MINIMA, _LOG_TAXA_MAXIMA = np.log(0.5), np.log(2.0)
+
+def calcula_tir_lote(parcela, prazo, valor_recebido, mes_recebimento=None):
+    """
+    Calcula a TIR mensal de vários fluxos do tipo: -parcela de t=0 a prazo-1 e +valor_recebido em
+    t=mes_recebimento (por padrão prazo-1, junto com a última parcela, como na venda da cota).
+
+    Explora a estrutura anuidade + fluxo único em vez de raízes de polinômio (npf.irr, O(n³)):
+    em x = log(1 + r), o VPL capitalizado até o recebimento,
+        g(x) = valor_recebido - parcela * sum(e^((k - t)x)),
+    é côncavo e tem derivada em forma fechada. Entre as raízes possíveis, retorna a mais próxima
+    de r = 0, resolvida por Newton com bissecção. Retorna (tir_mensal, convergiu); quando o fluxo
+    não tem TIR no intervalo de busca, tir_mensal é NaN e convergiu é False.
+    """
+    prazo = np.asarray(prazo, dtype=float)
+    k = prazo - 1 if mes_recebimento is None else np.asarray(mes_recebimento, dtype=float)
+    parcela, prazo, valor, k = np.broadcast_arrays(np.asarray(parcela, dtype=float), prazo, np.asarray(valor_recebido, dtype=float), k)
+    formato = parcela.shape
+    parcela, prazo, valor, k = (np.ravel(a) for a in (parcela, prazo, valor, k))
+
+    def soma_capitalizada(x):
+        # sum_{t=0}^{n-1} e^((k-t)x) = e^(kx) * (fator de anuidade antecipada à taxa e^x - 1)
+        return np.exp(k * x) * fator_anuidade_antecipada(np.expm1(x), prazo)
+
+    def g(x):
+        return valor - parcela * soma_capitalizada(x)
+
+    def derivada_log_soma(x):
+        # d/dx log(soma) = k + n / (e^(nx) - 1) - 1 / (e^x - 1), com o limite k - (n-1)/2 em x = 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            derivada = k + prazo / np.expm1(prazo * x) - 1 / np.expm1(x)
+        return np.where(np.abs(x) < 1e-8, k - (prazo - 1) / 2, derivada)
+
+    def derivada_g(x):
+        return -parcela * soma_capitalizada(x) * derivada_log_soma(x)
+
+    minimo = np.full(len(k), _LOG_TAXA_MINIMA)
+    maximo = np.full(len(k), _LOG_TAXA_MAXIMA)
+    zero = np.zeros(len(k))
+
+    # Ponto de máximo de g: onde a derivada do log da soma se anula (ela é crescente em x)
+    x_maximo, interior = newton_bissecao_lote(derivada_log_soma, minimo, maximo)
+    x_maximo = np.where(interior, x_maximo, np.where(g(minimo) > g(maximo), minimo, maximo))
+    tem_raiz = g(x_maximo) >= 0
+
+    # g(0) < 0: a raiz mais próxima de zero fica entre 0 e o máximo
+    raiz_central, ok_central = newton_bissecao_lote(g, np.minimum(zero, x_maximo), np.maximum(zero, x_maximo), derivada_g)
+    # g(0) >= 0: zero fica entre as duas raízes; escolhe a de menor |r| (mesmo critério do npf.irr)
+    raiz_esquerda, ok_esquerda = newton_bissecao_lote(g, minimo, zero, derivada_g)
+    raiz_direita, ok_direita = newton_bissecao_lote(g, zero, maximo, derivada_g)
+    usa_direita = ok_direita & (~ok_esquerda | (np.expm1(raiz_direita) <= -np.expm1(raiz_esquerda)))
+    raiz_lateral = np.where(usa_direita, raiz_direita, raiz_esquerda)
+    ok_lateral = ok_direita | ok_esquerda
+
+    central = g(zero) < 0
+    x = np.where(central, raiz_central, raiz_lateral)
+    convergiu = tem_raiz & np.where(central, ok_central, ok_lateral)
+    return np.where(convergiu, np.expm1(x), np.nan).reshape(formato), convergiu.reshape(formato)
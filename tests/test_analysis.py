@@ -0,0 +1,151 @@
+import pytest
+import numpy as np
+import pandas as pd
+from core.calculations import (
+    calcula_parcela_consorcio,
+    calcula_vp_custo_consorcio,
+    calcula_vp_custo_financiamento
+)
+from core.analysis import (
+    run_scenario_analysis, run_sensitivity_grid, calcula_fronteira_break_even, simular_estrategia_lance, otimiza_lance,
+    calcula_break_even, calcula_break_even_lote, PARAMETROS_BREAK_EVEN
+)
+from core.formatting import formata_tabela_cenarios
+
+PARAMS = {
+    'valor_bem': 300000, 'valor_entrada': 60000,
+    'taxa_juros_anual_fin': 0.115, 'prazo_meses_fin': 360,
+    'taxa_selic_anual': 0.105, 'prazo_meses_con': 180,
+    'taxa_adm_total': 18.0, 'fundo_reserva_total': 1.0
+}
+
+# --- Testes da Análise de Cenários ---
+def test_run_scenario_analysis_numerico():
+    """Os cenários devem sair numéricos; a formatação é feita só na camada de apresentação."""
+    parcela_con = calcula_parcela_consorcio(300000, 180, 18.0, 1.0)
+    params = {**PARAMS, 'valor_a_financiar': 240000, 'parcela_con': parcela_con}
+    cenarios = run_scenario_analysis(params)
+    assert cenarios["Taxa Selic Anual"].tolist() == pytest.approx([0.125, 0.105, 0.085])
+    realista = cenarios.loc["Realista (Selic Atual)"]
+    assert realista["VP Custo Financiamento (R$)"] == pytest.approx(calcula_vp_custo_financiamento(60000, 240000, 0.115, 360, 0.105))
+    assert realista["VP Custo Consórcio (R$)"] == pytest.approx(abs(calcula_vp_custo_consorcio(parcela_con, 180, 0.105)))
+
+    tabela = formata_tabela_cenarios(cenarios)
+    assert tabela.loc["Realista (Selic Atual)", "Taxa Selic Anual"] == "10.50%"
+    assert tabela.loc["Realista (Selic Atual)", "VP Custo Consórcio (R$)"] == f"{realista['VP Custo Consórcio (R$)']:,.2f}"
+
+# --- Testes da Grade de Sensibilidade ---
+def test_run_sensitivity_grid_igual_escalar():
+    """Cada célula da grade deve coincidir com as funções escalares."""
+    grade = run_sensitivity_grid(PARAMS, {
+        'taxa_selic_anual': [0.08, 0.105, 0.13],
+        'taxa_juros_anual_fin': [0.09, 0.115],
+        'prazo_meses_fin': [240, 360]
+    })
+    assert len(grade) == 12
+    assert list(grade.index.names) == ['taxa_selic_anual', 'taxa_juros_anual_fin', 'prazo_meses_fin']
+    parcela_con = calcula_parcela_consorcio(300000, 180, 18.0, 1.0)
+    for (selic, taxa_fin, prazo_fin), linha in grade.iterrows():
+        vp_fin = calcula_vp_custo_financiamento(60000, 240000, taxa_fin, int(prazo_fin), selic)
+        vp_con = abs(calcula_vp_custo_consorcio(parcela_con, 180, selic))
+        assert linha["VP Custo Financiamento (R$)"] == pytest.approx(vp_fin, abs=1e-2)
+        assert linha["VP Custo Consórcio (R$)"] == pytest.approx(vp_con, abs=1e-2)
+        assert linha["Melhor Opção"] == ("Financiamento" if vp_fin < vp_con else "Consórcio")
+
+def test_run_sensitivity_grid_eixo_invalido():
+    with pytest.raises(ValueError):
+        run_sensitivity_grid(PARAMS, {'taxa_inexistente': [0.1]})
+
+def test_calcula_fronteira_break_even():
+    """Na fronteira interpolada os dois custos devem ser (quase) iguais."""
+    grade = run_sensitivity_grid(PARAMS, {
+        'taxa_juros_anual_fin': [0.025, 0.03],
+        'taxa_selic_anual': np.arange(0.01, 0.2001, 0.0025)
+    })
+    fronteira = calcula_fronteira_break_even(grade, 'taxa_selic_anual')
+    assert list(fronteira.index.names) == ['taxa_juros_anual_fin']
+    parcela_con = calcula_parcela_consorcio(300000, 180, 18.0, 1.0)
+    assert fronteira.notna().all()
+    for taxa_fin, selic in fronteira.items():
+        vp_fin = calcula_vp_custo_financiamento(60000, 240000, taxa_fin, 360, selic)
+        vp_con = abs(calcula_vp_custo_consorcio(parcela_con, 180, selic))
+        assert vp_fin == pytest.approx(vp_con, rel=1e-3)
+
+# --- Testes do Otimizador de Lance ---
+def test_otimiza_lance_consistente_com_simulacao():
+    parcela = calcula_parcela_consorcio(300000, 180, 18.0, 1.0)
+    # Lance que abate exatamente 30 parcelas, dado no primeiro mês
+    percentual = 100 * 30 * parcela / 300000
+    otimo = otimiza_lance(parcela, 180, 300000, 0.105, percentuais=[percentual], meses_lance=[1])
+    linha = otimo['curva'].iloc[0]
+    assert linha["Custo Parcelas VP (R$)"] == pytest.approx(simular_estrategia_lance(parcela, 180, 300000, percentual, 0.105)['custo_vp'])
+    assert linha["Custo Lance VP (R$)"] == pytest.approx(30 * parcela)
+    assert otimo['novo_prazo_otimo'] == 150
+
+def test_otimiza_lance_sem_contemplacao_nao_compensa():
+    """Sem antecipar a contemplação, pagar parcelas futuras hoje só aumenta o custo em VP."""
+    parcela = calcula_parcela_consorcio(300000, 180, 18.0, 1.0)
+    otimo = otimiza_lance(parcela, 180, 300000, 0.105)
+    assert otimo['percentual_otimo'] == 0.0
+    assert otimo['curva']["Custo Líquido VP (R$)"].min() == pytest.approx(otimo['custo_vp_otimo'])
+
+def test_otimiza_lance_com_lance_vencedor():
+    parcela = calcula_parcela_consorcio(300000, 180, 18.0, 1.0)
+    otimo = otimiza_lance(parcela, 180, 300000, 0.105, lance_minimo_vencedor=40)
+    assert otimo['percentual_otimo'] == 40.0
+    assert otimo['mes_otimo'] == 1
+    curva = otimo['curva']
+    # Lances maiores que o saldo restante são impossíveis
+    assert np.isnan(curva.loc[(179, 100.0), "Custo Líquido VP (R$)"])
+    with pytest.raises(ValueError):
+        otimiza_lance(parcela, 180, 300000, 0.105, meses_lance=[0])
+
+# --- Testes do Break-even ---
+PARAMS_EMPATE = {**PARAMS, 'taxa_juros_anual_fin': 0.08, 'taxa_selic_anual': 0.14, 'prazo_meses_con': 90, 'taxa_adm_total': 22.0}
+
+def _diferenca(params):
+    parcela_con = calcula_parcela_consorcio(params['valor_bem'], params['prazo_meses_con'], params['taxa_adm_total'], params['fundo_reserva_total'])
+    vp_fin = calcula_vp_custo_financiamento(params['valor_entrada'], params['valor_bem'] - params['valor_entrada'],
+                                            params['taxa_juros_anual_fin'], params['prazo_meses_fin'], params['taxa_selic_anual'])
+    return vp_fin - abs(calcula_vp_custo_consorcio(parcela_con, params['prazo_meses_con'], params['taxa_selic_anual']))
+
+@pytest.mark.parametrize("parametro", PARAMETROS_BREAK_EVEN)
+def test_break_even_empata_os_vps(parametro):
+    """No valor de empate, recalcular os dois VPs pelo caminho normal deve dar diferença nula."""
+    # Com consórcio de 90 meses a Selic não inverte a decisão entre 0% e 100%; com 60, sim
+    params = {**PARAMS_EMPATE, 'prazo_meses_con': 60} if parametro == 'taxa_selic_anual' else PARAMS_EMPATE
+    empate = calcula_break_even(params, parametro)
+    assert not np.isnan(empate)
+    assert _diferenca({**params, parametro: empate}) == pytest.approx(0.0, abs=1e-4)
+
+def test_break_even_lote_e_sem_empate():
+    lote = pd.DataFrame({**PARAMS_EMPATE, 'prazo_meses_con': [60, 72, 90]})
+    resultado = calcula_break_even_lote(lote, 'prazo_meses_fin')
+    for prazo, empate in zip(lote['prazo_meses_con'], resultado):
+        assert empate == pytest.approx(calcula_break_even({**PARAMS_EMPATE, 'prazo_meses_con': prazo}, 'prazo_meses_fin'))
+    # Financiamento caro em qualquer Selic do intervalo: sem empate, NaN
+    assert np.isnan(calcula_break_even({**PARAMS, 'taxa_juros_anual_fin': 0.30}, 'taxa_selic_anual'))
+    with pytest.raises(ValueError):
+        calcula_break_even(PARAMS, 'valor_bem')
+
+def test_break_even_com_dois_empates_escolhe_o_mais_proximo():
+    """A diferença de VPs cruza zero duas vezes em [0, 1]: os extremos têm o mesmo sinal, mas há empate."""
+    cotacao = {'valor_bem': 222000.0, 'valor_entrada': 69650.0, 'taxa_juros_anual_fin': 0.0696, 'prazo_meses_fin': 144,
+               'prazo_meses_con': 48, 'taxa_adm_total': 12.27, 'fundo_reserva_total': 0.27}
+    assert np.sign(_diferenca({**cotacao, 'taxa_selic_anual': 0.0})) == np.sign(_diferenca({**cotacao, 'taxa_selic_anual': 1.0}))
+    perto_de_hoje = calcula_break_even({**cotacao, 'taxa_selic_anual': 0.1156}, 'taxa_selic_anual')
+    perto_do_alto = calcula_break_even({**cotacao, 'taxa_selic_anual': 0.60}, 'taxa_selic_anual')
+    assert perto_de_hoje == pytest.approx(0.0795, abs=1e-3)
+    assert perto_do_alto == pytest.approx(0.714, abs=1e-3)
+    for empate in (perto_de_hoje, perto_do_alto):
+        assert _diferenca({**cotacao, 'taxa_selic_anual': empate}) == pytest.approx(0.0, abs=1e-4)
+    # Sem o valor atual, vale o menor empate
+    assert calcula_break_even(cotacao, 'taxa_selic_anual') == pytest.approx(perto_de_hoje)
+
+def test_break_even_parametros_ausentes_e_fora_do_intervalo():
+    with pytest.raises(KeyError):
+        calcula_break_even({nome: valor for nome, valor in PARAMS_EMPATE.items() if nome != 'valor_bem'}, 'prazo_meses_fin')
+    # Empate só com taxa de administração acima de 50%: fora do intervalo realista, NaN
+    params = {**PARAMS_EMPATE, 'taxa_juros_anual_fin': 0.115, 'taxa_selic_anual': 0.105, 'prazo_meses_con': 180, 'prazo_meses_fin': 360}
+    assert np.isnan(calcula_break_even(params, 'taxa_adm_total'))
+    assert calcula_break_even(params, 'taxa_adm_total', intervalo=(0.0, 200.0)) > 50
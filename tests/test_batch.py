@@ -0,0 +1,121 @@
+import pytest
+import numpy as np
+import pandas as pd
+from core.calculations import (
+    calcula_parcela_consorcio,
+    calcula_vp_custo_consorcio,
+    calcula_vp_custo_financiamento
+)
+from core import batch
+from core.batch import precifica_cotacoes, precifica_arquivo, main
+
+
+def gera_cotacoes(n: int, semente: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(semente)
+    valor_bem = rng.integers(50, 1000, n) * 1000.0
+    return pd.DataFrame({
+        'valor_bem': valor_bem,
+        'valor_entrada': valor_bem * rng.uniform(0.0, 0.5, n).round(2),
+        'taxa_juros_anual_fin': rng.uniform(0.06, 0.20, n).round(4),
+        'prazo_meses_fin': rng.integers(1, 36, n) * 12,
+        'prazo_meses_con': rng.integers(1, 21, n) * 12,
+        'taxa_adm_total': rng.uniform(10, 25, n).round(1),
+        'fundo_reserva_total': rng.uniform(0, 3, n).round(1)
+    })
+
+# --- Testes da Precificação em Lote ---
+def test_precifica_cotacoes_igual_escalar():
+    cotacoes = gera_cotacoes(50)
+    resultado = precifica_cotacoes(cotacoes, taxa_selic_anual=0.105)
+    for _, linha in resultado.iterrows():
+        parcela_con = calcula_parcela_consorcio(linha.valor_bem, int(linha.prazo_meses_con), linha.taxa_adm_total, linha.fundo_reserva_total)
+        vp_fin = calcula_vp_custo_financiamento(linha.valor_entrada, linha.valor_bem - linha.valor_entrada, linha.taxa_juros_anual_fin, int(linha.prazo_meses_fin), 0.105)
+        vp_con = abs(calcula_vp_custo_consorcio(parcela_con, int(linha.prazo_meses_con), 0.105))
+        assert linha.vp_custo_financiamento == pytest.approx(vp_fin, abs=1e-2)
+        assert linha.vp_custo_consorcio == pytest.approx(vp_con, abs=1e-2)
+        assert linha.melhor_opcao == ("Financiamento" if vp_fin < vp_con else "Consórcio")
+
+def test_precifica_cotacoes_linhas_invalidas():
+    cotacoes = gera_cotacoes(3)
+    cotacoes.loc[1, 'valor_entrada'] = cotacoes.loc[1, 'valor_bem']
+    cotacoes['taxa_selic_anual'] = 0.10
+    resultado = precifica_cotacoes(cotacoes)
+    assert np.isnan(resultado.loc[1, 'vp_custo_financiamento'])
+    assert pd.isna(resultado.loc[1, 'melhor_opcao'])
+    assert resultado['vp_custo_consorcio'].drop(index=1).notna().all()
+
+@pytest.mark.parametrize("coluna, valor", [
+    ('prazo_meses_fin', 0), ('prazo_meses_fin', -12), ('prazo_meses_con', 0), ('taxa_juros_anual_fin', np.nan),
+    ('taxa_adm_total', np.inf), ('fundo_reserva_total', np.nan), ('valor_bem', np.inf), ('prazo_meses_con', np.nan),
+    ('taxa_selic_anual', np.nan)
+])
+def test_precifica_cotacoes_linhas_com_valores_ruins(coluna, valor):
+    cotacoes = gera_cotacoes(3)
+    cotacoes['taxa_selic_anual'] = 0.10
+    cotacoes[coluna] = cotacoes[coluna].astype(float)
+    cotacoes.loc[1, coluna] = valor
+    resultado = precifica_cotacoes(cotacoes)
+    saidas = ['valor_a_financiar', 'parcela_fin', 'parcela_con', 'vp_custo_financiamento', 'vp_custo_consorcio']
+    assert resultado.loc[1, saidas].isna().all()
+    assert pd.isna(resultado.loc[1, 'melhor_opcao'])
+    assert resultado.drop(index=1)[saidas].notna().all().all()
+    assert resultado.drop(index=1)['melhor_opcao'].notna().all()
+
+def test_precifica_cotacoes_colunas_ausentes():
+    with pytest.raises(ValueError):
+        precifica_cotacoes(gera_cotacoes(3).drop(columns='taxa_adm_total'), taxa_selic_anual=0.1)
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_precifica_arquivo_em_blocos(tmp_path, processos):
+    cotacoes = gera_cotacoes(2500)
+    entrada, saida = tmp_path / "cotacoes.csv", tmp_path / "resultado.csv"
+    cotacoes.to_csv(entrada, index=False)
+    total = precifica_arquivo(entrada, saida, tamanho_bloco=300, processos=processos, taxa_selic_anual=0.105)
+    assert total == 2500
+    resultado = pd.read_csv(saida)
+    esperado = precifica_cotacoes(cotacoes, taxa_selic_anual=0.105)
+    np.testing.assert_allclose(resultado['vp_custo_consorcio'], esperado['vp_custo_consorcio'])
+    assert resultado['valor_bem'].tolist() == cotacoes['valor_bem'].tolist()
+
+def test_precifica_arquivo_parquet_com_celulas_ruins_em_bloco_posterior(tmp_path):
+    """Colunas inteiras no primeiro bloco e vazias/não numéricas depois: o esquema da saída não muda."""
+    pytest.importorskip("pyarrow")
+    cotacoes = gera_cotacoes(40)
+    entrada, saida = tmp_path / "cotacoes.csv", tmp_path / "resultado.parquet"
+    cotacoes.to_csv(entrada, index=False)
+    linhas = entrada.read_text().splitlines()
+    celulas = linhas[31].split(",")
+    celulas[3], celulas[5] = "", "abc"  # prazo_meses_fin vazio, taxa_adm_total não numérica
+    linhas[31] = ",".join(celulas)
+    entrada.write_text("\n".join(linhas) + "\n")
+
+    assert precifica_arquivo(entrada, saida, tamanho_bloco=10, taxa_selic_anual=0.105) == 40
+    resultado = pd.read_parquet(saida)
+    assert len(resultado) == 40
+    assert resultado['prazo_meses_fin'].dtype == np.float64
+    assert resultado.loc[30, ['parcela_fin', 'vp_custo_financiamento', 'vp_custo_consorcio']].isna().all()
+    assert pd.isna(resultado.loc[30, 'melhor_opcao'])
+    assert resultado.drop(index=30)['melhor_opcao'].notna().all()
+    assert not list(tmp_path.glob("*.parcial"))
+
+def test_precifica_arquivo_interrompido_nao_deixa_saida(tmp_path, monkeypatch):
+    entrada, saida = tmp_path / "cotacoes.csv", tmp_path / "resultado.csv"
+    gera_cotacoes(30).to_csv(entrada, index=False)
+    original = batch.precifica_cotacoes
+    chamadas = []
+    def falha_no_segundo_bloco(bloco, taxa_selic_anual):
+        chamadas.append(1)
+        if len(chamadas) == 2:
+            raise RuntimeError("falha simulada")
+        return original(bloco, taxa_selic_anual)
+    monkeypatch.setattr(batch, "precifica_cotacoes", falha_no_segundo_bloco)
+    with pytest.raises(RuntimeError):
+        precifica_arquivo(entrada, saida, tamanho_bloco=10, taxa_selic_anual=0.105)
+    assert list(tmp_path.iterdir()) == [entrada]
+
+def test_main_linha_de_comando(tmp_path, capsys):
+    entrada, saida = tmp_path / "cotacoes.csv", tmp_path / "resultado.csv"
+    gera_cotacoes(10).to_csv(entrada, index=False)
+    assert main([str(entrada), str(saida), "--selic", "0.12"]) == 0
+    assert len(pd.read_csv(saida)) == 10
+    assert "10 cotações" in capsys.readouterr().out
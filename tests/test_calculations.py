@@ -1,11 +1,18 @@
 import pytest
+import numpy as np
+import numpy_financial as npf
 import pandas as pd
 from core.calculations import (
     calcula_parcela_consorcio, 
     calcula_vp_custo_consorcio,
     calcula_parcela_price,
     gera_tabela_amortizacao,
-    calcula_vp_custo_financiamento
+    calcula_vp_custo_financiamento,
+    calcula_parcela_price_lote,
+    calcula_vp_custo_financiamento_lote,
+    calcula_vp_custo_consorcio_lote,
+    gera_tabela_amortizacao_em_blocos,
+    exporta_tabela_amortizacao_csv
 )
 
 # --- Testes do Consórcio ---
@@ -32,6 +39,28 @@ def test_gera_tabela_amortizacao():
     saldo_final = tabela["Saldo Devedor (R$)"].iloc[-1]
     assert saldo_final == pytest.approx(0.0, abs=1e-2)
 
+def test_gera_tabela_amortizacao_sac():
+    """No SAC a amortização é constante e a parcela decresce até quitar o saldo."""
+    tabela = gera_tabela_amortizacao(valor_financiado=120000, taxa_juros_anual=0.10, prazo_meses=120, sistema="sac")
+    assert tabela["Amortização (R$)"].iloc[0] == pytest.approx(1000.0)
+    assert tabela["Amortização (R$)"].sum() == pytest.approx(120000.0)
+    assert tabela["Parcela (R$)"].is_monotonic_decreasing
+    assert tabela["Saldo Devedor (R$)"].iloc[-1] == pytest.approx(0.0, abs=1e-2)
+
+def test_gera_tabela_amortizacao_em_blocos():
+    """Os blocos concatenados devem ser idênticos à tabela completa."""
+    completa = gera_tabela_amortizacao(valor_financiado=240000, taxa_juros_anual=0.115, prazo_meses=360)
+    blocos = list(gera_tabela_amortizacao_em_blocos(240000, 0.115, 360, tamanho_bloco=100))
+    assert [len(bloco) for bloco in blocos] == [100, 100, 100, 60]
+    pd.testing.assert_frame_equal(pd.concat(blocos, ignore_index=True), completa)
+
+def test_exporta_tabela_amortizacao_csv(tmp_path):
+    destino = tmp_path / "tabela.csv"
+    exporta_tabela_amortizacao_csv(destino, 50000, 0.12, 48, sistema="sac", tamanho_bloco=10)
+    exportada = pd.read_csv(destino)
+    assert len(exportada) == 48
+    assert exportada["Saldo Devedor (R$)"].iloc[-1] == pytest.approx(0.0, abs=1e-2)
+
 def test_calcula_vp_custo_financiamento():
     """Testa o cálculo do VP do custo com taxas EFETIVAS."""
     custo_vp = calcula_vp_custo_financiamento(
@@ -42,3 +71,32 @@ def test_calcula_vp_custo_financiamento():
     # Valor esperado com parcela de 1035.19 (taxa efetiva)
     # e desconto com taxa efetiva de 12%
     assert custo_vp == pytest.approx(94889.33, abs=1e-2)
+
+# --- Testes do Motor em Lote (forma fechada) ---
+def _vp_financiamento_fluxo_explicito(valor_entrada, valor_financiado, taxa_juros_anual, prazo_meses, taxa_desconto_anual):
+    """Construção original, mês a mês: npf.pmt para a parcela e npf.npv sobre a lista de parcelas."""
+    taxa_juros_mensal = (1 + taxa_juros_anual)**(1/12) - 1
+    taxa_desconto_mensal = (1 + taxa_desconto_anual)**(1/12) - 1
+    parcela = npf.pmt(rate=taxa_juros_mensal, nper=prazo_meses, pv=-valor_financiado)
+    return valor_entrada + abs(npf.npv(rate=taxa_desconto_mensal, values=[-parcela] * prazo_meses))
+
+def test_calcula_vp_custo_financiamento_lote_igual_fluxo_explicito():
+    """O cálculo em lote (e o escalar, que o embrulha) deve reproduzir o fluxo explícito ao centavo."""
+    valores = np.array([80000, 240000, 50000])
+    taxas = np.array([0.10, 0.115, 0.0])
+    prazos = np.array([120, 360, 48])
+    custos = calcula_vp_custo_financiamento_lote(20000, valores, taxas, prazos, 0.12)
+    esperado = [_vp_financiamento_fluxo_explicito(20000, v, t, p, 0.12) for v, t, p in zip(valores, taxas, prazos)]
+    assert custos == pytest.approx(esperado, abs=1e-2)
+    assert custos[0] == pytest.approx(94889.33, abs=1e-2)
+    escalares = [calcula_vp_custo_financiamento(20000, v, t, p, 0.12) for v, t, p in zip(valores, taxas, prazos)]
+    assert escalares == pytest.approx(esperado, abs=1e-2)
+
+def test_calcula_lote_igual_numpy_financial():
+    """Confere a forma fechada contra o fluxo explícito do numpy_financial."""
+    taxa_mensal = (1 + 0.10)**(1/12) - 1
+    parcelas = calcula_parcela_price_lote(80000, 0.10, np.array([12, 120, 420]))
+    for parcela, prazo in zip(parcelas, [12, 120, 420]):
+        assert parcela == pytest.approx(npf.pmt(taxa_mensal, prazo, -80000), abs=1e-6)
+    vps = calcula_vp_custo_consorcio_lote(1000, 12, np.array([0.0, 0.10]))
+    assert vps == pytest.approx([-12000.0, -11491.40], abs=1e-2)
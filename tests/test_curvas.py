@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+from core.calculations import (
+    calcula_parcela_consorcio, calcula_parcela_price,
+    calcula_vp_custo_financiamento, calcula_vp_custo_consorcio,
+    calcula_vp_custo_financiamento_curva, calcula_vp_custo_consorcio_curva,
+    fator_anuidade_antecipada, fator_anuidade_lote, fator_desconto_lote, taxa_anual_para_mensal
+)
+from core.analysis import run_scenario_analysis, run_curve_analysis, simular_estrategia_aluguel, simular_estrategia_venda
+from core.curvas import CurvaDeTaxas, curva_constante, curva_constante_compartilhada, curva_por_vertices, curvas_selic_padrao, _curva_constante_em_cache
+
+PARAMS = {
+    'valor_bem': 300000, 'valor_entrada': 60000, 'valor_a_financiar': 240000,
+    'taxa_juros_anual_fin': 0.115, 'prazo_meses_fin': 360,
+    'taxa_selic_anual': 0.105, 'prazo_meses_con': 180,
+    'taxa_adm_total': 18.0, 'fundo_reserva_total': 1.0,
+    'parcela_con': calcula_parcela_consorcio(300000, 180, 18.0, 1.0)
+}
+
+# --- Testes da Curva ---
+def test_curva_constante_igual_taxa_unica():
+    curva = curva_constante(0.105, 420)
+    assert calcula_vp_custo_financiamento_curva(60000, 240000, 0.115, 360, curva) == pytest.approx(calcula_vp_custo_financiamento(60000, 240000, 0.115, 360, 0.105))
+    assert calcula_vp_custo_consorcio_curva(2000, [12, 180], curva) == pytest.approx([calcula_vp_custo_consorcio(2000, 12, 0.105), calcula_vp_custo_consorcio(2000, 180, 0.105)])
+    assert curva.taxa_anual_equivalente() == pytest.approx(0.105)
+
+def test_curva_fatores_e_produto_escalar():
+    taxas = np.linspace(0.005, 0.012, 24)
+    curva = CurvaDeTaxas(taxas)
+    fatores = 1 / np.concatenate([[1.0], np.cumprod(1 + taxas)])
+    np.testing.assert_allclose(curva.fatores, fatores)
+    fluxos = np.arange(1.0, 13.0)
+    assert curva.vp(fluxos) == pytest.approx(fluxos @ fatores[:12])
+    assert curva.vp_anuidade(6, inicio=3) == pytest.approx(fatores[3:9].sum())
+    with pytest.raises(ValueError):
+        curva.vp_anuidade(25)
+    with pytest.raises(ValueError):
+        curva.taxas_mensais[0] = 0.0
+
+def test_curva_com_indexador():
+    """Parcelas corrigidas pelo indexador descontadas pela curva = parcela fixa na curva deflacionada."""
+    selic = curva_por_vertices({0: 0.12, 24: 0.09}, 180)
+    incc = curva_constante(0.05, 180)
+    crescimento = 1 / incc.fatores[:180]
+    esperado = -(2000 * crescimento) @ selic.fatores[:180]
+    assert calcula_vp_custo_consorcio_curva(2000, 180, selic, incc) == pytest.approx(esperado)
+
+# --- Testes da Análise por Curvas ---
+def test_run_curve_analysis():
+    curvas = curvas_selic_padrao(0.105, 360)
+    resultado = run_curve_analysis(PARAMS, curvas)
+    realista = run_scenario_analysis(PARAMS).loc["Realista (Selic Atual)"]
+    constante = resultado.loc["Selic Constante"]
+    assert constante["VP Custo Financiamento (R$)"] == pytest.approx(realista["VP Custo Financiamento (R$)"])
+    assert constante["VP Custo Consórcio (R$)"] == pytest.approx(realista["VP Custo Consórcio (R$)"])
+    # Selic em queda: desconto menor, custos maiores em VP
+    assert resultado.loc["Queda Gradual (Focus)", "VP Custo Consórcio (R$)"] > constante["VP Custo Consórcio (R$)"]
+    corrigido = run_curve_analysis(PARAMS, curvas, indexador_consorcio=curva_constante(0.05, 360))
+    assert (corrigido["VP Custo Consórcio (R$)"] > resultado["VP Custo Consórcio (R$)"]).all()
+
+def test_estrategias_com_curva_constante():
+    curva = curva_constante(0.105, 180)
+    assert simular_estrategia_aluguel(2000, 180, 45, 1500, 0.105, curva_desconto=curva)['vpl'] == pytest.approx(simular_estrategia_aluguel(2000, 180, 45, 1500, 0.105)['vpl'])
+    assert simular_estrategia_venda(2000, 90, 15, 0.105, curva_desconto=curva)['vpl'] == pytest.approx(simular_estrategia_venda(2000, 90, 15, 0.105)['vpl'])
+
+# --- Testes do Cache de Fatores de Desconto ---
+def test_fatores_lote_iguais_a_forma_fechada():
+    taxas = np.array([[0.08], [0.105], [0.13]])
+    prazos = np.array([0, 1, 12, 180, 419.5])
+    mensais = taxa_anual_para_mensal(taxas)
+    np.testing.assert_allclose(fator_anuidade_lote(taxas, prazos), fator_anuidade_antecipada(mensais, prazos))
+    np.testing.assert_allclose(fator_desconto_lote(taxas, prazos[:-1]), (1 + mensais) ** -prazos[:-1])
+    assert fator_anuidade_lote(0.105, 180) == pytest.approx(float(fator_anuidade_antecipada(taxa_anual_para_mensal(0.105), 180)))
+    assert fator_desconto_lote(0.105, -3) == pytest.approx(1.0)
+
+def test_curva_compartilhada_reaproveitada():
+    _curva_constante_em_cache.cache_clear()
+    curva = curva_constante_compartilhada(0.105, 180)
+    assert curva.horizonte == 240
+    assert curva_constante_compartilhada(0.105, 200) is curva
+    fator_anuidade_lote(0.105, np.arange(1, 181))
+    assert _curva_constante_em_cache.cache_info().hits >= 2
@@ -0,0 +1,95 @@
+import json
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+from core.data_fetcher import (
+    atualiza_serie_selic,
+    atualiza_serie_selic_em_segundo_plano,
+    carrega_serie_selic,
+    ultima_taxa_selic,
+    TAXA_SELIC_PADRAO
+)
+
+# Série fictícia servida pelo servidor local, no formato do SGS
+SERIE_FICTICIA = {date(2024, 1, 1) + timedelta(days=i): 11.25 - i * 0.01 for i in range(60)}
+
+
+@pytest.fixture
+def servidor_sgs():
+    """Servidor HTTP local que imita a API do SGS (filtro por dataInicial/dataFinal, 404 sem dados)."""
+    requisicoes = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            consulta = parse_qs(urlparse(self.path).query)
+            inicio = date(*reversed([int(x) for x in consulta['dataInicial'][0].split('/')]))
+            fim = date(*reversed([int(x) for x in consulta['dataFinal'][0].split('/')]))
+            requisicoes.append((inicio, fim))
+            pontos = [{"data": d.strftime("%d/%m/%Y"), "valor": f"{v:.2f}"} for d, v in sorted(SERIE_FICTICIA.items()) if inicio <= d <= fim]
+            self.send_response(200 if pontos else 404)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps(pontos).encode())
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_port}/dados", requisicoes
+    servidor.shutdown()
+
+
+def test_atualiza_serie_selic_completa_e_incremental(tmp_path, servidor_sgs):
+    url, requisicoes = servidor_sgs
+    caminho = tmp_path / "selic.csv"
+
+    # Primeira carga: série completa, em janelas de no máximo 10 dias
+    novos = atualiza_serie_selic(caminho, url=url, hoje=date(2024, 1, 31), janela_dias=10, data_inicial=date(2024, 1, 1))
+    assert novos == 31
+    assert all((fim - inicio).days < 10 for inicio, fim in requisicoes)
+    serie = carrega_serie_selic(caminho)
+    assert serie[0] == (date(2024, 1, 1), pytest.approx(0.1125))
+    assert serie[-1][0] == date(2024, 1, 31)
+
+    # Atualização incremental: só pede as datas posteriores à última gravada
+    requisicoes.clear()
+    novos = atualiza_serie_selic(caminho, url=url, hoje=date(2024, 2, 10))
+    assert novos == 10
+    assert requisicoes == [(date(2024, 2, 1), date(2024, 2, 10))]
+    assert len(carrega_serie_selic(caminho)) == 41
+
+
+def test_ultima_taxa_selic_offline(tmp_path, servidor_sgs):
+    """Com a cópia em disco, a leitura não depende da rede."""
+    url, _ = servidor_sgs
+    caminho = tmp_path / "selic.csv"
+    atualiza_serie_selic(caminho, url=url, hoje=date(2024, 1, 10), data_inicial=date(2024, 1, 1))
+    taxa, data = ultima_taxa_selic(caminho, atualizar=False)
+    assert data == date(2024, 1, 10)
+    assert taxa == pytest.approx(0.1116)
+
+    # Sem cópia local, usa o valor padrão
+    assert ultima_taxa_selic(tmp_path / "inexistente.csv", atualizar=False) == (TAXA_SELIC_PADRAO, None)
+
+
+def test_atualiza_serie_selic_em_segundo_plano(tmp_path, servidor_sgs):
+    url, _ = servidor_sgs
+    caminho = tmp_path / "selic.csv"
+    thread = atualiza_serie_selic_em_segundo_plano(caminho, url=url, hoje=date(2024, 1, 5), data_inicial=date(2024, 1, 1))
+    thread.join(timeout=5)
+    assert len(carrega_serie_selic(caminho)) == 5
+    # Uma nova tentativa logo em seguida é ignorada
+    assert atualiza_serie_selic_em_segundo_plano(caminho, url=url) is None
+
+
+def test_atualiza_serie_selic_falha_de_rede(tmp_path):
+    """Falhas de rede são propagadas e não corrompem a cópia local."""
+    import requests
+    caminho = tmp_path / "selic.csv"
+    with pytest.raises(requests.exceptions.RequestException):
+        atualiza_serie_selic(caminho, url="http://127.0.0.1:9/dados", timeout=0.5, hoje=date(2024, 1, 5), data_inicial=date(2024, 1, 1))
+    assert not caminho.exists()
@@ -0,0 +1,61 @@
+import subprocess
+import sys
+import pytest
+from core import calculations, analysis, data_fetcher
+from benchmarks import suite, partida_a_frio
+
+BASELINE = suite.carrega_baseline()
+
+@pytest.fixture(scope="module")
+def casos():
+    with suite.modo_offline():
+        yield {nome: chamada for nome, _, chamada in suite.monta_casos()}
+
+# --- Cobertura da Suíte ---
+def test_suite_cobre_calculations_e_analysis():
+    with suite.modo_offline():
+        casos = suite.monta_casos()
+    medidas = {funcao.__name__ for _, funcao, _ in casos}
+    faltando = (suite.funcoes_publicas(calculations) | suite.funcoes_publicas(analysis)) - medidas
+    assert not faltando, f"Funções sem benchmark: {sorted(faltando)}"
+    assert {nome for nome, _, _ in casos} == set(BASELINE['casos']), "Regrave o baseline: python -m benchmarks.suite --grava-baseline"
+
+def test_suite_roda_offline(monkeypatch):
+    def sem_rede(*args, **kwargs):
+        raise AssertionError("A suíte de benchmarks não pode acessar a rede.")
+    monkeypatch.setattr(data_fetcher, "_baixa_janela", sem_rede)
+    with suite.modo_offline():
+        assert data_fetcher.busca_taxa_selic_atual() == data_fetcher.TAXA_SELIC_PADRAO
+        suite.monta_casos()
+
+# --- Regressão de Desempenho (pytest -m perf) ---
+@pytest.mark.perf
+@pytest.mark.parametrize("nome", sorted(BASELINE['casos']))
+def test_sem_regressao_de_desempenho(casos, nome):
+    referencia = BASELINE['casos'][nome]['relativo']
+    # Mede de novo antes de acusar regressão: uma rodada isolada pode sofrer com ruído da máquina
+    razao = float('inf')
+    for _ in range(3):
+        razao = min(razao, suite.mede_relativo(casos[nome])['relativo'] / referencia)
+        if razao <= suite.LIMITE_REGRESSAO:
+            break
+    assert razao <= suite.LIMITE_REGRESSAO, f"{nome} ficou {razao:.2f}x mais lento que o baseline"
+
+@pytest.mark.perf
+@pytest.mark.parametrize("nome", sorted(suite.ORCAMENTOS_MS))
+def test_dentro_do_orcamento(casos, nome):
+    orcamento = suite.ORCAMENTOS_MS[nome]
+    ms = min(suite.mede(casos[nome], rodadas=3) for _ in range(2))
+    assert ms <= orcamento, f"{nome} levou {ms:.1f} ms (orçamento {orcamento:.0f} ms)"
+
+# --- Partida a Frio ---
+def test_core_nao_importa_plotly():
+    """Só desenhar uma figura carrega o plotly; calcular (lote, serviço, caches) não."""
+    codigo = "import sys; from core import memoizacao, servico, batch; print('plotly' in sys.modules)"
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=partida_a_frio.RAIZ, capture_output=True, text=True, check=True)
+    assert saida.stdout.strip() == "False"
+
+@pytest.mark.perf
+def test_partida_a_frio_dentro_da_meta():
+    medianas = partida_a_frio.mede_partidas(rodadas=3)
+    assert medianas["total"] <= partida_a_frio.TEMPO_ALVO_SEGUNDOS, f"Partida a frio de {medianas['total']:.2f} s"
@@ -0,0 +1,62 @@
+import json
+import pytest
+import numpy as np
+from core import instrumentacao, memoizacao
+from core.parametros import ParametrosAnalise
+from core.calculations import gera_tabela_amortizacao
+from core.analysis import run_sensitivity_grid
+
+PARAMS = {
+    'valor_bem': 300000, 'valor_entrada': 60000,
+    'taxa_juros_anual_fin': 0.115, 'prazo_meses_fin': 360,
+    'taxa_selic_anual': 0.105, 'prazo_meses_con': 180,
+    'taxa_adm_total': 18.0, 'fundo_reserva_total': 1.0
+}
+
+@pytest.fixture
+def coleta():
+    instrumentacao.limpa()
+    instrumentacao.ativa()
+    yield
+    instrumentacao.ativa(False)
+    instrumentacao.limpa()
+
+# --- Testes da Instrumentação ---
+def test_desligada_nao_registra():
+    instrumentacao.limpa()
+    gera_tabela_amortizacao(240000, 0.115, 120)
+    assert instrumentacao.metricas()["funcoes"] == {}
+
+def test_chamadas_latencia_e_tamanho(coleta):
+    gera_tabela_amortizacao(240000, 0.115, 120)
+    gera_tabela_amortizacao(240000, 0.115, prazo_meses=420)
+    run_sensitivity_grid(PARAMS, {'taxa_selic_anual': np.arange(0.05, 0.15, 0.01), 'prazo_meses_con': [120, 180]})
+    with pytest.raises(ValueError):
+        with instrumentacao.mede("bloco", tamanho=3):
+            raise ValueError("falhou")
+
+    funcoes = instrumentacao.metricas()["funcoes"]
+    tabela = funcoes["core.calculations.gera_tabela_amortizacao"]
+    assert tabela["chamadas"] == 2
+    assert tabela["tamanho_entrada"]["soma"] == 540
+    assert tabela["latencia_segundos"]["baldes"]["+Inf"] == 2
+    assert funcoes["core.analysis.run_sensitivity_grid"]["tamanho_entrada"]["soma"] == 20
+    assert funcoes["bloco"]["erros"] == 1
+
+def test_exportacao_e_caches(coleta):
+    memoizacao.limpa_caches()
+    params = ParametrosAnalise(**PARAMS)
+    memoizacao.custos_vp(params)
+    memoizacao.custos_vp(params)
+    gera_tabela_amortizacao(240000, 0.115, 120)
+
+    caches = instrumentacao.info_caches()
+    assert caches["memoizacao.custos_vp"]["taxa_acerto"] == pytest.approx(0.5)
+    assert "curvas._curva_constante_em_cache" in caches
+
+    texto = instrumentacao.exporta_prometheus()
+    assert 'calculadora_chamadas_total{funcao="core.calculations.gera_tabela_amortizacao"} 1' in texto
+    assert 'calculadora_latencia_segundos_bucket{funcao="core.calculations.gera_tabela_amortizacao",le="+Inf"} 1' in texto
+    assert 'calculadora_cache_taxa_acerto{cache="memoizacao.custos_vp"} 0.5' in texto
+    assert json.loads(instrumentacao.exporta_json())["caches"]["memoizacao.custos_vp"]["acertos"] == 1
+    memoizacao.limpa_caches()
@@ -0,0 +1,65 @@
+import dataclasses
+import pytest
+import numpy as np
+from core.calculations import calcula_parcela_consorcio, calcula_vp_custo_financiamento
+from core.analysis import run_sensitivity_grid
+from core.parametros import ParametrosAnalise
+from core import memoizacao
+
+PARAMS = ParametrosAnalise(
+    valor_bem=300000, valor_entrada=60000, taxa_juros_anual_fin=0.115, prazo_meses_fin=360,
+    taxa_selic_anual=0.105, prazo_meses_con=180, taxa_adm_total=18.0, fundo_reserva_total=1.0
+)
+
+@pytest.fixture(autouse=True)
+def caches_limpos():
+    memoizacao.limpa_caches()
+    yield
+    memoizacao.limpa_caches()
+
+# --- Testes dos Parâmetros ---
+def test_parametros_imutaveis_e_derivados():
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        PARAMS.valor_bem = 1
+    assert hash(PARAMS) == hash(dataclasses.replace(PARAMS))
+    assert PARAMS.valor_a_financiar == 240000
+    assert PARAMS.parcela_con == pytest.approx(calcula_parcela_consorcio(300000, 180, 18.0, 1.0))
+    assert PARAMS.como_dict()['carta_credito'] == 300000
+
+# --- Testes dos Caches ---
+def test_custos_vp_reaproveitado():
+    vp_fin, vp_con = memoizacao.custos_vp(PARAMS)
+    assert vp_fin == pytest.approx(calcula_vp_custo_financiamento(60000, 240000, 0.115, 360, 0.105))
+    assert vp_con > 0
+    assert memoizacao.custos_vp(dataclasses.replace(PARAMS)) == (vp_fin, vp_con)
+    info = memoizacao.info_caches()['custos_vp']
+    assert (info.hits, info.misses) == (1, 1)
+
+def test_cache_limitado():
+    for prazo in range(1, memoizacao.TAMANHO_CACHE + 11):
+        memoizacao.tabela_amortizacao(1000.0, 0.1, prazo)
+    assert memoizacao.info_caches()['tabela_amortizacao'].currsize == memoizacao.TAMANHO_CACHE
+
+def test_grade_ignora_parametros_que_sao_eixos():
+    eixos = {'taxa_selic_anual': np.linspace(0.05, 0.15, 5), 'taxa_juros_anual_fin': [0.09, 0.12]}
+    grade = memoizacao.grade_sensibilidade(PARAMS, eixos)
+    # Mover a Selic da barra lateral não muda uma grade que já varre a Selic
+    assert memoizacao.grade_sensibilidade(dataclasses.replace(PARAMS, taxa_selic_anual=0.12), eixos) is grade
+    esperado = run_sensitivity_grid(PARAMS.como_dict(), eixos)
+    np.testing.assert_allclose(grade["Diferença (R$)"], esperado["Diferença (R$)"])
+
+def test_monte_carlo_memoizado_somente_leitura():
+    resultado = memoizacao.monte_carlo(PARAMS, n_caminhos=2000, semente=1)
+    assert memoizacao.monte_carlo(PARAMS, n_caminhos=2000, semente=1) is resultado
+    with pytest.raises(ValueError):
+        resultado['vp_consorcio'][0] = 0.0
+    with pytest.raises(ValueError):
+        memoizacao.monte_carlo(PARAMS, n_caminhos=2000, semente=None)
+
+def test_figura_amortizacao_reamostrada():
+    from core.plotting import MAXIMO_PONTOS_SERIE
+    figura = memoizacao.figura_amortizacao(240000, 0.115, 420)
+    meses = list(figura.data[0].x)
+    assert len(meses) <= MAXIMO_PONTOS_SERIE
+    assert meses[0] == 1 and meses[-1] == 420
+    assert memoizacao.figura_amortizacao(240000, 0.115, 420) is figura
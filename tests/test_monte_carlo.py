@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import numpy_financial as npf
+from core.calculations import (
+    calcula_parcela_consorcio,
+    calcula_vp_custo_consorcio,
+    calcula_vp_custo_financiamento
+)
+from core.monte_carlo import sorteia_meses_contemplacao, simula_caminhos_selic, simula_monte_carlo_consorcio
+
+PARAMS = {
+    'valor_bem': 300000, 'valor_entrada': 60000, 'valor_a_financiar': 240000,
+    'taxa_juros_anual_fin': 0.115, 'prazo_meses_fin': 360,
+    'taxa_selic_anual': 0.105, 'prazo_meses_con': 180, 'carta_credito': 300000,
+    'parcela_con': calcula_parcela_consorcio(300000, 180, 18.0, 1.0)
+}
+
+# --- Testes do Sorteio de Contemplação ---
+def test_sorteia_meses_contemplacao():
+    """Sem lance, a posição na ordem de contemplação é uniforme: média ~ (prazo + 1) / 2."""
+    meses = sorteia_meses_contemplacao(np.random.default_rng(0), 200_000, prazo=120, lances_por_mes=0)
+    assert meses.min() >= 1 and meses.max() <= 120
+    assert meses.mean() == pytest.approx(60.5, rel=0.01)
+    # Com chance alta de vencer por lance, a contemplação tende a ser bem mais cedo
+    com_lance = sorteia_meses_contemplacao(np.random.default_rng(0), 200_000, prazo=120, lances_por_mes=0, prob_lance=0.2)
+    assert com_lance.mean() < 10
+
+# --- Testes dos Caminhos da Selic ---
+def test_simula_caminhos_selic_antiteticos():
+    """Cada caminho ímpar espelha o anterior em torno da Selic inicial (longe do piso)."""
+    caminhos = simula_caminhos_selic(np.random.default_rng(0), 7, 40, 0.5, volatilidade_anual=0.02, selic_minima=0.0, antiteticos=True)
+    assert caminhos.shape == (7, 40)
+    np.testing.assert_allclose(caminhos[0:6:2] + caminhos[1:6:2], 1.0)
+    assert (caminhos[:, 0] == 0.5).all()
+
+# --- Testes da Simulação ---
+def test_simula_monte_carlo_reprodutivel():
+    a = simula_monte_carlo_consorcio(PARAMS, n_caminhos=5000, semente=42)
+    b = simula_monte_carlo_consorcio(PARAMS, n_caminhos=5000, semente=42, tamanho_bloco=1000)
+    np.testing.assert_allclose(a['vp_consorcio'], b['vp_consorcio'])
+    assert a['prob_consorcio_vence'] == b['prob_consorcio_vence']
+    assert 0.0 <= a['prob_consorcio_vence'] <= 1.0
+
+def test_simula_monte_carlo_sem_volatilidade():
+    """Com a Selic fixa, cada caminho deve coincidir com o cálculo determinístico."""
+    resultado = simula_monte_carlo_consorcio(PARAMS, n_caminhos=500, semente=1, volatilidade_selic=0.0)
+    meses = resultado['meses_contemplacao']
+    vp_parcelas = abs(calcula_vp_custo_consorcio(PARAMS['parcela_con'], 180, 0.105))
+    esperado = vp_parcelas - 300000 * (1.105) ** (-(meses - 1) / 12)
+    np.testing.assert_allclose(resultado['vp_consorcio'], esperado, atol=1e-2)
+    vp_fin = calcula_vp_custo_financiamento(60000, 240000, 0.115, 360, 0.105) - 300000
+    np.testing.assert_allclose(resultado['vp_financiamento'], vp_fin, atol=1e-2)
+
+def test_simula_monte_carlo_igual_fluxo_mensal_explicito():
+    """Com volatilidade, o acúmulo passo a passo deve bater com o desconto mês a mês dos mesmos caminhos."""
+    resultado = simula_monte_carlo_consorcio(PARAMS, n_caminhos=301, semente=7, volatilidade_selic=0.03)
+    rng = np.random.default_rng(7)
+    meses = sorteia_meses_contemplacao(rng, 301, 180)
+    caminhos = simula_caminhos_selic(rng, 301, 120, 0.105, volatilidade_anual=0.03, antiteticos=True)
+    taxa_mensal = (1 + np.repeat(caminhos, 3, axis=1))**(1/12) - 1
+    fatores = np.cumprod(np.hstack([np.ones((301, 1)), 1 / (1 + taxa_mensal[:, :-1])]), axis=1)
+    carta = 300000 * fatores[np.arange(301), meses - 1]
+    esperado_con = PARAMS['parcela_con'] * fatores[:, :180].sum(axis=1) - carta
+    parcela_fin = npf.pmt((1.115)**(1/12) - 1, 360, -240000)
+    esperado_fin = 60000 + parcela_fin * fatores.sum(axis=1) - 300000
+    np.testing.assert_array_equal(resultado['meses_contemplacao'], meses)
+    np.testing.assert_allclose(resultado['vp_consorcio'], esperado_con, atol=1e-4)
+    np.testing.assert_allclose(resultado['vp_financiamento'], esperado_fin, atol=1e-4)
+
+def test_simula_monte_carlo_tir():
+    """A TIR de cada caminho deve bater com numpy_financial; sem raiz real, fica NaN."""
+    resultado = simula_monte_carlo_consorcio(PARAMS, n_caminhos=2000, semente=3)
+    for mes in (1, 40, 150, 180):
+        fluxo = [-PARAMS['parcela_con']] * 180
+        fluxo[mes - 1] += 300000
+        tir_anual = resultado['tir_anual'][resultado['meses_contemplacao'] == mes]
+        if len(tir_anual):
+            assert tir_anual[0] == pytest.approx((1 + npf.irr(fluxo))**12 - 1, abs=1e-8)
+    assert np.isnan(resultado['tir_anual'][resultado['meses_contemplacao'] == 90]).all()
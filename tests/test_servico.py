@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from core.analysis import simular_estrategia_lance, simular_estrategia_venda, simular_estrategia_aluguel
+from core.parametros import ParametrosAnalise
+from core import memoizacao, servico
+
+PARAMS = ParametrosAnalise(
+    valor_bem=300000, valor_entrada=60000, taxa_juros_anual_fin=0.115, prazo_meses_fin=360,
+    taxa_selic_anual=0.105, prazo_meses_con=180, taxa_adm_total=18.0, fundo_reserva_total=1.0
+)
+ENTRADAS = dict(lance_percentual=25, mes_venda=90, agio_venda=15, mes_aluguel=45, valor_aluguel=1500)
+
+def _esperado():
+    p = PARAMS
+    return {
+        "lance": simular_estrategia_lance(p.parcela_con, p.prazo_meses_con, p.carta_credito, 25, p.taxa_selic_anual),
+        "venda": simular_estrategia_venda(p.parcela_con, 90, 15, p.taxa_selic_anual),
+        "aluguel": simular_estrategia_aluguel(p.parcela_con, p.prazo_meses_con, 45, 1500, p.taxa_selic_anual)
+    }
+
+# --- Testes do Serviço de Simulação ---
+@pytest.mark.parametrize("processos", [False, True])
+def test_simula_estrategias_igual_as_chamadas_diretas(processos):
+    with servico.ServicoSimulacao(max_trabalhadores=2, processos=processos) as pool:
+        futuros = pool.simula_estrategias(PARAMS, **ENTRADAS)
+        assert tuple(futuros) == servico.ESTRATEGIAS
+        assert servico.resultados(futuros, timeout=60) == _esperado()
+
+def test_versoes_async():
+    with servico.ServicoSimulacao(max_trabalhadores=4) as pool:
+        estrategias = asyncio.run(pool.simula_estrategias_async(PARAMS, **ENTRADAS))
+        cenarios = asyncio.run(pool.avalia_cenarios_async(PARAMS))
+    assert estrategias == _esperado()
+    assert cenarios["custos_vp"] == memoizacao.custos_vp(PARAMS)
+    assert cenarios["cenarios"].equals(memoizacao.cenarios(PARAMS))
+
+def test_servico_compartilhado_e_comparacao():
+    assert servico.servico_compartilhado() is servico.servico_compartilhado()
+    comparacao = servico.compara_estrategias(PARAMS, _esperado(), 25, 45)
+    taxa_mensal = (1 + PARAMS.taxa_selic_anual)**(1/12) - 1
+    carta_no_fim = PARAMS.carta_credito / (1 + taxa_mensal)**(PARAMS.prazo_meses_con - 1)
+    manter = carta_no_fim - memoizacao.custos_vp(PARAMS)[1]
+    assert list(comparacao.index) == ["Manter até o Fim", "Lance", "Venda da Cota", "Aluguel do Bem"]
+    assert comparacao.loc["Manter até o Fim", "Resultado Líquido em VP (R$)"] == pytest.approx(manter)
+    assert comparacao.loc["Lance", "Resultado Líquido em VP (R$)"] == pytest.approx(carta_no_fim - (_esperado()["lance"]['custo_vp'] + 75000))
+    assert comparacao.loc["Venda da Cota", "Diferença vs. Manter (R$)"] == pytest.approx(_esperado()["venda"]['vpl'] - manter)
+    carta_no_mes_45 = PARAMS.carta_credito / (1 + taxa_mensal)**44
+    assert comparacao.loc["Aluguel do Bem", "Resultado Líquido em VP (R$)"] == pytest.approx(_esperado()["aluguel"]['vpl'] + carta_no_mes_45)
+
+def test_comparacao_manter_vence():
+    """Venda com deságio às vésperas do fim, lance sem contemplação antecipada e aluguel só no fim: manter a cota é o melhor."""
+    p = PARAMS
+    resultados_estrategias = {
+        "lance": simular_estrategia_lance(p.parcela_con, p.prazo_meses_con, p.carta_credito, 25, p.taxa_selic_anual),
+        "venda": simular_estrategia_venda(p.parcela_con, 179, -20, p.taxa_selic_anual),
+        "aluguel": simular_estrategia_aluguel(p.parcela_con, p.prazo_meses_con, p.prazo_meses_con, 0, p.taxa_selic_anual)
+    }
+    comparacao = servico.compara_estrategias(p, resultados_estrategias, 25, p.prazo_meses_con)
+    resultado = comparacao["Resultado Líquido em VP (R$)"]
+    assert resultado.idxmax() == "Manter até o Fim"
+    assert resultado["Manter até o Fim"] > resultado[["Lance", "Venda da Cota"]].max()
+    assert resultado["Aluguel do Bem"] == pytest.approx(resultado["Manter até o Fim"])
@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+import numpy_financial as npf
+from core.solvers import newton_bissecao_lote, calcula_tir_lote
+from core.analysis import simular_estrategia_venda, simular_estrategia_venda_grade
+
+# --- Testes do Resolvedor Genérico ---
+def test_newton_bissecao_lote():
+    raizes, convergiu = newton_bissecao_lote(lambda x: x**2 - np.array([2.0, 9.0, -1.0]), 0.0, 4.0, derivada=lambda x: 2 * x)
+    assert raizes[:2] == pytest.approx([np.sqrt(2), 3.0])
+    # Sem troca de sinal: a falha é reportada, não mascarada
+    assert convergiu.tolist() == [True, True, False]
+    assert np.isnan(raizes[2])
+
+# --- Testes da TIR ---
+@pytest.mark.parametrize("prazo, mes, fator_valor", [(90, 89, 1.15), (60, 59, 0.9), (180, 0, 1.19), (180, 149, 1.19), (12, 3, 1.0)])
+def test_calcula_tir_lote_igual_numpy_financial(prazo, mes, fator_valor):
+    fluxo = [-1000.0] * prazo
+    fluxo[mes] += 1000.0 * prazo * fator_valor
+    tir, convergiu = calcula_tir_lote(1000.0, prazo, 1000.0 * prazo * fator_valor, mes)
+    assert convergiu
+    assert tir == pytest.approx(npf.irr(fluxo), abs=1e-9)
+
+def test_calcula_tir_lote_sem_raiz():
+    """Contemplação no meio do plano com taxa de administração: não existe TIR."""
+    tir, convergiu = calcula_tir_lote(1000.0, 121, 110000.0, 60)
+    assert not convergiu
+    assert np.isnan(tir)
+
+# --- Testes da Estratégia de Venda ---
+def test_simular_estrategia_venda():
+    """O VPL mantém a convenção anterior; a TIR sai do resolvedor dedicado."""
+    resultado = simular_estrategia_venda(parcela=2000, mes_contemplacao=90, agio_venda_percentual=15, taxa_desconto_anual=0.105)
+    taxa_mensal = (1 + 0.105)**(1/12) - 1
+    fluxo = [-2000.0] * 90
+    fluxo[-1] += 2000 * 90 * 1.15
+    assert resultado['vpl'] == pytest.approx(npf.npv(taxa_mensal, fluxo[1:]) + fluxo[0], abs=1e-6)
+    assert resultado['tir_anual'] == pytest.approx((1 + npf.irr(fluxo))**12 - 1, abs=1e-9)
+    assert resultado['tir_convergiu']
+
+    sem_tir = simular_estrategia_venda(parcela=2000, mes_contemplacao=1, agio_venda_percentual=15, taxa_desconto_anual=0.105)
+    assert not sem_tir['tir_convergiu'] and np.isnan(sem_tir['tir_anual'])
+
+def test_simular_estrategia_venda_grade():
+    grade = simular_estrategia_venda_grade(2000, np.arange(1, 181), np.arange(-10, 51), 0.105)
+    assert len(grade) == 180 * 61
+    linha = grade.loc[(90, 15.0)]
+    assert linha["TIR Anual"] == pytest.approx(simular_estrategia_venda(2000, 90, 15, 0.105)['tir_anual'])
+
+@pytest.mark.parametrize("prazo", [287, 300, 360, 420])
+@pytest.mark.parametrize("agio", [5.0, 15.0])
+def test_calcula_tir_lote_prazos_longos(prazo, agio):
+    """Em prazos longos g(x) é muito curva: Newton sozinho quase não fecha o intervalo."""
+    fluxo = [-2000.0] * prazo
+    fluxo[-1] += 2000.0 * prazo * (1 + agio / 100)
+    tir, convergiu = calcula_tir_lote(2000.0, prazo, 2000.0 * prazo * (1 + agio / 100))
+    assert convergiu
+    assert tir == pytest.approx(npf.irr(fluxo), abs=1e-9)
+
+def test_simular_estrategia_venda_grade_prazos_longos():
+    grade = simular_estrategia_venda_grade(2000, np.arange(2, 421), [15.0], 0.105)
+    assert grade["TIR Convergiu"].all()